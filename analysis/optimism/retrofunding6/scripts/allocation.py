@@ -0,0 +1,146 @@
+import numpy as np
+
+
+def sort_columns(values):
+    """
+    Sort the columns of a NaN-masked (voters x columns) matrix once, for repeated medians.
+
+    Returns a dict with the sorted values (NaN last), the voter order and each voter's rank
+    within every column, and the number of values per column.
+    """
+    values = np.asarray(values, dtype=float)
+    order = np.argsort(values, axis=0, kind='stable')
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(len(values))[:, np.newaxis], axis=0)
+    return {
+        'values': np.take_along_axis(values, order, axis=0),
+        'order': order,
+        'ranks': ranks,
+        'counts': (~np.isnan(values)).sum(axis=0)
+    }
+
+
+def _middle(sorted_values, lower, upper, counts):
+    """Mean of the values at positions lower and upper of every column; NaN for empty columns."""
+    lower = np.take_along_axis(sorted_values, np.minimum(lower, len(sorted_values) - 1), axis=0)
+    upper = np.take_along_axis(sorted_values, np.minimum(upper, len(sorted_values) - 1), axis=0)
+    return np.where(counts > 0, (lower + upper) / 2, np.nan)
+
+
+def column_medians(columns):
+    """Median of every column."""
+    counts = columns['counts'][np.newaxis, :]
+    return _middle(columns['values'], (counts - 1) // 2, counts // 2, counts)[0]
+
+
+def leave_one_out_medians(columns):
+    """
+    Median of every column with each voter left out in turn, as a (voters x columns) matrix.
+
+    Removing the voter at rank r shifts every later sorted position down by one, so each
+    leave-one-out median is read from the single sort instead of re-sorting.
+    """
+    ranks, counts = columns['ranks'], columns['counts']
+    voted = ranks < counts
+    remaining = np.where(voted, counts - 1, counts)
+    lower, upper = (np.maximum(remaining - 1, 0)) // 2, remaining // 2
+    lower = np.where(voted & (lower >= ranks), lower + 1, lower)
+    upper = np.where(voted & (upper >= ranks), upper + 1, upper)
+    return _middle(columns['values'], lower, upper, remaining)
+
+
+def subset_medians(columns, voter_mask, chunk_size=64):
+    """
+    Median of every column over each voter subset in a (subsets x voters) boolean mask.
+
+    Members are counted along the pre-sorted columns, so each median is selected by rank
+    without sorting the subset.
+    """
+    voter_mask = np.atleast_2d(np.asarray(voter_mask, dtype=bool))
+    sorted_values, order, counts = columns['values'], columns['order'], columns['counts']
+    has_value = np.arange(len(sorted_values))[:, np.newaxis] < counts
+
+    medians = []
+    for start in range(0, len(voter_mask), chunk_size):
+        members = voter_mask[start:start + chunk_size][:, order] & has_value
+        seen = np.cumsum(members, axis=1, dtype=np.int32)
+        num_members = seen[:, -1]
+        # position of the k-th member (0-based) is the first position where k + 1 members are seen
+        lower = (seen > ((num_members - 1) // 2)[:, np.newaxis]).argmax(axis=1)
+        upper = (seen > (num_members // 2)[:, np.newaxis]).argmax(axis=1)
+        column = np.arange(sorted_values.shape[1])
+        middle = (sorted_values[lower, column] + sorted_values[upper, column]) / 2
+        medians.append(np.where(num_members > 0, middle, np.nan))
+    return np.concatenate(medians) if medians else np.empty((0, sorted_values.shape[1]))
+
+
+def initial_allocations(category_medians, project_medians, median_budget):
+    """
+    Turn median percentages into initial project allocations.
+
+    Project medians (..., categories, projects) are normalized within their category,
+    weighted by the normalized category medians (..., categories) and scaled by the median
+    budget. Returns (..., projects) with NaN for projects without votes.
+    """
+    category_weights = category_medians / np.nansum(category_medians, axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        project_weights = project_medians / np.nansum(project_medians, axis=-1, keepdims=True)
+    weighted = project_weights * category_weights[..., np.newaxis]
+    voted = ~np.isnan(weighted).all(axis=-2)
+    initial = np.nansum(weighted, axis=-2) * np.asarray(median_budget)[..., np.newaxis]
+    return np.where(voted, initial, np.nan)
+
+
+def _fill_sorted(sorted_scores, funding, max_cap, start):
+    """
+    Allocate funding over descending scores in proportion to score, capped at max_cap.
+
+    Entries before `start` are skipped. Capped entries are always the leading ones, so the
+    first entry that fits under the cap fixes the rate for every entry after it.
+    """
+    num_projects = sorted_scores.shape[-1]
+    rank = np.arange(num_projects) - start[..., np.newaxis]
+    score_balance = np.cumsum(sorted_scores[..., ::-1], axis=-1)[..., ::-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = (funding[..., np.newaxis] - rank * max_cap[..., np.newaxis]) / score_balance
+        fits = (rank >= 0) & ~(sorted_scores * rate > max_cap[..., np.newaxis])
+    num_capped = np.where(fits.any(axis=-1), fits.argmax(axis=-1), num_projects)
+
+    uncapped_rate = np.take_along_axis(rate, np.minimum(num_capped, num_projects - 1)[..., np.newaxis], axis=-1)
+    with np.errstate(invalid='ignore'):
+        allocations = np.where(sorted_scores > 0, sorted_scores * uncapped_rate, 0.0)
+    allocations = np.where(rank < 0, 0.0, allocations)
+    allocations = np.where(np.arange(num_projects) < num_capped[..., np.newaxis], max_cap[..., np.newaxis], allocations)
+    return allocations, num_capped
+
+
+def capped_allocations(initial_allocations, budget, max_cap, min_reward):
+    """
+    Apply the max cap with redistribution, the min cutoff, and redistribute the remainder.
+
+    1. fund projects in proportion to their initial allocation, redistributing the excess
+       above max_cap to the projects below it
+    2. set the funding for projects below min_reward to 0
+    3. allocate the funding left after the capped projects to the projects below the cap
+
+    Both passes work on the same descending order, so each row is sorted once. Arrays are
+    batched along the leading dimensions; NaN initial allocations count as 0.
+    """
+    scores = np.nan_to_num(np.asarray(initial_allocations, dtype=float))
+    budget = np.broadcast_to(np.asarray(budget, dtype=float), scores.shape[:-1])
+    max_cap = np.broadcast_to(np.asarray(max_cap, dtype=float), scores.shape[:-1])
+
+    order = np.argsort(-scores, axis=-1, kind='stable')
+    sorted_scores = np.take_along_axis(scores, order, axis=-1)
+
+    allocations, num_capped = _fill_sorted(sorted_scores, budget, max_cap, np.zeros(scores.shape[:-1], dtype=int))
+    allocations[allocations < min_reward] = 0
+
+    remaining_funding = budget - num_capped * max_cap
+    redistributed, _ = _fill_sorted(allocations, remaining_funding, max_cap, num_capped)
+    capped = np.arange(scores.shape[-1]) < num_capped[..., np.newaxis]
+    allocations = np.where(capped, allocations, redistributed)
+
+    rewards = np.empty_like(allocations)
+    np.put_along_axis(rewards, order, allocations, axis=-1)
+    return rewards
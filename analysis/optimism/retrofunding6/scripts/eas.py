@@ -1,7 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
 import os
 import pandas as pd
 import requests
+import threading
 import time
 from typing import List, Dict, Optional
 from urllib.parse import urlparse
@@ -29,19 +32,103 @@ DEPRECATED_LIST = [
 ]
 
 
+EAS_GRAPHQL_URL = 'https://optimism.easscan.org/graphql'
+METADATA_WORKERS = 8         # concurrent metadata requests
+HOST_MIN_INTERVAL = 0.25     # seconds between requests to the same host
+MAX_TRIES = 3
+RETRY_SLEEP = 180            # longest wait after a 429 response
+
+
+class HostRateLimiter:
+    """Space out requests to each host by at least min_interval seconds, across threads."""
+    def __init__(self, min_interval: float = HOST_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    def wait(self, uri: str) -> None:
+        host = urlparse(uri).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class MetadataCache:
+    """
+    Content-addressed cache of URI metadata: each JSON document is stored once under the
+    sha256 of its content, and an index maps URIs to content hashes.
+    """
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(cache_dir, 'objects'), exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, 'objects', f"{digest}.json")
+
+    def get(self, uri: str) -> Optional[Dict]:
+        digest = self.index.get(uri)
+        if digest is None or not os.path.exists(self._object_path(digest)):
+            return None
+        with open(self._object_path(digest), 'r') as f:
+            return json.load(f)
+
+    def put(self, uri: str, metadata: Dict) -> None:
+        content = json.dumps(metadata, sort_keys=True).encode()
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                with open(path, 'wb') as f:
+                    f.write(content)
+            self.index[uri] = digest
+
+    def save(self) -> None:
+        with self._lock:
+            with open(self.index_path, 'w') as f:
+                json.dump(self.index, f)
+
+
 class EASSchema:
-    def __init__(self, name: str, schema_id: str, json_path: str):
+    def __init__(
+        self,
+        name: str,
+        schema_id: str,
+        json_path: str,
+        url: str = EAS_GRAPHQL_URL,
+        cache_dir: Optional[str] = None,
+        max_workers: int = METADATA_WORKERS
+    ):
         self.name = name
         self.schema_id = schema_id
         self.json_path = json_path
-        self.url = 'https://optimism.easscan.org/graphql'
+        self.state_path = f"{os.path.splitext(json_path)[0]}.state.json"
+        self.url = url
         self.query_limit = 100
+        self.max_workers = max_workers
+        self.cache = MetadataCache(cache_dir or os.path.join(os.path.dirname(json_path) or '.', '_metadata_cache'))
+        self.rate_limiter = HostRateLimiter()
         self.data = []
 
-    def fetch_attestations(self, time_created_after: int = 0) -> List[Dict]:
+    def fetch_attestations(self, time_created_after: int = 0, after_id: Optional[str] = None) -> List[Dict]:
+        """
+        Fetch attestations created after the (timeCreated, id) cursor, oldest first.
+
+        Pages are keyed on the last attestation seen rather than an offset, so every page
+        costs the same and attestations sharing a timestamp are neither skipped nor repeated.
+        """
         query = '''
-        query Attestations($schemaId: StringFilter!, $skip: Int!, $take: Int!, $timeCreatedAfter: IntFilter) {
-            attestations(where: {schemaId: $schemaId, timeCreated: $timeCreatedAfter}, take: $take, skip: $skip) {
+        query Attestations($where: AttestationWhereInput!, $take: Int!) {
+            attestations(where: $where, orderBy: [{timeCreated: asc}, {id: asc}], take: $take) {
                 id
                 attester
                 recipient
@@ -54,18 +141,18 @@ class EASSchema:
             }
         }
         '''
-        
-        variables = {
-            "schemaId": {"equals": self.schema_id},
-            "skip": 0,
-            "take": self.query_limit,
-            "timeCreatedAfter": {"gt": time_created_after},
-        }
 
         headers = {'Content-Type': 'application/json'}
         all_attestations = []
 
         while True:
+            after = {"timeCreated": {"gt": time_created_after}}
+            if after_id is not None:
+                after = {"OR": [after, {"timeCreated": {"equals": time_created_after}, "id": {"gt": after_id}}]}
+            variables = {
+                "where": {"schemaId": {"equals": self.schema_id}, **after},
+                "take": self.query_limit,
+            }
             payload = {'query': query, 'variables': variables}
 
             try:
@@ -79,7 +166,7 @@ class EASSchema:
                 if len(attestations) < self.query_limit:
                     break
 
-                variables["skip"] += self.query_limit
+                time_created_after, after_id = attestations[-1]['timeCreated'], attestations[-1]['id']
 
             except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
                 print(f"Failed to fetch attestations for {self.schema_id}: {str(e)}")
@@ -90,12 +177,25 @@ class EASSchema:
 
 
     @staticmethod
-    def get_metadata(uri: str, tries: int = 0, headers: Dict = {}, sleep: int = 180) -> Optional[Dict]:
-        if tries == 3:
+    def get_metadata(
+        uri: str,
+        tries: int = 0,
+        headers: Dict = {},
+        sleep: int = RETRY_SLEEP,
+        rate_limiter: Optional[HostRateLimiter] = None
+    ) -> Optional[Dict]:
+        if tries == MAX_TRIES:
             print("Too many tries.")
             return None
 
-        response = requests.get(uri, headers=headers)
+        if rate_limiter:
+            rate_limiter.wait(uri)
+        try:
+            response = requests.get(uri, headers=headers, timeout=60)
+        except requests.exceptions.RequestException as e:
+            print(f"Failed to fetch {uri}: {str(e)}")
+            return None
+
         if response.status_code == 200:
             try:
                 return response.json()
@@ -104,12 +204,38 @@ class EASSchema:
                 return None
         
         if response.status_code == 429:
-            time.sleep(sleep)
-            return EASSchema.get_metadata(uri, tries=tries+1)
+            # honour Retry-After if given, otherwise back off exponentially up to `sleep`
+            retry_after = response.headers.get('Retry-After', '')
+            wait = float(retry_after) if retry_after.isdigit() else 2 ** (tries + 1)
+            time.sleep(min(wait, sleep))
+            return EASSchema.get_metadata(uri, tries=tries+1, headers=headers, sleep=sleep, rate_limiter=rate_limiter)
         
         else:
             print(f"Error {response.status_code} at {uri}")
             return None
+
+    def fetch_metadata(self, uris: List[str]) -> Dict[str, Dict]:
+        """Fetch metadata for many URIs, from the cache or concurrently with per-host rate limits."""
+        metadata = {}
+        missing = []
+        for uri in dict.fromkeys(uris):
+            cached = self.cache.get(uri)
+            if cached is not None:
+                metadata[uri] = cached
+            else:
+                missing.append(uri)
+
+        def fetch(uri):
+            print(f"Fetching metadata: {uri}")
+            return uri, self.get_metadata(uri, rate_limiter=self.rate_limiter)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for uri, result in executor.map(fetch, missing):
+                if result:
+                    self.cache.put(uri, result)
+                    metadata[uri] = result
+        self.cache.save()
+        return metadata
         
 
     @staticmethod
@@ -121,9 +247,16 @@ class EASSchema:
             return all([result.scheme, result.netloc])
         except ValueError:
             return False
+
+    def find_uris(self, a: Dict) -> List[str]:
+        return [
+            obj['value']['value']
+            for obj in json.loads(a['decodedDataJson'])
+            if isinstance(obj['value']['value'], str) and self.is_valid_uri(obj['value']['value'])
+        ]
         
 
-    def process_attestation(self, a: Dict) -> Optional[Dict]:
+    def process_attestation(self, a: Dict, metadata: Optional[Dict[str, Dict]] = None) -> Optional[Dict]:
         attestation_data = {
             'id': a['id'],
             'attester': a['attester'],
@@ -137,44 +270,62 @@ class EASSchema:
             attestation_data[obj_name] = obj_value
             if isinstance(obj_value, str) and self.is_valid_uri(obj_value):
                 print(f"Found URI in field '{obj_name}': {obj_value}")
-                metadata = self.get_metadata(obj_value)
-                if metadata:
-                    attestation_data['metadata'] = metadata
+                if metadata is None:
+                    metadata = self.fetch_metadata([obj_value])
+                if metadata.get(obj_value):
+                    attestation_data['metadata'] = metadata[obj_value]
         return attestation_data
 
+    def load_cursor(self) -> Dict:
+        """
+        Last synced (timeCreated, id), falling back to the newest stored attestation.
+
+        The state file is only trusted while the data file it describes exists, so deleting
+        the data file triggers a full resync.
+        """
+        if os.path.exists(self.state_path) and os.path.exists(self.json_path):
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        if self.data:
+            last = max(self.data, key=lambda a: (a['timeCreated'], a['id']))
+            return {'timeCreated': last['timeCreated'], 'id': last['id']}
+        return {'timeCreated': 0, 'id': None}
+
 
     def fetch_and_dump(self):
-        if os.path.exists(self.json_path):
-            with open(self.json_path, 'r') as f:
-                self.data = json.load(f)
-            start_time = max(a['timeCreated'] for a in self.data)
-        else:
-            self.data = []
-            start_time = 0
+        """Sync new attestations into the local store; only attestations after the cursor are fetched."""
+        self.load_data(verbose=False)
+        cursor = self.load_cursor()
         
-        attestations = self.fetch_attestations(time_created_after=start_time)
+        attestations = self.fetch_attestations(time_created_after=cursor['timeCreated'], after_id=cursor['id'])
         if not attestations:
             return
+
+        known_ids = {a['id'] for a in self.data}
+        active = [a for a in attestations if not a['revocationTime'] and a['id'] not in known_ids]
+        metadata = self.fetch_metadata([uri for a in active for uri in self.find_uris(a)])
         
-        for a in attestations:
-            if a['revocationTime']:
-                continue
-            attestation_data = self.process_attestation(a)
+        for a in active:
+            attestation_data = self.process_attestation(a, metadata)
             if attestation_data:
                 self.data.append(attestation_data)
                 
         with open(self.json_path, "w") as f:
             json.dump(self.data, f, indent=2)
+        with open(self.state_path, "w") as f:
+            json.dump({'timeCreated': attestations[-1]['timeCreated'], 'id': attestations[-1]['id']}, f)
 
     def get_data(self):
         return self.data
 
-    def load_data(self):
+    def load_data(self, verbose: bool = True):
         if os.path.exists(self.json_path):
             with open(self.json_path, 'r') as f:
                 self.data = json.load(f)
         else:
-            print(f"No data file found at {self.json_path}")
+            self.data = []
+            if verbose:
+                print(f"No data file found at {self.json_path}")
 
     @staticmethod
     def convert_farcaster_id(farcaster_id):
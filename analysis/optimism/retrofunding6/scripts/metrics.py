@@ -1,121 +1,135 @@
+import pandas as pd
+
 
 PROJECT_UID = 'projectRegUID'
 
+COUNCILS = ['Anticapture Commission', 'Code of Conduct', 'Grants Council',
+            'Security Council', 'Developer Advisory Board', 'Feedback Commission']
+
+RATINGS = {'extremely_upset': 3, 'somewhat_upset': 2, 'neutral': 1}
+
 def calculate_metrics(df):
 
+    # count/average metrics are keyed by sorted project uid, the rest by order of appearance
+    stats = project_stats(df)
+    keyed = stats[stats.index.notna()].sort_index()
+
     return [
         {
             'name': 'count_total_attestations',
             'description': 'Number of Attestations',
-            'data': df.groupby(PROJECT_UID)['id'].count().to_dict()
+            'data': keyed['count_ids'].to_dict()
         },
         {
             'name': 'count_citizen_attestations',
             'description': 'Number of Attestations by Citizens',
-            'data': df[df['is_citizen']].groupby(PROJECT_UID)['id'].count().to_dict()
+            'data': keyed.loc[keyed['num_citizens'] > 0, 'count_citizen_ids'].to_dict()
         },
         {
             'name': 'count_delegate_attestations',
             'description': 'Number of Attestations by Top Delegates',
-            'data': df[df['is_top_delegate']].groupby(PROJECT_UID)['id'].count().to_dict()
+            'data': keyed.loc[keyed['num_top_delegates'] > 0, 'count_top_delegate_ids'].to_dict()
         },
         {
             'name': 'avg_nps_score',
             'description': 'Average NPS score of Citizens and Top Delegates',
-            'data': df.groupby(PROJECT_UID)['nps_score'].mean().to_dict()
+            'data': (keyed['sum_nps_score'] / keyed['count_nps_score']).to_dict()
         },
         {
             'name': 'most_positive_superlative',
             'description': 'Most positive superlative (20 reviews, 95% high PMF and 95% high NPS)',
-            'data': {
-                uid: most_positive_superlative(df, uid) 
-                for uid in df[PROJECT_UID].unique()
-            }
+            'data': most_positive_superlative(stats).to_dict()
         },
         {
             'name': 'cant_live_without_superlative',
             'description': "Can't live without superlative (20 reviews, 90% high PMF)",
-            'data': {
-                uid: cant_live_without_superlative(df, uid) 
-                for uid in df[PROJECT_UID].unique()
-            }
+            'data': cant_live_without_superlative(stats).to_dict()
         },
         {
             'name': 'percentage_distributions',
             'description': "Percentage distribution of different ratings by citizens and top delegates",
-            'data': {
-                uid: ratings_distribution(df, uid) 
-                for uid in df[PROJECT_UID].unique()
-            }
+            'data': ratings_distribution(stats)
         },
         {
             'name': 'elected_governance_reviews',
             'description': 'Reviews from elected governance members',
-            'data': {
-                uid: councils_distribution(df, uid) 
-                for uid in df[PROJECT_UID].unique()
-            }
+            'data': councils_distribution(df, stats.index)
         }
     ]
 
-def most_positive_superlative(df, ref_uid):
-    """Determine if a project has 20 reviews and 95% positive PMF and NPS."""
-    dff = df[df[PROJECT_UID] == ref_uid]
-    num_reviews = len(dff)
-    pmf_pos_reviews = (dff['pmf_score'] > 2).sum() / num_reviews
-    nps_pos_reviews = (dff['nps_score'] > 8).sum() / num_reviews
-    
-    result = (num_reviews >= 20) and (pmf_pos_reviews >= .95) and (nps_pos_reviews >= .95)
-    return bool(result)
-
-def cant_live_without_superlative(df, ref_uid):
-    """Determine if a project has 20 reviews and 90% positive PMF."""
-    dff = df[df[PROJECT_UID] == ref_uid]
-    num_reviews = len(dff)
-    pmf_pos_reviews = (dff['pmf_score'] > 2).sum() / num_reviews
-    result = (num_reviews >= 20) and (pmf_pos_reviews >= .90)
-    return bool(result)
-
-def ratings_distribution(df, ref_uid):
+def project_stats(df):
+    """Count and sum every per-review indicator in one groupby over projects (in order of appearance)."""
+    is_citizen = df['is_citizen'] == True
+    is_top_delegate = df['is_top_delegate'] == True
+    has_id = df['id'].notna()
+    indicators = {
+        'num_reviews': pd.Series(1, index=df.index),
+        'count_ids': has_id,
+        'num_citizens': is_citizen,
+        'count_citizen_ids': has_id & is_citizen,
+        'num_top_delegates': is_top_delegate,
+        'count_top_delegate_ids': has_id & is_top_delegate,
+        'sum_nps_score': df['nps_score'].fillna(0),
+        'count_nps_score': df['nps_score'].notna(),
+        'pmf_positive': df['pmf_score'] > 2,
+        'nps_positive': df['nps_score'] > 8
+    }
+    for rating, score in RATINGS.items():
+        indicators[f'citizens_{rating}'] = is_citizen & (df['pmf_score'] == score)
+        indicators[f'top_delegates_{rating}'] = is_top_delegate & (df['pmf_score'] == score)
+
+    indicators = pd.DataFrame(indicators)
+    indicators = indicators.astype({c: int for c in indicators.columns if c != 'sum_nps_score'})
+    return indicators.groupby(df[PROJECT_UID], sort=False, dropna=False).sum()
+
+def most_positive_superlative(stats):
+    """Determine which projects have 20 reviews and 95% positive PMF and NPS."""
+    pmf_pos_reviews = stats['pmf_positive'] / stats['num_reviews']
+    nps_pos_reviews = stats['nps_positive'] / stats['num_reviews']
+    return (stats['num_reviews'] >= 20) & (pmf_pos_reviews >= .95) & (nps_pos_reviews >= .95)
+
+def cant_live_without_superlative(stats):
+    """Determine which projects have 20 reviews and 90% positive PMF."""
+    pmf_pos_reviews = stats['pmf_positive'] / stats['num_reviews']
+    return (stats['num_reviews'] >= 20) & (pmf_pos_reviews >= .90)
+
+def ratings_distribution(stats):
     """Calculate distribution of ratings by citizens and top delegates."""
-    dff = df[df[PROJECT_UID] == ref_uid]
-    dff_citizens = dff[dff['is_citizen'] == True]
-    dff_delegates = dff[dff['is_top_delegate'] == True]
 
-    def calculate_distribution(group, score):
-        total = len(group)
+    def calculate_distribution(row, group, rating):
+        total = row[f'num_{group}']
         if not total:
             return None
-        return (group['pmf_score'] == score).sum() / total
-    
+        return row[f'{group}_{rating}'] / total
+
     return {
-        'citizens': {
-            'extremely_upset': calculate_distribution(dff_citizens, 3),
-            'somewhat_upset': calculate_distribution(dff_citizens, 2),
-            'neutral': calculate_distribution(dff_citizens, 1)
-        },
-        'top_delegates': {
-            'extremely_upset': calculate_distribution(dff_delegates, 3),
-            'somewhat_upset': calculate_distribution(dff_delegates, 2),
-            'neutral': calculate_distribution(dff_delegates, 1)
+        uid: {
+            'citizens': {rating: calculate_distribution(row, 'citizens', rating) for rating in RATINGS},
+            'top_delegates': {rating: calculate_distribution(row, 'top_delegates', rating) for rating in RATINGS}
         }
+        for uid, row in stats.iterrows()
     }
 
-def councils_distribution(df, ref_uid):
-    """Calculate distribution of reviews by governance members."""
-    dff = df[df[PROJECT_UID] == ref_uid]
-    result = {}
-    councils = ['Anticapture Commission', 'Code of Conduct', 'Grants Council', 
-                'Security Council', 'Developer Advisory Board', 'Feedback Commission']
-    for council in councils:
-        dff_council = dff[dff['governance_membership'].apply(lambda x: isinstance(x, set) and council in x)]
-        if dff_council.empty:
-            continue
-        result.update({
-            council.replace(' ', '_').lower(): {
-                'count_attestations': len(dff_council),
-                'avg_pmf_score': dff_council['pmf_score'].mean(),
-                'avg_nps_score': dff_council['nps_score'].mean()
-            }
-        })
-    return result
\ No newline at end of file
+def councils_distribution(df, project_uids):
+    """Calculate distribution of reviews by governance members, via one row per (review, council)."""
+    reviews = (
+        df[[PROJECT_UID, 'pmf_score', 'nps_score']]
+        .assign(council=df['governance_membership'].apply(lambda x: list(x) if isinstance(x, set) else []))
+        .explode('council')
+    )
+    reviews = reviews[reviews['council'].isin(COUNCILS)]
+    reviews['council'] = pd.Categorical(reviews['council'], categories=COUNCILS)
+    council_stats = (
+        reviews
+        .groupby([PROJECT_UID, 'council'], observed=True, dropna=False)
+        .agg(count_attestations=('council', 'size'), avg_pmf_score=('pmf_score', 'mean'), avg_nps_score=('nps_score', 'mean'))
+    )
+
+    result = {uid: {} for uid in project_uids}
+    for (uid, council), row in council_stats.iterrows():
+        result[uid][council.replace(' ', '_').lower()] = {
+            'count_attestations': int(row['count_attestations']),
+            'avg_pmf_score': row['avg_pmf_score'],
+            'avg_nps_score': row['avg_nps_score']
+        }
+    return result
@@ -1,95 +1,126 @@
-from collections import defaultdict
 import numpy as np
 import pandas as pd
 
+from scripts.allocation import (
+    capped_allocations, column_medians, initial_allocations, sort_columns, subset_medians
+)
+
 
 MIN_REWARD_PER_PROJECT = 1_000
 MAX_REWARD_PER_PROJECT_PCT = .125
 
-def scorer(ballots_data):
-           
-    budget_allocation = []
-    category_scores = defaultdict(list)
-    project_scores = defaultdict(lambda: defaultdict(list))
+def ballot_tensor(ballots_data):
+    """
+    Collect ballots into NaN-masked arrays.
+
+    Returns a dict with the voter addresses, categories and projects, the voters' budgets,
+    category percentages (voters x categories), project percentages
+    (voters x categories x projects, filled in the voter's assigned category only) and
+    the categories in the order they first received project votes as an assignment.
+    """
+    categories, projects = {}, {}
+    voted_categories = {}
+    category_rows, project_rows = [], []
     for ballot in ballots_data:
-        
-        budget_allocation.append(ballot['budget'])
-        assigned_category = ballot['category_assignment']
-
+        category_row = {}
         for category_allocations in ballot['category_allocations']:
             category = list(category_allocations.keys())[0]
-            category_percentage = float(list(category_allocations.values())[0])
-            category_scores[category].append(category_percentage)
+            category_row[categories.setdefault(category, len(categories))] = float(list(category_allocations.values())[0])
+        category_rows.append(category_row)
 
+        assigned_category = categories.setdefault(ballot['category_assignment'], len(categories))
+        project_row = {}
         for project_allocations in ballot['project_allocations']:
             project = list(project_allocations.keys())[0]
             project_percentage = list(project_allocations.values())[0]
             if pd.isnull(project_percentage):
                 continue
-            project_percentage = float(project_percentage)
-            project_scores[assigned_category][project].append(project_percentage)    
+            project_row[(assigned_category, projects.setdefault(project, len(projects)))] = float(project_percentage)
+            voted_categories.setdefault(assigned_category)
+        project_rows.append(project_row)
+
+    category_percentages = np.full((len(ballots_data), len(categories)), np.nan)
+    project_percentages = np.full((len(ballots_data), len(categories), len(projects)), np.nan)
+    for i, (category_row, project_row) in enumerate(zip(category_rows, project_rows)):
+        category_percentages[i, list(category_row.keys())] = list(category_row.values())
+        for (category, project), percentage in project_row.items():
+            project_percentages[i, category, project] = percentage
+
+    return {
+        'voters': [ballot.get('voter_address') for ballot in ballots_data],
+        'budgets': np.array([ballot['budget'] for ballot in ballots_data], dtype=float),
+        'categories': list(categories),
+        'projects': list(projects),
+        'voted_categories': list(voted_categories),
+        'category_percentages': category_percentages,
+        'project_percentages': project_percentages
+    }
+
+
+def ballot_columns(tensor):
+    """
+    Flatten a ballot tensor into one (voters x columns) matrix of everything that is
+    aggregated by median: the budget, each category, and each voted (category, project) pair.
+
+    Returns (matrix, category index, project index) with the indices of the pair columns.
+    """
+    project_percentages = tensor['project_percentages']
+    category_index, project_index = np.nonzero(~np.isnan(project_percentages).all(axis=0))
+    matrix = np.column_stack([
+        tensor['budgets'],
+        tensor['category_percentages'],
+        project_percentages[:, category_index, project_index]
+    ])
+    return matrix, category_index, project_index
+
+
+def rewards_from_medians(medians, tensor, category_index, project_index):
+    """
+    Score projects from column medians of ballot_columns, batched over leading dimensions.
+
+    Returns (rewards, median budgets, initial allocations); projects without votes have
+    NaN initial allocations.
+    """
+    medians = np.asarray(medians)
+    num_categories, num_projects = len(tensor['categories']), len(tensor['projects'])
+    median_budget = medians[..., 0]
+    category_medians = medians[..., 1:1 + num_categories] / 100
+    project_medians = np.full(medians.shape[:-1] + (num_categories, num_projects), np.nan)
+    project_medians[..., category_index, project_index] = medians[..., 1 + num_categories:] / 100
+
+    initial = initial_allocations(category_medians, project_medians, median_budget)
+    rewards = capped_allocations(
+        initial,
+        budget=median_budget,
+        max_cap=median_budget * MAX_REWARD_PER_PROJECT_PCT,
+        min_reward=MIN_REWARD_PER_PROJECT
+    )
+    return rewards, median_budget, initial
 
-    # Step 1A. Calculate total funding for the round based on median budget vote
-    median_total_budget = np.median(budget_allocation)
-    max_reward_per_project = median_total_budget * MAX_REWARD_PER_PROJECT_PCT
-    print(f"\nMedian Budget: {median_total_budget:,.0f}")
 
-    # Step 1B. Calculate medians for categories and normalize to weights across categories
-    category_medians = {k: np.median(v)/100 for k, v in category_scores.items()}    
-    category_total = sum(category_medians.values())
-    category_weights = {k: v/category_total for k, v in category_medians.items()}
+def scorer(ballots_data):
 
-    # Step 2. Calculate medians for projects and normalize to weights within a category
-    project_weights = defaultdict(lambda: defaultdict(list))
-    for category, project_dict in project_scores.items():
+    tensor = ballot_tensor(ballots_data)
+    matrix, category_index, project_index = ballot_columns(tensor)
+    medians = column_medians(sort_columns(matrix))
+    rewards, median_total_budget, initial = rewards_from_medians(medians, tensor, category_index, project_index)
+    print(f"\nMedian Budget: {median_total_budget:,.0f}")
 
-        print("\nCategory:", category)
+    # Category weights, for the categories with project votes
+    num_categories = len(tensor['categories'])
+    category_medians = medians[1:1 + num_categories]
+    category_weights = category_medians / np.nansum(category_medians)
+    for i in tensor['voted_categories']:
+        print("\nCategory:", tensor['categories'][i])
         print("-----------------")
-        print(f"Median Allocation: {category_weights[category]*100:.3f}%")
-
-        for project, scores in project_dict.items():
-            project_weights[category][project] = np.median(scores) / 100
-        category_subtotal = sum(project_weights[category].values())
-        for k, v in project_weights[category].items():
-            project_weights[category][k] = v/category_subtotal 
-
-    # Step 3. Create an initial series of project funding allocations
-    initial_project_allocations = pd.Series()
-    for category, projects in project_weights.items():
-        for project, score in projects.items():
-            normalized_score = score * category_weights[category]
-            initial_project_allocations.loc[project] = normalized_score * median_total_budget
-    
-    # Helper function to allocate funding
-    def allocate_funding(project_scores, funding_balance):
-        score_balance = project_scores.sum()
-        allocations = pd.Series()
-        
-        for project, score in project_scores.sort_values(ascending=False).items():
-            uncapped_funding_alloc = score / score_balance * funding_balance
-            capped_funding_alloc = min(uncapped_funding_alloc, max_reward_per_project)
-            allocations.loc[project] = capped_funding_alloc
-            funding_balance -= capped_funding_alloc
-            score_balance -= score
-
-        return allocations
-    
-    # Step 4. Implement max cap and redistribute excess
-    capped_allocations = allocate_funding(initial_project_allocations, median_total_budget)
-
-    # Step 5. Set the funding for projects below the minimum cap to 0
-    capped_allocations.loc[capped_allocations < MIN_REWARD_PER_PROJECT] = 0
-
-    # Step 6. Allocate the remaining funding to projects below the maximum cap
-    max_cap_funding = capped_allocations[capped_allocations == max_reward_per_project].sum()
-    remaining_funding = median_total_budget - max_cap_funding
-    remaining_projects = capped_allocations[capped_allocations < max_reward_per_project]
-    capped_allocations.update(allocate_funding(remaining_projects, funding_balance=remaining_funding))
+        print(f"Median Allocation: {category_weights[i]*100:.3f}%")
 
     # Return the capped allocations as a DataFrame
-    results_dataframe = capped_allocations.copy().rename('rewards').reset_index()
-    results_dataframe.rename(columns={'index': 'project_id'}, inplace=True)
-    results_dataframe.set_index('project_id', inplace=True)
+    funded = ~np.isnan(initial)
+    results_dataframe = pd.DataFrame(
+        {'rewards': rewards[funded]},
+        index=pd.Index(np.array(tensor['projects'], dtype=object)[funded], name='project_id')
+    ).sort_values('rewards', ascending=False)
 
     return results_dataframe
 
@@ -102,4 +133,23 @@ def simulate_scorer(ballots_data, addresses):
             filtered_data.append(ballot)
 
     return scorer(filtered_data)
-    
+
+
+def simulate_scorer_batch(ballots_data, address_sets, scenario_names=None):
+    """
+    Score many voter subsets at once, e.g. leave-one-out scenarios.
+
+    Returns a DataFrame of rewards with one row per project and one column per address set.
+    """
+    tensor = ballot_tensor(ballots_data)
+    matrix, category_index, project_index = ballot_columns(tensor)
+    voters = np.array(tensor['voters'], dtype=object)
+    voter_mask = np.array([np.isin(voters, list(addresses)) for addresses in address_sets])
+    medians = subset_medians(sort_columns(matrix), voter_mask)
+    rewards, _, _ = rewards_from_medians(medians, tensor, category_index, project_index)
+
+    return pd.DataFrame(
+        rewards.T,
+        index=pd.Index(tensor['projects'], name='project_id'),
+        columns=scenario_names if scenario_names is not None else range(len(address_sets))
+    )
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from scripts.allocation import column_medians, leave_one_out_medians, sort_columns, subset_medians
+from scripts.scorer import ballot_columns, ballot_tensor, rewards_from_medians
+
+
+def _prepare(ballots_data):
+    tensor = ballot_tensor(ballots_data)
+    matrix, category_index, project_index = ballot_columns(tensor)
+    columns = sort_columns(matrix)
+    baseline, _, _ = rewards_from_medians(column_medians(columns), tensor, category_index, project_index)
+    return tensor, columns, category_index, project_index, baseline
+
+
+def leave_one_out(ballots_data):
+    """
+    Rewards with each voter's ballot left out in turn.
+
+    All leave-one-out medians come from a single sort of the ballot columns. Returns a
+    DataFrame with one row per project, a 'baseline' column with the full results and one
+    column per voter.
+    """
+    tensor, columns, category_index, project_index, baseline = _prepare(ballots_data)
+    rewards, _, _ = rewards_from_medians(leave_one_out_medians(columns), tensor, category_index, project_index)
+
+    results = pd.DataFrame(rewards.T, index=pd.Index(tensor['projects'], name='project_id'), columns=tensor['voters'])
+    results.insert(0, 'baseline', baseline)
+    return results
+
+
+def voter_influence(ballots_data):
+    """
+    Audit how much each voter's ballot moves the results.
+
+    Returns a DataFrame indexed by voter with the total funding that moves between projects
+    when the voter is left out, the largest single project change and the project it hits,
+    sorted by funding moved.
+    """
+    results = leave_one_out(ballots_data)
+    changes = results.drop(columns='baseline').sub(results['baseline'], axis=0)
+    return pd.DataFrame({
+        'funding_moved': changes.abs().sum() / 2,
+        'max_project_change': changes.abs().max(),
+        'most_affected_project': changes.abs().idxmax(),
+        'projects_changed': (changes.abs() > 1).sum()
+    }).rename_axis('voter_address').sort_values('funding_moved', ascending=False)
+
+
+def subset_sensitivity(ballots_data, num_subsets=1000, subset_share=0.8, confidence=0.9, seed=None):
+    """
+    Rewards over random voter subsets, each keeping subset_share of the voters.
+
+    Subset medians are selected by rank from the pre-sorted ballot columns rather than
+    re-scoring each subset. Returns a DataFrame indexed by project with the baseline
+    rewards, the mean, std and central `confidence` interval over subsets, and the share
+    of subsets in which the project is funded.
+    """
+    tensor, columns, category_index, project_index, baseline = _prepare(ballots_data)
+    rng = np.random.default_rng(seed)
+    num_voters = len(tensor['voters'])
+    subset_size = max(1, int(round(subset_share * num_voters)))
+    picks = np.argsort(rng.random((num_subsets, num_voters)), axis=1)[:, :subset_size]
+    voter_mask = np.zeros((num_subsets, num_voters), dtype=bool)
+    np.put_along_axis(voter_mask, picks, True, axis=1)
+
+    rewards, _, _ = rewards_from_medians(subset_medians(columns, voter_mask), tensor, category_index, project_index)
+    tail = (1 - confidence) / 2
+    lower, upper = np.quantile(rewards, [tail, 1 - tail], axis=0)
+    return pd.DataFrame(
+        {
+            'rewards': baseline,
+            'rewards_mean': rewards.mean(axis=0),
+            'rewards_std': rewards.std(axis=0),
+            'rewards_lower': lower,
+            'rewards_upper': upper,
+            'funded_share': (rewards > 0).mean(axis=0)
+        },
+        index=pd.Index(tensor['projects'], name='project_id')
+    ).sort_values('rewards', ascending=False)
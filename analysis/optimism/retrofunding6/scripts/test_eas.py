@@ -0,0 +1,173 @@
+"""
+Tests for the incremental EAS sync against a local mock GraphQL / metadata server.
+
+Run from this directory with `python -m pytest test_eas.py` or `python -m unittest test_eas`.
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from eas import EASSchema, HostRateLimiter
+
+
+SCHEMA_ID = "0xtest"
+
+
+def make_attestation(i: int, time_created: int, uri: str = None, revoked: bool = False) -> dict:
+    value = uri if uri is not None else f"project-{i}"
+    return {
+        "id": f"0x{i:04d}",
+        "attester": "0xAttester",
+        "recipient": "0xRecipient",
+        "refUID": "0x0",
+        "revocable": True,
+        "revocationTime": 1 if revoked else 0,
+        "expirationTime": 0,
+        "timeCreated": time_created,
+        "decodedDataJson": json.dumps([{"name": "projectURI", "value": {"value": value}}]),
+    }
+
+
+def matches(attestation: dict, where: dict) -> bool:
+    """Evaluate the subset of the EAS `where` filter used by EASSchema.fetch_attestations."""
+    for field, condition in where.items():
+        if field == "OR":
+            if not any(matches(attestation, clause) for clause in condition):
+                return False
+            continue
+        value = attestation["schemaId"] if field == "schemaId" else attestation[field]
+        for op, operand in condition.items():
+            if op == "equals" and value != operand:
+                return False
+            if op == "gt" and not value > operand:
+                return False
+    return True
+
+
+class MockEAS:
+    """GraphQL endpoint serving an in-memory attestation list, plus JSON metadata documents."""
+
+    def __init__(self):
+        self.attestations = []
+        self.graphql_requests = []
+        self.metadata_requests = []
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, body):
+                content = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                variables = payload["variables"]
+                mock.graphql_requests.append(variables)
+                rows = sorted(
+                    (a for a in mock.attestations if matches(a, variables["where"])),
+                    key=lambda a: (a["timeCreated"], a["id"])
+                )[:variables["take"]]
+                self._send_json({"data": {"attestations": [
+                    {k: v for k, v in a.items() if k != "schemaId"} for a in rows
+                ]}})
+
+            def do_GET(self):
+                mock.metadata_requests.append(self.path)
+                self._send_json({"path": self.path})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def add(self, *attestations):
+        for a in attestations:
+            self.attestations.append({**a, "schemaId": SCHEMA_ID})
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class IncrementalSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmp_dir.name, "566.json")
+        self.mock = MockEAS().__enter__()
+
+    def tearDown(self):
+        self.mock.__exit__()
+        self.tmp_dir.cleanup()
+
+    def schema(self) -> EASSchema:
+        schema = EASSchema(name="Test", schema_id=SCHEMA_ID, json_path=self.json_path, url=f"{self.mock.url}/graphql")
+        schema.query_limit = 2
+        schema.rate_limiter = HostRateLimiter(min_interval=0)
+        return schema
+
+    def stored_ids(self):
+        with open(self.json_path) as f:
+            return [a["id"] for a in json.load(f)]
+
+    def test_pages_through_shared_timestamps(self):
+        # Five attestations with the same timestamp span three pages of two
+        self.mock.add(*(make_attestation(i, 100) for i in range(5)))
+        self.schema().fetch_and_dump()
+        self.assertEqual(self.stored_ids(), [f"0x{i:04d}" for i in range(5)])
+        self.assertEqual(len(self.mock.graphql_requests), 3)
+
+    def test_incremental_sync_fetches_only_new_attestations(self):
+        self.mock.add(make_attestation(0, 100), make_attestation(1, 101, revoked=True))
+        self.schema().fetch_and_dump()
+        self.assertEqual(self.stored_ids(), ["0x0000"])
+
+        self.mock.add(make_attestation(2, 102))
+        self.mock.graphql_requests.clear()
+        self.schema().fetch_and_dump()
+        self.assertEqual(self.stored_ids(), ["0x0000", "0x0002"])
+        # The revoked attestation is behind the saved cursor and is not requested again
+        first_where = self.mock.graphql_requests[0]["where"]
+        self.assertEqual(first_where["OR"][1], {"timeCreated": {"equals": 101}, "id": {"gt": "0x0001"}})
+
+    def test_deleting_data_file_resyncs(self):
+        self.mock.add(*(make_attestation(i, 100 + i) for i in range(3)))
+        self.schema().fetch_and_dump()
+        os.remove(self.json_path)
+
+        self.schema().fetch_and_dump()
+        self.assertEqual(self.stored_ids(), ["0x0000", "0x0001", "0x0002"])
+
+    def test_metadata_is_fetched_once_per_uri(self):
+        uri = f"{self.mock.url}/metadata/shared"
+        self.mock.add(make_attestation(0, 100, uri), make_attestation(1, 101, uri))
+        self.schema().fetch_and_dump()
+        self.assertEqual(self.mock.metadata_requests, ["/metadata/shared"])
+
+        with open(self.json_path) as f:
+            stored = json.load(f)
+        self.assertEqual([a["metadata"] for a in stored], [{"path": "/metadata/shared"}] * 2)
+
+        # A fresh sync of the same URI is served from the metadata cache
+        os.remove(self.json_path)
+        self.schema().fetch_and_dump()
+        self.assertEqual(self.mock.metadata_requests, ["/metadata/shared"])
+
+
+if __name__ == "__main__":
+    unittest.main()
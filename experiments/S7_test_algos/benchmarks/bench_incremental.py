@@ -0,0 +1,64 @@
+"""
+Benchmark IncrementalDevtoolingCalculator.add_month against a full rerun.
+
+Run from experiments/S7_test_algos:
+
+    python -m benchmarks.bench_incremental --events 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_unweighted_graph import make_synthetic_data
+from models.devtooling_openrank import DevtoolingCalculator, IncrementalDevtoolingCalculator, load_config
+
+
+CONFIG_PATH = 'weights/devtooling_openrank_testing.yaml'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--events', type=int, default=1_000_000)
+    parser.add_argument('--developers', type=int, default=50_000)
+    parser.add_argument('--onchain', type=int, default=2_000)
+    parser.add_argument('--devtooling', type=int, default=2_000)
+    parser.add_argument('--overlap', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"Generating {args.events:,} synthetic events...")
+    df_onchain, df_devtooling, df_dependencies, df_devs2projects = make_synthetic_data(
+        args.events, args.developers, args.onchain, args.devtooling, args.overlap
+    )
+
+    _, config = load_config(CONFIG_PATH)
+    config.eigentrust = {**config.eigentrust, 'engine': 'native'}
+    rng = np.random.default_rng(1)
+    for df, weights in [
+        (df_onchain, config.onchain_project_pretrust_weights),
+        (df_devtooling, config.devtooling_project_pretrust_weights)
+    ]:
+        for col in weights:
+            df[col] = rng.integers(1, 10_000, len(df))
+
+    last_month = df_devs2projects['event_month'].max()
+    is_last = df_devs2projects['event_month'] == last_month
+
+    incremental = IncrementalDevtoolingCalculator(config)
+    incremental.run_analysis(df_onchain, df_devtooling, df_dependencies, df_devs2projects[~is_last])
+    start = time.perf_counter()
+    warm = incremental.add_month(df_devs2projects[is_last])['eigentrust_diagnostics']
+    warm_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cold = DevtoolingCalculator(config).run_analysis(
+        df_onchain, df_devtooling, df_dependencies, df_devs2projects
+    )['eigentrust_diagnostics']
+    cold_time = time.perf_counter() - start
+
+    print(f"add_month:  {warm_time:.2f}s, {warm['iterations']} iterations (warm start)")
+    print(f"full rerun: {cold_time:.2f}s, {cold['iterations']} iterations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark DevtoolingCalculator._build_unweighted_graph on a synthetic
+developers_to_projects frame.
+
+Run from experiments/S7_test_algos:
+
+    python -m benchmarks.bench_unweighted_graph --events 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from models.devtooling_openrank import DevtoolingCalculator, SimulationConfig
+
+
+EVENT_TYPES = ['COMMIT_CODE', 'STARRED', 'FORKED', 'ISSUE_OPENED', 'PULL_REQUEST_OPENED', 'ISSUE_COMMENT']
+
+
+def make_synthetic_data(
+    num_events: int,
+    num_developers: int,
+    num_onchain: int,
+    num_devtooling: int,
+    num_overlap: int,
+    seed: int = 0
+):
+    """Build random inputs, with `num_overlap` projects that are both onchain and devtooling."""
+    rng = np.random.default_rng(seed)
+    onchain_ids = [f"onchain_{k}" for k in range(num_onchain)]
+    devtooling_ids = [f"devtooling_{k}" for k in range(num_devtooling - num_overlap)] + onchain_ids[:num_overlap]
+
+    df_onchain = pd.DataFrame({'project_id': onchain_ids, 'display_name': onchain_ids})
+    df_devtooling = pd.DataFrame({'project_id': devtooling_ids, 'display_name': devtooling_ids})
+    df_dependencies = pd.DataFrame({
+        'onchain_builder_project_id': rng.choice(onchain_ids, num_onchain * 10),
+        'devtooling_project_id': rng.choice(devtooling_ids, num_onchain * 10),
+        'dependency_source': 'NPM'
+    })
+
+    all_projects = np.array(onchain_ids + devtooling_ids[:num_devtooling - num_overlap])
+    developer_ids = np.array([f"dev_{k}" for k in range(num_developers)])
+    dev_idx = rng.integers(0, num_developers, num_events)
+    months = pd.date_range('2024-01-01', periods=12, freq='MS').to_numpy()
+    df_devs2projects = pd.DataFrame({
+        'developer_id': developer_ids[dev_idx],
+        'developer_name': developer_ids[dev_idx],
+        'project_id': all_projects[rng.integers(0, len(all_projects), num_events)],
+        'event_month': months[rng.integers(0, len(months), num_events)],
+        'event_type': np.array(EVENT_TYPES)[rng.integers(0, len(EVENT_TYPES), num_events)]
+    })
+    return df_onchain, df_devtooling, df_dependencies, df_devs2projects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--events', type=int, default=10_000_000)
+    parser.add_argument('--developers', type=int, default=200_000)
+    parser.add_argument('--onchain', type=int, default=2_000)
+    parser.add_argument('--devtooling', type=int, default=2_000)
+    parser.add_argument('--overlap', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Generating {args.events:,} synthetic events...")
+    df_onchain, df_devtooling, df_dependencies, df_devs2projects = make_synthetic_data(
+        args.events, args.developers, args.onchain, args.devtooling, args.overlap
+    )
+
+    config = SimulationConfig(
+        alpha=0.2,
+        time_decay={},
+        onchain_project_pretrust_weights={},
+        devtooling_project_pretrust_weights={},
+        event_type_weights={},
+        link_type_weights={},
+        eligibility_thresholds={}
+    )
+    calculator = DevtoolingCalculator(config)
+    calculator.analysis = {
+        'onchain_projects': df_onchain,
+        'devtooling_projects': df_devtooling,
+        'project_dependencies': df_dependencies,
+        'developers_to_projects': df_devs2projects
+    }
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        calculator._build_unweighted_graph()
+        timings.append(time.perf_counter() - start)
+
+    num_edges = len(calculator.analysis['unweighted_edges'])
+    best = min(timings)
+    print(f"_build_unweighted_graph: best {best:.2f}s of {args.repeat} "
+          f"({args.events / best:,.0f} events/s, {num_edges:,} edges)")
+
+
+if __name__ == "__main__":
+    main()
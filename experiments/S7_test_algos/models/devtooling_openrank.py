@@ -1,11 +1,27 @@
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+import copy
+from dataclasses import dataclass, field
+import itertools
+import json
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, Tuple
+from pathlib import Path
+import sys
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import yaml
 import warnings
 
 from openrank_sdk import EigenTrust
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.utils.allocator import AllocationConfig
+from models.utils.analysis import MATERIALIZE_MODES, LazyAnalysis
+from models.utils.eigentrust import (
+    TrustGraph, build_trust_graph, patch_trust_graph, solve_eigentrust, run_eigentrust_batch, batch_size,
+    DEFAULT_BATCH_BYTES, DEFAULT_TOLERANCE, DEFAULT_MAX_ITERATIONS
+)
+from models.utils.robustness import DEFAULT_CHUNK_SIZE, sample_allocations, summarize_allocations
+from models.utils.snapshot import TableSchema, load_table
 warnings.filterwarnings('ignore', message='Defaulting to the \'raw\' score scale*')
 
 
@@ -16,6 +32,7 @@ class DataSnapshot:
     devtooling_projects_file: str
     project_dependencies_file: str
     developers_to_projects_file: str
+    backend: str = 'csv'
 
 
 @dataclass
@@ -27,6 +44,34 @@ class SimulationConfig:
     event_type_weights: Dict[str, float]
     link_type_weights: Dict[str, float]
     eligibility_thresholds: Dict[str, int]
+    eigentrust: Dict[str, Any] = field(default_factory=dict)
+    reputation_dtype: str = 'float64'
+    value_flow: Dict[str, Any] = field(default_factory=dict)
+    materialize: str = 'eager'
+
+
+# Analysis entries that only depend on the input data and pretrust settings,
+# and can therefore be shared across runs that only change edge weights or alpha
+SHARED_ANALYSIS_KEYS = (
+    'onchain_projects',
+    'devtooling_projects',
+    'project_dependencies',
+    'developers_to_projects',
+    'unweighted_edges',
+    'onchain_projects_pretrust_scores',
+    'devtooling_projects_pretrust_scores',
+    'developer_reputation'
+)
+
+# Value flow outputs (step 8), never built in 'scores' mode
+VALUE_FLOW_KEYS = ('detailed_value_flow_graph', 'value_flow_diagnostics')
+
+# Config fields that feed steps 2-4 (pretrust and developer reputation)
+PRETRUST_CONFIG_FIELDS = (
+    'onchain_project_pretrust_weights',
+    'devtooling_project_pretrust_weights',
+    'reputation_dtype'
+)
 
 
 class DevtoolingCalculator:
@@ -48,9 +93,15 @@ class DevtoolingCalculator:
     This ensures devtooling projects earn value by being useful to onchain projects.
     """
 
+    # Intermediate entries kept in 'scores' mode (state needed by later updates)
+    SCORES_RETAINED_KEYS: Tuple[str, ...] = ()
+    # Keep the native engine's transition matrix in self.trust_graph after solving
+    RETAIN_TRUST_GRAPH = False
+
     def __init__(self, config: SimulationConfig):
         self.config = config
         self.analysis = {}
+        self.trust_graph: Optional[TrustGraph] = None
 
     # --------------------------------------------------------------------
     # Main pipeline (entry to final 'analysis' outputs)
@@ -73,27 +124,178 @@ class DevtoolingCalculator:
 
         Returns:
             Dict[str, pd.DataFrame]: Dictionary containing analysis results and intermediate data
+            (a LazyAnalysis unless config.materialize is 'eager')
         """
+        materialize = self.config.materialize
+        if materialize not in MATERIALIZE_MODES:
+            raise ValueError(f"Invalid materialize mode: {materialize}")
+
         # Store raw input data frames
-        self.analysis = {
+        self.analysis = {} if materialize == 'eager' else LazyAnalysis()
+        self.analysis.update({
             'onchain_projects': df_onchain_projects,
             'devtooling_projects': df_devtooling_projects,
             'project_dependencies': df_project_dependencies,
             'developers_to_projects': df_developers_to_projects
-        }
+        })
 
         # Run analysis pipeline steps
-        self._build_unweighted_graph()
-        self._compute_onchain_project_pretrust()
-        self._compute_devtooling_project_pretrust()
-        self._compute_developer_reputation()
+        if materialize == 'lazy':
+            self._register_steps()
+        elif materialize == 'scores':
+            self._run_scores_only()
+        else:
+            for step, _ in self._pipeline_steps():
+                step()
+            self._serialize_value_flow()
+
+        return self.analysis
+
+    def _pipeline_steps(self) -> List[Tuple[Callable[[], Any], Tuple[str, ...]]]:
+        """
+        Steps 1-7 in order, each with the intermediate entries it is the last reader of.
+        The edge index is built as its own step so the weighted edges can be released
+        before ranking.
+        """
+        return [
+            (self._build_unweighted_graph, ()),
+            (self._compute_onchain_project_pretrust, ()),
+            (self._compute_devtooling_project_pretrust, ()),
+            (self._compute_developer_reputation, ()),
+            (self._weight_edges, ('unweighted_edges',)),
+            (self._apply_eigentrust, (
+                'onchain_projects_pretrust_scores',
+                'devtooling_projects_pretrust_scores',
+                'developer_reputation'
+            )),
+            (self._get_edge_index, ('weighted_edges',)),
+            (self._rank_and_evaluate_projects, ('edge_index',))
+        ]
+
+    def _register_steps(self) -> None:
+        """
+        Register every pipeline step with the LazyAnalysis ('lazy' mode), so each
+        entry is computed on first access together with the entries it depends on.
+        Steps that produce two entries are registered under both.
+        """
+        analysis = self.analysis
+        analysis.register('unweighted_edges', self._build_unweighted_graph)
+        analysis.register('onchain_projects_pretrust_scores', self._compute_onchain_project_pretrust)
+        analysis.register('devtooling_projects_pretrust_scores', self._compute_devtooling_project_pretrust)
+        analysis.register('developer_reputation', self._compute_developer_reputation)
+        analysis.register('weighted_edges', self._weight_edges)
+        analysis.register('edge_index', self._build_edge_index)
+        analysis.register('project_openrank_scores', self._apply_eigentrust)
+        analysis.register('eigentrust_diagnostics', self._apply_eigentrust)
+        analysis.register('devtooling_project_results', self._rank_and_evaluate_projects)
+        for key in VALUE_FLOW_KEYS:
+            analysis.register(key, self._serialize_value_flow)
+
+    def _run_scores_only(self) -> None:
+        """
+        Run steps 1-7 ('scores' mode), releasing each intermediate frame as soon as the
+        last step that reads it has run. The value flow graph is never built.
+        """
+        for step, released in self._pipeline_steps():
+            step()
+            for key in released:
+                if key not in self.SCORES_RETAINED_KEYS:
+                    self.analysis.pop(key, None)
+
+    def _invalidate(self, key: str) -> None:
+        """Discard a derived entry; in 'lazy' mode it is recomputed on next access."""
+        if isinstance(self.analysis, LazyAnalysis):
+            self.analysis.drop(key)
+        else:
+            self.analysis.pop(key, None)
+
+    def run_reweighted(
+        self,
+        shared_analysis: Dict[str, pd.DataFrame],
+        serialize_value_flow: bool = True
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Re-run edge weighting, EigenTrust and ranking on a graph and pretrust
+        computed by a previous run_analysis (steps 5-8 only).
+
+        Args:
+            shared_analysis: Analysis dict holding at least SHARED_ANALYSIS_KEYS
+            serialize_value_flow: Whether to also build the value flow graph
+
+        Returns:
+            Dict[str, pd.DataFrame]: Dictionary containing analysis results and intermediate data
+        """
+        self.analysis = {key: shared_analysis[key] for key in SHARED_ANALYSIS_KEYS}
         self._weight_edges()
         self._apply_eigentrust()
         self._rank_and_evaluate_projects()
-        self._serialize_value_flow()
-
+        if serialize_value_flow:
+            self._serialize_value_flow()
         return self.analysis
 
+    def sample_allocations(
+        self,
+        allocation_config: AllocationConfig,
+        num_samples: int = 1000,
+        confidence: float = 0.9,
+        seed: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        max_batch_bytes: int = DEFAULT_BATCH_BYTES
+    ) -> pd.DataFrame:
+        """
+        Estimate how stable allocations are under resampling of the trust graph.
+
+        Must be called after run_analysis. Each draw reweights every edge by a
+        Poisson(1) count (a Poisson bootstrap of the event records), reruns
+        EigenTrust for all draws of a chunk in one batched power iteration with
+        the native engine, and allocates the budget with allocate_batch.
+        Pretrust and eligibility are held at their run_analysis values. Draws
+        whose solve hits max_iterations are kept but reported with a warning.
+
+        Args:
+            allocation_config: AllocationConfig with budget and constraint parameters
+            num_samples: Number of bootstrap draws
+            confidence: Width of the reported interval
+            seed: Seed for reproducible draws
+            chunk_size: Draws solved per task; by default as many as fit in
+                max_batch_bytes (at most DEFAULT_CHUNK_SIZE)
+            max_workers: Number of worker processes (1 runs in-process)
+            max_batch_bytes: Working memory budget of one batched solve
+
+        Returns:
+            DataFrame indexed by project_id with allocation mean, interval and funded share
+
+        Raises:
+            ValueError: If run_analysis ran in 'scores' mode, which releases the edges
+                and pretrust the draws are based on.
+        """
+        if self.config.materialize == 'scores':
+            raise ValueError("sample_allocations needs the weighted edges and pretrust; run with materialize 'eager' or 'lazy'")
+        df_edges, df_pretrust = self._eigentrust_inputs()
+        results = self.analysis['devtooling_project_results']
+        et_config = self.config.eigentrust
+        if chunk_size is None:
+            chunk_size = min(DEFAULT_CHUNK_SIZE, batch_size(len(df_edges), max_batch_bytes))
+
+        shared = {
+            'edges': df_edges,
+            'pretrust': df_pretrust,
+            'alpha': self.config.alpha,
+            'tolerance': et_config.get('tolerance', DEFAULT_TOLERANCE),
+            'max_iterations': et_config.get('max_iterations', DEFAULT_MAX_ITERATIONS),
+            'project_ids': results['project_id'].to_numpy(),
+            'is_eligible': results['is_eligible'].to_numpy(dtype=np.float64)
+        }
+        allocations = sample_allocations(
+            _sample_devtooling_scores, shared, allocation_config, num_samples,
+            seed=seed, chunk_size=chunk_size, max_workers=max_workers
+        )
+        summary = summarize_allocations(shared['project_ids'], allocations, confidence)
+        display_names = results.set_index('project_id')['display_name']
+        summary.insert(0, 'display_name', summary.index.map(display_names))
+        return summary
+
     # --------------------------------------------------------------------
     # Step 1: Construct an unweighted graph
     # --------------------------------------------------------------------
@@ -106,14 +308,11 @@ class DevtoolingCalculator:
         
         Also removes duplicate edges where onchain projects are also devtooling projects.
         """
-        df_onchain = self.analysis['onchain_projects'].copy()
-        df_devtooling = self.analysis['devtooling_projects'].copy()
         df_dependencies = self.analysis['project_dependencies'].copy()
-        df_devs2projects = self.analysis['developers_to_projects'].copy()
+        df_devs2projects = self.analysis['developers_to_projects']
 
         # Create a mapping of project_id to display name (for both onchain and devtooling)
-        project_mapping = {**df_onchain.set_index('project_id')['display_name'].to_dict(),
-                           **df_devtooling.set_index('project_id')['display_name'].to_dict()}
+        project_mapping = self._project_mapping()
 
         # Use the most recent event timestamp for decay calculations
         time_ref = df_devs2projects['event_month'].max()
@@ -132,9 +331,45 @@ class DevtoolingCalculator:
         df_dependencies['j_name'] = df_dependencies['j'].map(project_mapping)
         df_dependencies['link_type'] = 'PACKAGE_DEPENDENCY'
         
+        # --- Parts 2 & 3. Commit Events and GitHub Engagement ---
+        df_devs2onchain, df_devs2tool = self._build_developer_edges(df_devs2projects, project_mapping)
+        
+        # --- Part 4. Remove duplicate edges if a developer's onchain project is also the devtooling project ---
+        # (This prevents projects that are both onchain and devtooling from receiving extra weight.)
+        df_devs2tool = self._drop_duplicate_developer_edges(df_devs2tool, df_devs2onchain)
+        
+        # --- Combine all edges ---
+        df_dependencies['link_type'] = 'PACKAGE_DEPENDENCY'
+        df_devs2onchain['link_type'] = 'ONCHAIN_PROJECT_TO_DEVELOPER'
+        df_devs2tool['link_type'] = 'DEVELOPER_TO_DEVTOOLING_PROJECT'
+        df_combined = pd.concat([
+            df_dependencies,
+            df_devs2onchain,
+            df_devs2tool
+        ], ignore_index=True)
+        cols = ['i', 'j', 'i_name', 'j_name', 'link_type', 'event_type', 'event_month']
+        self.analysis['unweighted_edges'] = df_combined[cols]
+
+    def _project_mapping(self) -> Dict[str, str]:
+        """Map project_id to display name for both onchain and devtooling projects."""
+        return {**self.analysis['onchain_projects'].set_index('project_id')['display_name'].to_dict(),
+                **self.analysis['devtooling_projects'].set_index('project_id')['display_name'].to_dict()}
+
+    def _build_developer_edges(
+        self,
+        df_devs2projects: pd.DataFrame,
+        project_mapping: Dict[str, str]
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Build developer edges from developer → project events.
+
+        Returns:
+            Tuple of (onchain project → developer commit edges,
+                      developer → devtooling project engagement edges)
+        """
         # --- Part 2. Commit Events: Onchain projects → Developers ---
         df_devs2onchain = df_devs2projects[
-            (df_devs2projects['project_id'].isin(df_onchain['project_id'])) &
+            (df_devs2projects['project_id'].isin(self.analysis['onchain_projects']['project_id'])) &
             (df_devs2projects['event_type'] == 'COMMIT_CODE')
         ].copy()
         df_devs2onchain.rename(
@@ -150,7 +385,7 @@ class DevtoolingCalculator:
         
         # --- Part 3. GitHub Engagement: Developers → Devtooling projects ---
         df_devs2tool = df_devs2projects[
-            (df_devs2projects['project_id'].isin(df_devtooling['project_id']))
+            (df_devs2projects['project_id'].isin(self.analysis['devtooling_projects']['project_id']))
         ].copy()
         df_devs2tool.rename(
             columns={
@@ -162,29 +397,27 @@ class DevtoolingCalculator:
         )
         df_devs2tool['j_name'] = df_devs2tool['j'].map(project_mapping)
         df_devs2tool['link_type'] = 'DEVELOPER_TO_DEVTOOLING_PROJECT'
-        
-        # --- Part 4. Remove duplicate edges if a developer's onchain project is also the devtooling project ---
-        # (This prevents projects that are both onchain and devtooling from receiving extra weight.)
-        onchain_devs_project_mapping = df_devs2onchain.set_index('j')['i'].to_dict()
-        df_devs2tool['is_duplicate'] = df_devs2tool.apply(
-            lambda row: row['i'] in onchain_devs_project_mapping and 
-                        onchain_devs_project_mapping[row['i']] == row['j'], 
-            axis=1
-        )
-        df_devs2tool = df_devs2tool[~df_devs2tool['is_duplicate']]
-        df_devs2tool.drop(columns=['is_duplicate'], inplace=True)
-        
-        # --- Combine all edges ---
-        df_dependencies['link_type'] = 'PACKAGE_DEPENDENCY'
-        df_devs2onchain['link_type'] = 'ONCHAIN_PROJECT_TO_DEVELOPER'
-        df_devs2tool['link_type'] = 'DEVELOPER_TO_DEVTOOLING_PROJECT'
-        df_combined = pd.concat([
-            df_dependencies,
-            df_devs2onchain,
-            df_devs2tool
-        ], ignore_index=True)
-        cols = ['i', 'j', 'i_name', 'j_name', 'link_type', 'event_type', 'event_month']
-        self.analysis['unweighted_edges'] = df_combined[cols]
+        return df_devs2onchain, df_devs2tool
+
+    @staticmethod
+    def _drop_duplicate_developer_edges(
+        df_devs2tool: pd.DataFrame,
+        df_devs2onchain: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Drop developer → devtooling edges whose (developer, project) pair also appears as
+        an onchain project → developer commit edge.
+
+        Anti-join on a single integer key per pair over factorized IDs, so developers with
+        several onchain projects have every matching devtooling edge removed.
+        """
+        n_tool = len(df_devs2tool)
+        dev_codes, _ = pd.factorize(pd.concat([df_devs2tool['i'], df_devs2onchain['j']], ignore_index=True))
+        project_codes, project_uniques = pd.factorize(pd.concat([df_devs2tool['j'], df_devs2onchain['i']], ignore_index=True))
+        pair_keys = dev_codes.astype(np.int64) * len(project_uniques) + project_codes
+        onchain_pairs = pd.Index(pd.unique(pair_keys[n_tool:]))
+        is_duplicate = onchain_pairs.get_indexer(pair_keys[:n_tool]) >= 0
+        return df_devs2tool[~is_duplicate]
 
     # --------------------------------------------------------------------
     # Step 2: Seed onchain projects with economic pretrust
@@ -241,35 +474,41 @@ class DevtoolingCalculator:
         Calculate developer reputation scores based on their contributions to onchain projects.
         
         Distributes onchain project trust to developers based on commit history.
+        Set `reputation_dtype: float32` in the config to halve memory on long histories.
         Results are stored in analysis['developer_reputation'].
         """
+        dtype = np.dtype(self.config.reputation_dtype)
         project_reputation = (
             self.analysis['onchain_projects_pretrust_scores']
             .set_index('i')['v']
-            .to_dict()
+            .astype(dtype)
         )
         # Use commit events (onchain → developer) to distribute onchain trust
         commit_history = (
             self.analysis['unweighted_edges']
             .query('link_type == "ONCHAIN_PROJECT_TO_DEVELOPER"')
-            .groupby(['event_month', 'j'])
-            .i.unique()
+            [['event_month', 'j', 'i']]
+            .drop_duplicates()
+        )
+        commit_history['v'] = commit_history['i'].map(project_reputation).fillna(0).astype(dtype)
+
+        # Each month, a developer receives the average trust of the onchain projects they
+        # committed to; monthly shares are then summed per developer
+        reputation = (
+            commit_history
+            .groupby(['event_month', 'j'], sort=False)['v'].mean()
+            .groupby(level='j', sort=False).sum()
         )
-        reputation = {}
-        for (event_month, developer), onchain_projects in commit_history.items():
-            value = 0.0
-            for src_project in onchain_projects:
-                value += project_reputation.get(src_project, 0)
-            if not len(onchain_projects):
-                continue
-            share = value / len(onchain_projects)
-            reputation[developer] = reputation.get(developer, 0) + share
 
         df_dev_reputation = pd.DataFrame(
-            {'developer_id': list(reputation.keys()),
-             'reputation': list(reputation.values())}
+            {'developer_id': reputation.index.to_numpy(),
+             'reputation': reputation.to_numpy(dtype=dtype)}
+        )
+        dev_names = (
+            self.analysis['developers_to_projects']
+            .drop_duplicates(subset='developer_id', keep='last')
+            .set_index('developer_id')['developer_name']
         )
-        dev_names = self.analysis['developers_to_projects'].set_index('developer_id')['developer_name'].to_dict()
         df_dev_reputation['developer_name'] = df_dev_reputation['developer_id'].map(dev_names)
         
         # Normalize the developer reputation scores
@@ -291,37 +530,45 @@ class DevtoolingCalculator:
         
         Results are stored in analysis['weighted_edges'].
         """
-        df_edges = self.analysis['unweighted_edges'].copy()
+        df_edges = self.analysis['unweighted_edges']
+        time_ref = df_edges['event_month'].max()
+        self.analysis['weighted_edges'] = self._compute_edge_weights(df_edges, time_ref)
+        self._invalidate('edge_index')  # Invalidate any index over previous weights
 
-        # Calculate time decay based on event recency
-        time_ref = df_edges['event_month'].max()    
-        time_diff_years = (time_ref - df_edges['event_month']).dt.days / 365.0
-        
-        # Default decay is 1 (no decay)
-        df_edges['v_decay'] = 1.0  
+    def _decay_rates(self, link_types: pd.Series) -> pd.Series:
+        """
+        Per-edge exponential decay rate (per year) from the configured time_decay.
+        Links without a configured decay (package dependencies) get a rate of 0.
+        """
+        rates = {
+            'ONCHAIN_PROJECT_TO_DEVELOPER': self.config.time_decay.get('commit_to_onchain_repo', 1.0),
+            'DEVELOPER_TO_DEVTOOLING_PROJECT': self.config.time_decay.get('event_to_devtooling_repo', 1.0)
+        }
+        return link_types.map(rates).fillna(0.0).astype(float)
 
-        # Apply decay for onchain project → developer links
-        mask_onchain = df_edges['link_type'] == 'ONCHAIN_PROJECT_TO_DEVELOPER'
-        if mask_onchain.any():
-            decay_factor = self.config.time_decay.get('commit_to_onchain_repo', 1.0)
-            df_edges.loc[mask_onchain, 'v_decay'] = np.exp(-decay_factor * time_diff_years[mask_onchain])
-            
-        # Apply decay for developer → devtooling links
-        mask_devtool = df_edges['link_type'] == 'DEVELOPER_TO_DEVTOOLING_PROJECT'
-        if mask_devtool.any():
-            decay_factor = self.config.time_decay.get('event_to_devtooling_repo', 1.0)
-            df_edges.loc[mask_devtool, 'v_decay'] = np.exp(-decay_factor * time_diff_years[mask_devtool])
+    def _compute_edge_weights(self, df_edges: pd.DataFrame, time_ref: pd.Timestamp) -> pd.DataFrame:
+        """Return a copy of df_edges with decay, link type, event type and final weights."""
+        # Only new columns are added, so the existing ones can be shared with df_edges
+        df_edges = df_edges.copy(deep=False)
+
+        # Calculate time decay based on event recency (default decay is 1, i.e. no decay)
+        time_diff_years = (time_ref - df_edges['event_month']).dt.days / 365.0
+        df_edges['v_decay'] = np.exp(-self._decay_rates(df_edges['link_type']) * time_diff_years)
             
         # Weight edges by link type and event type
         df_edges['v_linktype'] = df_edges['link_type'].map(self.config.link_type_weights)
-        df_edges['v_eventtype'] = df_edges['event_type'].map(self.config.event_type_weights)
+        df_edges['v_eventtype'] = df_edges['event_type'].map(self.config.event_type_weights).astype(float)
         df_edges['v_final'] = df_edges['v_decay'] * df_edges['v_linktype'] * df_edges['v_eventtype']
-        self.analysis['weighted_edges'] = df_edges
+        return df_edges
 
     # --------------------------------------------------------------------
     # Step 6: Apply EigenTrust to the weighted graph using combined pretrust scores
     # --------------------------------------------------------------------
-    def _apply_eigentrust(self) -> None:
+    def _apply_eigentrust(
+        self,
+        initial_scores: Optional[pd.Series] = None,
+        graph: Optional[TrustGraph] = None
+    ) -> None:
         """
         Apply EigenTrust algorithm to the weighted graph.
         
@@ -330,61 +577,104 @@ class DevtoolingCalculator:
         - Devtooling projects
         - Developer reputation
         
+        The solver is selected with `eigentrust.engine` in the config:
+        - 'openrank' (default): openrank_sdk.EigenTrust
+        - 'native': vectorized power iteration over a CSR transition matrix
+        
         Results are stored in analysis['project_openrank_scores'].
+        Convergence diagnostics are stored in analysis['eigentrust_diagnostics'].
+        
+        Args:
+            initial_scores: Optional scores by node id to warm-start the native engine
+            graph: Optional prebuilt transition matrix for the native engine
         
         Raises:
             ValueError: If no edge records or pretrust scores are found.
         """
         alpha = self.config.alpha
-        et = EigenTrust(alpha=alpha)
+        et_config = self.config.eigentrust
+        engine = et_config.get('engine', 'openrank')
+        
+        df_edges, df_pretrust = self._eigentrust_inputs()
+
+        # Run EigenTrust propagation
+        if engine == 'native':
+            if graph is None:
+                graph = build_trust_graph(df_edges['i'], df_edges['j'], df_edges['v'], extra_nodes=df_pretrust['i'])
+            result = solve_eigentrust(
+                graph,
+                df_pretrust,
+                alpha=alpha,
+                tolerance=et_config.get('tolerance', DEFAULT_TOLERANCE),
+                max_iterations=et_config.get('max_iterations', DEFAULT_MAX_ITERATIONS),
+                initial_scores=initial_scores
+            )
+            if not result.converged:
+                warnings.warn(
+                    f"EigenTrust did not converge after {result.iterations} iterations (residual {result.residual:.2e})"
+                )
+            df_scores = result.scores.to_frame()
+            diagnostics = result.diagnostics()
+            if self.RETAIN_TRUST_GRAPH:
+                self.trust_graph = graph
+        elif engine == 'openrank':
+            if initial_scores is not None or graph is not None:
+                raise ValueError("Warm-starting EigenTrust requires the 'native' engine")
+            et = EigenTrust(alpha=alpha)
+            scores = et.run_eigentrust(df_edges.to_dict('records'), df_pretrust.to_dict('records'))
+            df_scores = pd.DataFrame(scores, columns=['i', 'v']).set_index('i')
+            diagnostics = {}
+        else:
+            raise ValueError(f"Invalid EigenTrust engine: {engine}")
         
+        self.analysis['project_openrank_scores'] = df_scores
+        self.analysis['eigentrust_diagnostics'] = {
+            'engine': engine,
+            'num_edges': len(df_edges),
+            'num_pretrust': len(df_pretrust),
+            **diagnostics
+        }
+
+    def _eigentrust_inputs(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Collect positive-weight edges and combined pretrust records for EigenTrust.
+
+        Raises:
+            ValueError: If no edge records or pretrust scores are found.
+        """
         # Combine pretrust scores from all sources
-        pretrust_list = []
+        pretrust_frames = []
         
         # Add onchain projects pretrust
         onchain = self.analysis.get('onchain_projects_pretrust_scores', pd.DataFrame())
         if not onchain.empty:
-            pretrust_list.extend(
-                {'i': row['i'], 'v': row['v']}
-                for _, row in onchain.iterrows()
-                if row['v'] > 0
-            )
+            pretrust_frames.append(onchain[['i', 'v']])
         
         # Add devtooling projects pretrust
         devtooling = self.analysis.get('devtooling_projects_pretrust_scores', pd.DataFrame())
         if not devtooling.empty:
-            pretrust_list.extend(
-                {'i': row['i'], 'v': row['v']}
-                for _, row in devtooling.iterrows()
-                if row['v'] > 0
-            )
+            pretrust_frames.append(devtooling[['i', 'v']])
         
         # Add developer reputation
         developers = self.analysis.get('developer_reputation', pd.DataFrame())
         if not developers.empty:
-            pretrust_list.extend(
-                {'i': row['developer_id'], 'v': row['reputation']}
-                for _, row in developers.iterrows()
-                if row['reputation'] > 0
+            pretrust_frames.append(
+                developers[['developer_id', 'reputation']].rename(columns={'developer_id': 'i', 'reputation': 'v'})
             )
         
+        df_pretrust = pd.concat(pretrust_frames, ignore_index=True) if pretrust_frames else pd.DataFrame(columns=['i', 'v'])
+        df_pretrust = df_pretrust[df_pretrust['v'] > 0]
+        
         # Format edge records
-        df_edges = self.analysis['weighted_edges'].copy()
-        df_edges = df_edges[df_edges['v_final'] > 0]
-        edge_records = [
-            {'i': row['i'], 'j': row['j'], 'v': row['v_final']}
-            for _, row in df_edges.iterrows()
-        ]
+        df_edges = self.analysis['weighted_edges']
+        df_edges = df_edges.loc[df_edges['v_final'] > 0, ['i', 'j', 'v_final']].rename(columns={'v_final': 'v'})
         
-        if not edge_records:
+        if df_edges.empty:
             raise ValueError("No edge records found - check if v_final values are all 0 or if weighted_edges is empty")
-        if not pretrust_list:
+        if df_pretrust.empty:
             raise ValueError("No pretrust scores found - check computed pretrust scores")
-        
-        # Run EigenTrust propagation
-        scores = et.run_eigentrust(edge_records, pretrust_list)
-        df_scores = pd.DataFrame(scores, columns=['i', 'v']).set_index('i')
-        self.analysis['project_openrank_scores'] = df_scores
+
+        return df_edges, df_pretrust
 
     # --------------------------------------------------------------------
     # Step 7: Rank and Evaluate Devtooling Projects
@@ -403,19 +693,22 @@ class DevtoolingCalculator:
         """
         df_results = self.analysis['devtooling_projects'].copy()
         df_scores = self.analysis['project_openrank_scores'].copy()
-        df_edges = self.analysis['weighted_edges']
+        edge_index = self._get_edge_index()
 
-        # Count onchain package dependency links
-        df_pkg_deps = df_edges[df_edges['link_type'] == 'PACKAGE_DEPENDENCY']
-        df_results['total_dependents'] = df_results['project_id'].apply(
-            lambda pid: df_pkg_deps[df_pkg_deps['j'] == pid]['i'].nunique()
-        )
-        
-        # Count developer → devtooling links
-        df_dev_links = df_edges[df_edges['link_type'] == 'DEVELOPER_TO_DEVTOOLING_PROJECT']
-        df_results['developer_links'] = df_results['project_id'].apply(
-            lambda pid: df_dev_links[df_dev_links['j'] == pid]['i'].nunique()
+        # Count distinct sources per (link type, target) in a single pass
+        link_counts = (
+            edge_index
+            .groupby(level=['link_type', 'j'], observed=True)['i']
+            .nunique()
+            .unstack('link_type', fill_value=0)
         )
+        link_count_columns = {
+            'PACKAGE_DEPENDENCY': 'total_dependents',                  # onchain package dependency links
+            'DEVELOPER_TO_DEVTOOLING_PROJECT': 'developer_links'       # developer → devtooling links
+        }
+        for link_type, col in link_count_columns.items():
+            counts = link_counts[link_type] if link_type in link_counts.columns else pd.Series(dtype=int)
+            df_results[col] = df_results['project_id'].map(counts).fillna(0).astype(int)
         
         # Apply eligibility thresholds
         thresholds = self.config.eligibility_thresholds
@@ -457,90 +750,157 @@ class DevtoolingCalculator:
 
         For each devtooling project, the sum of contributions equals its v_aggregated.
         For each onchain project, the sum of contributions equals its economic pretrust v.
+
+        Contributions are fitted with a sparse IPF over the nonzero onchain x devtooling
+        links; `value_flow.tolerance` and `value_flow.max_iterations` tune the solve and
+        the iteration count is stored in analysis['value_flow_diagnostics'].
         """
-        import warnings  # Ensure warnings is imported
-        
         # Retrieve necessary DataFrames from the analysis dictionary.
-        edges = self.analysis['weighted_edges']
+        edge_index = self._get_edge_index()
         results = self.analysis['devtooling_project_results']
         onchain_projects = self.analysis['onchain_projects_pretrust_scores']
+        ipf_config = self.config.value_flow
 
-        # Build mapping from developer -> unique set of onchain projects (from commit events)
-        onchain_projects_by_dev = (
-            edges.query('link_type == "ONCHAIN_PROJECT_TO_DEVELOPER"')
-                 .groupby('j')['i']
-                 .unique()
-                 .to_dict()
-        )
+        def edges_of(link_type: str) -> pd.DataFrame:
+            try:
+                return edge_index.loc[link_type].reset_index()[['i', 'j']]
+            except KeyError:
+                return pd.DataFrame(columns=['i', 'j'])
+
+        # Unique (onchain project, developer) pairs from commit events
+        df_commits = edges_of('ONCHAIN_PROJECT_TO_DEVELOPER').drop_duplicates()
         
         # Build a DataFrame for PACKAGE_DEPENDENCY edges (direct mapping).
-        df_pkg = edges.loc[edges['link_type'] == 'PACKAGE_DEPENDENCY', ['i', 'j']].copy()
+        df_pkg = edges_of('PACKAGE_DEPENDENCY')
 
-        # Build a DataFrame for DEVELOPER_TO_DEVTOOLING_PROJECT edges.
-        df_dev = edges.loc[edges['link_type'] == 'DEVELOPER_TO_DEVTOOLING_PROJECT', ['i', 'j']].copy()
-        # For each developer edge, map the developer (i) to its onchain projects.
-        df_dev['onchain_list'] = df_dev['i'].map(lambda d: onchain_projects_by_dev.get(d, []))
-        # Explode the onchain_list column and then keep only that column (renaming it to 'i') and 'j'
-        df_dev_expanded = df_dev.explode('onchain_list')
-        df_dev_expanded = df_dev_expanded[['onchain_list', 'j']].rename(columns={'onchain_list': 'i'})
+        # Route each DEVELOPER_TO_DEVTOOLING_PROJECT edge through every onchain project
+        # the developer committed to (developers without commits drop out).
+        df_dev = edges_of('DEVELOPER_TO_DEVTOOLING_PROJECT')
+        df_dev_expanded = (
+            df_dev.merge(df_commits, left_on='i', right_on='j', suffixes=('_dev', ''))
+            [['i', 'j_dev']]
+            .rename(columns={'j_dev': 'j'})
+        )
         
         # Concatenate the two DataFrames.
         graph_df = pd.concat([df_pkg, df_dev_expanded], ignore_index=True)
         
-        # Build a pivot table of counts (raw connectivity matrix) between onchain and devtooling projects.
-        counts = graph_df.groupby(['i', 'j']).size().reset_index(name='count')
-        pivot = counts.pivot(index='i', columns='j', values='count').fillna(0)
-        onchain_ids = pivot.index.to_numpy()            # Array of onchain project IDs.
-        devtooling_ids = pivot.columns.to_numpy()         # Array of devtooling project IDs.
-        A = pivot.values                                  # Connectivity matrix (n_onchain x n_devtooling).
+        # Sparse (COO) connectivity counts between onchain and devtooling projects.
+        counts = graph_df.groupby(['i', 'j']).size()
+        rows, onchain_ids = pd.factorize(counts.index.get_level_values('i'), sort=True)
+        cols, devtooling_ids = pd.factorize(counts.index.get_level_values('j'), sort=True)
+        onchain_ids = np.asarray(onchain_ids)
+        devtooling_ids = np.asarray(devtooling_ids)
+        A = counts.to_numpy(dtype=np.float64)
 
         # Get target vectors for onchain and devtooling projects.
-        devtooling_project_scores = results.set_index('project_id')['v_aggregated'].to_dict()
-        onchain_project_scores = onchain_projects.set_index('i')['v'].to_dict()
-        v_onchain = np.array([onchain_project_scores.get(i, 0) for i in onchain_ids])
-        v_devtooling = np.array([devtooling_project_scores.get(j, 0) for j in devtooling_ids])
+        def targets(df: pd.DataFrame, id_col: str, value_col: str, ids: np.ndarray) -> np.ndarray:
+            scores = df.drop_duplicates(subset=id_col, keep='last').set_index(id_col)[value_col]
+            return scores.reindex(ids).fillna(0).to_numpy(dtype=np.float64)
+
+        v_onchain = targets(onchain_projects, 'i', 'v', onchain_ids)
+        v_devtooling = targets(results, 'project_id', 'v_aggregated', devtooling_ids)
         
         # Iterative Proportional Fitting (IPF) to allocate contributions.
-        s = np.ones(len(devtooling_ids))
-        tol = 1e-6
-        max_iter = 1000
-        for _ in range(max_iter):
-            r = v_onchain / (A.dot(s) + 1e-12)
-            s_new = v_devtooling / (A.T.dot(r) + 1e-12)
-            if np.allclose(s_new, s, atol=tol):
-                s = s_new
-                break
-            s = s_new
-        # Compute allocated contributions matrix: X[i, j] = A[i,j] * r_i * s_j.
-        X = A * r[:, np.newaxis] * s[np.newaxis, :]
-        
-        # Extract nonzero contributions using vectorized operations.
-        i_idx, j_idx = np.nonzero(X)
-        contributions = X[i_idx, j_idx]
+        r, s, iterations, converged = self._sparse_ipf(
+            rows, cols, A, v_onchain, v_devtooling,
+            tol=ipf_config.get('tolerance', 1e-6),
+            max_iter=ipf_config.get('max_iterations', 1000)
+        )
+        if not converged:
+            warnings.warn(f"Value flow IPF did not converge after {iterations} iterations")
+        self.analysis['value_flow_diagnostics'] = {
+            'iterations': iterations,
+            'converged': converged,
+            'num_links': len(A)
+        }
+
+        # Contributions over the nonzero pattern: X[i, j] = A[i,j] * r_i * s_j.
+        contributions = A * r[rows] * s[cols]
+        nonzero = contributions != 0
         detailed_df = pd.DataFrame({
-            'onchain_project_id': onchain_ids[i_idx],
-            'devtooling_project_id': devtooling_ids[j_idx],
-            'contribution': contributions
+            'onchain_project_id': onchain_ids[rows[nonzero]],
+            'devtooling_project_id': devtooling_ids[cols[nonzero]],
+            'contribution': contributions[nonzero]
         })
         
         # (Optional) Verify that for each devtooling project, contributions sum to its v_aggregated.
-        dev_sum = detailed_df.groupby('devtooling_project_id')['contribution'].sum().round(6)
-        for j in devtooling_ids:
-            target = devtooling_project_scores.get(j, 0)
-            if abs(dev_sum.get(j, 0) - target) > 1e-4:
-                warnings.warn(f"Devtooling project {j} total contribution {dev_sum.get(j, 0)} != target {target}")
+        dev_sum = np.round(np.bincount(cols, weights=contributions, minlength=len(devtooling_ids)), 6)
+        for k in np.flatnonzero(np.abs(dev_sum - v_devtooling) > 1e-4):
+            warnings.warn(f"Devtooling project {devtooling_ids[k]} total contribution {dev_sum[k]} != target {v_devtooling[k]}")
         
         # (Optional) Verify that for each onchain project, contributions sum to its v.
-        onchain_sum = detailed_df.groupby('onchain_project_id')['contribution'].sum().round(6)
-        for i in onchain_ids:
-            target = onchain_project_scores.get(i, 0)
-            if abs(onchain_sum.get(i, 0) - target) > 1e-4:
-                warnings.warn(f"Onchain project {i} total contribution {onchain_sum.get(i, 0)} != target {target}")
+        onchain_sum = np.round(np.bincount(rows, weights=contributions, minlength=len(onchain_ids)), 6)
+        for k in np.flatnonzero(np.abs(onchain_sum - v_onchain) > 1e-4):
+            warnings.warn(f"Onchain project {onchain_ids[k]} total contribution {onchain_sum[k]} != target {v_onchain[k]}")
         
         # Save the detailed graph to analysis.
         self.analysis['detailed_value_flow_graph'] = detailed_df
         
 
+    # Helper: Sparse IPF
+    # --------------------------------------------------------------------
+    @staticmethod
+    def _sparse_ipf(
+        rows: np.ndarray,
+        cols: np.ndarray,
+        values: np.ndarray,
+        row_targets: np.ndarray,
+        col_targets: np.ndarray,
+        tol: float = 1e-6,
+        max_iter: int = 1000
+    ) -> Tuple[np.ndarray, np.ndarray, int, bool]:
+        """
+        Fit row and column scaling factors r, s so that X[i, j] = A[i, j] * r_i * s_j
+        matches the row and column targets, without materializing A densely.
+
+        Args:
+            rows: Row index of each nonzero entry of A
+            cols: Column index of each nonzero entry of A
+            values: Value of each nonzero entry of A
+            row_targets: Target row sums
+            col_targets: Target column sums
+            tol: Absolute tolerance on the change in s between iterations
+            max_iter: Maximum number of iterations
+
+        Returns:
+            Tuple of (r, s, iterations, converged)
+        """
+        n_rows, n_cols = len(row_targets), len(col_targets)
+        s = np.ones(n_cols)
+        r = np.zeros(n_rows)
+        converged = False
+        iterations = 0
+        while iterations < max_iter:
+            iterations += 1
+            r = row_targets / (np.bincount(rows, weights=values * s[cols], minlength=n_rows) + 1e-12)
+            s_new = col_targets / (np.bincount(cols, weights=values * r[rows], minlength=n_cols) + 1e-12)
+            converged = np.allclose(s_new, s, atol=tol)
+            s = s_new
+            if converged:
+                break
+        return r, s, iterations, converged
+
+    # Helper: Edge index
+    # --------------------------------------------------------------------
+    def _get_edge_index(self) -> pd.DataFrame:
+        """
+        Return weighted edges indexed and sorted by (link_type, j).
+
+        Built once per run and cached in analysis['edge_index'], so later stages can
+        select a link type (or a link type and target) without rescanning all edges.
+        """
+        if 'edge_index' not in self.analysis:
+            self.analysis['edge_index'] = self._build_edge_index()
+        return self.analysis['edge_index']
+
+    def _build_edge_index(self) -> pd.DataFrame:
+        return (
+            self.analysis['weighted_edges'][['link_type', 'j', 'i', 'v_final']]
+            .set_index(['link_type', 'j'])
+            .sort_index()
+        )
+
     # Helper: MinMax Scaling
     # --------------------------------------------------------------------
     @staticmethod
@@ -560,6 +920,135 @@ class DevtoolingCalculator:
         return (values - vmin) / (vmax - vmin)
     
 
+class IncrementalDevtoolingCalculator(DevtoolingCalculator):
+    """
+    DevtoolingCalculator that carries its graph and scores across monthly snapshots.
+
+    run_analysis performs a full solve and keeps its transition matrix. Each call
+    to add_month then:
+    - builds edges for the new month's developer events only
+    - ages the existing edge weights by the time elapsed since the last snapshot
+    - drops developer → devtooling edges made duplicate by new commit events
+    - patches the kept transition matrix with the same changes instead of
+      rebuilding it from every edge
+    - warm-starts EigenTrust from the previous scores
+
+    Scores match a full rerun on the combined data (up to the solver tolerance).
+    The warm start saves a modest share of the power iterations rather than
+    converging in a few: a new month reweights every decaying edge, so the
+    previous scores are not close to the new fixed point. Iteration counts are
+    reported in analysis['eigentrust_diagnostics'].
+    Requires the 'native' EigenTrust engine.
+    """
+
+    # add_month updates the weighted edges and reuses the project pretrust
+    SCORES_RETAINED_KEYS = (
+        'weighted_edges',
+        'onchain_projects_pretrust_scores',
+        'devtooling_projects_pretrust_scores'
+    )
+    RETAIN_TRUST_GRAPH = True
+
+    def add_month(self, df_new_events: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        Append a new month of developer → project events and update the analysis.
+
+        Args:
+            df_new_events: New rows in the developers_to_projects format
+
+        Returns:
+            Dict[str, pd.DataFrame]: Updated analysis dictionary
+        """
+        if 'project_openrank_scores' not in self.analysis:
+            raise ValueError("Run run_analysis on the initial snapshot before adding months")
+
+        df_edges = self.analysis['weighted_edges']
+        previous_scores = self.analysis['project_openrank_scores']['v']
+        previous_time_ref = df_edges['event_month'].max()
+
+        df_events = pd.concat([self.analysis['developers_to_projects'], df_new_events], ignore_index=True)
+        time_ref = max(previous_time_ref, df_new_events['event_month'].max())
+        self.analysis['developers_to_projects'] = df_events
+
+        # Age existing edges: exp(-rate * (t + dt)) = exp(-rate * t) * exp(-rate * dt)
+        df_edges = df_edges.copy()
+        dt_years = (time_ref - previous_time_ref).days / 365.0
+        df_edges['v_decay'] *= np.exp(-self._decay_rates(df_edges['link_type']) * dt_years)
+        df_edges['v_final'] = df_edges['v_decay'] * df_edges['v_linktype'] * df_edges['v_eventtype']
+        is_package_link = df_edges['link_type'] == 'PACKAGE_DEPENDENCY'
+        df_edges.loc[is_package_link, 'event_month'] = time_ref  # Static dependencies never decay
+
+        # Edges from the new month's events
+        df_new_onchain, df_new_tool = self._build_developer_edges(df_new_events, self._project_mapping())
+        is_commit_link = df_edges['link_type'] == 'ONCHAIN_PROJECT_TO_DEVELOPER'
+        is_tool_link = df_edges['link_type'] == 'DEVELOPER_TO_DEVTOOLING_PROJECT'
+        df_all_onchain = pd.concat([df_edges.loc[is_commit_link, ['i', 'j']], df_new_onchain[['i', 'j']]])
+        df_new_tool = self._drop_duplicate_developer_edges(df_new_tool, df_all_onchain)
+        df_kept_tool = self._drop_duplicate_developer_edges(df_edges[is_tool_link], df_new_onchain)
+        df_dropped_tool = df_edges.loc[df_edges.index[is_tool_link].difference(df_kept_tool.index)]
+
+        cols = ['i', 'j', 'i_name', 'j_name', 'link_type', 'event_type', 'event_month']
+        df_new_edges = self._compute_edge_weights(
+            pd.concat([df_new_onchain, df_new_tool], ignore_index=True)[cols], time_ref
+        )
+        df_edges = pd.concat([df_edges[~is_tool_link], df_kept_tool, df_new_edges], ignore_index=True)
+
+        self.analysis['unweighted_edges'] = df_edges[cols]
+        self.analysis['weighted_edges'] = df_edges
+        self._invalidate('edge_index')
+
+        # Project pretrust is unchanged; developer reputation picks up the new commits
+        self._compute_developer_reputation()
+        graph = None
+        if self.trust_graph is not None:
+            _, df_pretrust = self._eigentrust_inputs()
+            df_new_edges = df_new_edges[df_new_edges['v_final'] > 0]
+            graph = patch_trust_graph(
+                self.trust_graph,
+                scale=np.exp(-self._trust_graph_decay_rates(df_events) * dt_years),
+                removed=(df_dropped_tool['i'], df_dropped_tool['j']),
+                added=(df_new_edges['i'], df_new_edges['j'], df_new_edges['v_final']),
+                extra_nodes=df_pretrust['i']
+            )
+        self._apply_eigentrust(initial_scores=previous_scores, graph=graph)
+        self.analysis['eigentrust_diagnostics']['warm_start'] = True
+        self._rank_and_evaluate_projects()
+
+        # Step 8 follows config.materialize as in run_analysis
+        if self.config.materialize == 'scores':
+            for key in ('unweighted_edges', 'developer_reputation', 'edge_index'):
+                self.analysis.pop(key, None)
+        elif self.config.materialize == 'lazy':
+            for key in VALUE_FLOW_KEYS:
+                self.analysis.drop(key)
+        else:
+            self._serialize_value_flow()
+
+        return self.analysis
+
+    def _trust_graph_decay_rates(self, df_events: pd.DataFrame) -> np.ndarray:
+        """
+        Decay rate of each trust_graph entry, from its link type.
+
+        Every (source, target) pair has a single link type, told apart by which
+        end is a developer: project → developer entries are commit links,
+        developer → project entries are devtooling links and project → project
+        entries are package dependencies.
+        """
+        graph = self.trust_graph
+        rates = self._decay_rates(pd.Series([
+            'ONCHAIN_PROJECT_TO_DEVELOPER', 'DEVELOPER_TO_DEVTOOLING_PROJECT', 'PACKAGE_DEPENDENCY'
+        ])).to_numpy()
+        positions = graph.node_index.get_indexer(pd.unique(np.asarray(df_events['developer_id'])))
+        is_developer = np.zeros(graph.num_nodes, dtype=bool)
+        is_developer[positions[positions >= 0]] = True
+        return np.select(
+            [is_developer[graph.indices], is_developer[graph.rows]],
+            rates[:2],
+            default=rates[2]
+        )
+
+
 # ------------------------------------------------------------------------
 # Helper Functions
 # ------------------------------------------------------------------------
@@ -575,7 +1064,8 @@ def load_config(config_path: str) -> Tuple[DataSnapshot, SimulationConfig]:
         onchain_projects_file=config['data_snapshot'].get('onchain_projects_file', "onchain_projects.csv"),
         devtooling_projects_file=config['data_snapshot'].get('devtooling_projects_file', "devtooling_projects.csv"),
         project_dependencies_file=config['data_snapshot'].get('project_dependencies_file', "project_dependencies.csv"),
-        developers_to_projects_file=config['data_snapshot'].get('developers_to_projects_file', "developers_to_projects.csv")
+        developers_to_projects_file=config['data_snapshot'].get('developers_to_projects_file', "developers_to_projects.csv"),
+        backend=config['data_snapshot'].get('backend', 'csv')
     )
 
     sim_config = config.get('simulation', {})
@@ -586,23 +1076,50 @@ def load_config(config_path: str) -> Tuple[DataSnapshot, SimulationConfig]:
         devtooling_project_pretrust_weights=sim_config.get('devtooling_project_pretrust_weights', {}),
         event_type_weights=sim_config.get('event_type_weights', {}),
         link_type_weights=sim_config.get('link_type_weights', {}),
-        eligibility_thresholds=sim_config.get('eligibility_thresholds', {})
+        eligibility_thresholds=sim_config.get('eligibility_thresholds', {}),
+        eigentrust=sim_config.get('eigentrust', {}),
+        reputation_dtype=sim_config.get('reputation_dtype', 'float64'),
+        value_flow=sim_config.get('value_flow', {}),
+        materialize=sim_config.get('materialize', 'eager')
     )
 
     return data_snapshot, simulation_config
 
 
+# Typed layouts for the Parquet backend; only the projected columns are loaded
+PROJECT_DEPENDENCIES_SCHEMA = TableSchema(
+    categorical_columns=('onchain_builder_project_id', 'devtooling_project_id', 'dependency_source')
+)
+DEVELOPERS_TO_PROJECTS_SCHEMA = TableSchema(
+    date_columns=('event_month',),
+    categorical_columns=('developer_id', 'developer_name', 'project_id', 'event_type'),
+    columns=('developer_id', 'developer_name', 'project_id', 'event_month', 'event_type')
+)
+
+
 def load_data(data_snapshot: DataSnapshot) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Load data files specified in the DataSnapshot.
+
+    With backend 'parquet', each CSV is converted once into a typed Parquet file
+    in the snapshot cache directory and later runs read the Parquet file instead.
     """
     def get_path(filename: str) -> str:
         return f"{data_snapshot.data_dir}/{filename}"
 
-    df_onchain_projects = pd.read_csv(get_path(data_snapshot.onchain_projects_file))
-    df_devtooling_projects = pd.read_csv(get_path(data_snapshot.devtooling_projects_file))
-    df_project_dependencies = pd.read_csv(get_path(data_snapshot.project_dependencies_file))
-    df_developers_to_projects = pd.read_csv(get_path(data_snapshot.developers_to_projects_file))
+    if data_snapshot.backend == 'parquet':
+        def read(filename: str, schema: TableSchema = TableSchema()) -> pd.DataFrame:
+            return load_table(get_path(filename), schema)
+    elif data_snapshot.backend == 'csv':
+        def read(filename: str, schema: TableSchema = TableSchema()) -> pd.DataFrame:
+            return pd.read_csv(get_path(filename), usecols=schema.columns)
+    else:
+        raise ValueError(f"Invalid data snapshot backend: {data_snapshot.backend}")
+
+    df_onchain_projects = read(data_snapshot.onchain_projects_file)
+    df_devtooling_projects = read(data_snapshot.devtooling_projects_file)
+    df_project_dependencies = read(data_snapshot.project_dependencies_file, PROJECT_DEPENDENCIES_SCHEMA)
+    df_developers_to_projects = read(data_snapshot.developers_to_projects_file, DEVELOPERS_TO_PROJECTS_SCHEMA)
     df_developers_to_projects['event_month'] = pd.to_datetime(df_developers_to_projects['event_month'])
 
     return (
@@ -626,6 +1143,185 @@ def run_simulation(config_path: str) -> Dict[str, Any]:
     return analysis
 
 
+def run_robustness_simulation(config_path: str, max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Run the analysis, then the Monte-Carlo allocation robustness check configured
+    in the YAML 'robustness' and 'allocation' blocks.
+    """
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    robustness = config.get('robustness', {})
+
+    data_snapshot, simulation_config = load_config(config_path)
+    calculator = DevtoolingCalculator(simulation_config)
+    calculator.run_analysis(*load_data(data_snapshot))
+    return calculator.sample_allocations(
+        AllocationConfig(**config['allocation']),
+        num_samples=robustness.get('num_samples', 1000),
+        confidence=robustness.get('confidence', 0.9),
+        seed=robustness.get('seed'),
+        max_workers=max_workers,
+        max_batch_bytes=robustness.get('max_batch_bytes', DEFAULT_BATCH_BYTES)
+    )
+
+
+def _sample_devtooling_scores(shared: Dict[str, Any], num_samples: int, rng: np.random.Generator) -> np.ndarray:
+    """Poisson-bootstrap edge weights and rerun EigenTrust for the whole batch."""
+    df_edges = shared['edges']
+    weights = df_edges['v'].to_numpy()[:, np.newaxis] * rng.poisson(1.0, size=(len(df_edges), num_samples))
+    result = run_eigentrust_batch(
+        df_edges,
+        shared['pretrust'],
+        weights,
+        alpha=shared['alpha'],
+        tolerance=shared['tolerance'],
+        max_iterations=shared['max_iterations']
+    )
+    del weights
+    if not result.converged.all():
+        warnings.warn(
+            f"EigenTrust did not converge for {(~result.converged).sum()} of {num_samples} draws "
+            f"after {result.iterations} iterations (max residual {result.residuals.max():.2e})"
+        )
+    positions = pd.Index(result.node_ids).get_indexer(shared['project_ids'])
+    project_scores = np.where(positions >= 0, result.scores[:, positions], 0.0) * shared['is_eligible']
+    totals = project_scores.sum(axis=1, keepdims=True)
+    return np.divide(project_scores, totals, out=np.zeros_like(project_scores), where=totals > 0)
+
+
+# ------------------------------------------------------------------------
+# Parameter sweeps
+# ------------------------------------------------------------------------
+_SWEEP_SHARED: Dict[str, Dict[str, pd.DataFrame]] = {}
+
+
+def expand_config_grid(
+    base_config: SimulationConfig,
+    grid: Dict[str, List[Any]]
+) -> List[Tuple[Dict[str, Any], SimulationConfig]]:
+    """
+    Expand a parameter grid into SimulationConfig variants.
+
+    Grid keys are SimulationConfig field names, or 'field.key' to set a single
+    entry of a dict field (e.g. 'link_type_weights.PACKAGE_DEPENDENCY').
+
+    Args:
+        base_config: Config that every variant starts from
+        grid: Mapping of parameter path -> list of values to try
+
+    Returns:
+        List of (params, config) tuples, one per combination in the grid
+    """
+    paths = list(grid.keys())
+    variants = []
+    for values in itertools.product(*(grid[path] for path in paths)):
+        params = dict(zip(paths, values))
+        config = copy.deepcopy(base_config)
+        for path, value in params.items():
+            field_name, _, key = path.partition('.')
+            if not hasattr(config, field_name):
+                raise ValueError(f"Invalid sweep parameter: {path}")
+            if key:
+                getattr(config, field_name)[key] = value
+            else:
+                setattr(config, field_name, value)
+        variants.append((params, config))
+    return variants
+
+
+def _pretrust_key(config: SimulationConfig) -> str:
+    return json.dumps([getattr(config, f) for f in PRETRUST_CONFIG_FIELDS], sort_keys=True, default=str)
+
+
+def _init_sweep_worker(shared: Dict[str, Dict[str, pd.DataFrame]]) -> None:
+    _SWEEP_SHARED.clear()
+    _SWEEP_SHARED.update(shared)
+
+
+def _run_sweep_variant(task: Tuple[int, Dict[str, Any], SimulationConfig]) -> pd.DataFrame:
+    variant_id, params, config = task
+    calculator = DevtoolingCalculator(config)
+    analysis = calculator.run_reweighted(_SWEEP_SHARED[_pretrust_key(config)], serialize_value_flow=False)
+    cols = ['project_id', 'display_name', 'total_dependents', 'developer_links', 'is_eligible', 'v', 'v_aggregated']
+    df = analysis['devtooling_project_results'][cols].copy()
+    df.insert(0, 'variant_id', variant_id)
+    for i, (path, value) in enumerate(params.items(), start=1):
+        df.insert(i, path, [value] * len(df))
+    return df
+
+
+def run_sweep(
+    data: Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame],
+    base_config: SimulationConfig,
+    grid: Dict[str, List[Any]],
+    max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Evaluate a grid of SimulationConfig variants against one data snapshot.
+
+    The unweighted graph is built once, and pretrust / developer reputation once per
+    distinct pretrust setting. Each variant then only re-weights edges, runs
+    EigenTrust and ranks projects, in a process pool.
+
+    Args:
+        data: Tuple returned by load_data
+        base_config: Config that every variant starts from
+        grid: Mapping of parameter path -> values (see expand_config_grid)
+        max_workers: Number of worker processes (1 runs in-process)
+
+    Returns:
+        Tidy DataFrame with one row per (variant, devtooling project)
+    """
+    variants = expand_config_grid(base_config, grid)
+
+    graph_calculator = DevtoolingCalculator(base_config)
+    graph_calculator.analysis = dict(zip(SHARED_ANALYSIS_KEYS[:4], data))
+    graph_calculator._build_unweighted_graph()
+
+    shared = {}
+    for _, config in variants:
+        key = _pretrust_key(config)
+        if key in shared:
+            continue
+        calculator = DevtoolingCalculator(config)
+        calculator.analysis = dict(graph_calculator.analysis)
+        calculator._compute_onchain_project_pretrust()
+        calculator._compute_devtooling_project_pretrust()
+        calculator._compute_developer_reputation()
+        shared[key] = {k: calculator.analysis[k] for k in SHARED_ANALYSIS_KEYS}
+
+    tasks = [(variant_id, params, config) for variant_id, (params, config) in enumerate(variants)]
+    try:
+        if max_workers == 1:
+            _init_sweep_worker(shared)
+            results = [_run_sweep_variant(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_sweep_worker,
+                initargs=(shared,)
+            ) as executor:
+                results = list(executor.map(_run_sweep_variant, tasks))
+    finally:
+        # Do not keep the shared snapshot alive in this process once the sweep is done
+        _SWEEP_SHARED.clear()
+
+    return pd.concat(results, ignore_index=True)
+
+
+def run_sweep_simulation(
+    config_path: str,
+    grid: Dict[str, List[Any]],
+    max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Load the config and data snapshot once, then run a parameter sweep over it.
+    """
+    data_snapshot, simulation_config = load_config(config_path)
+    data = load_data(data_snapshot)
+    return run_sweep(data, simulation_config, grid, max_workers=max_workers)
+
+
 def save_results(analysis: Dict[str, Any]) -> None:
     """
     Save analysis results to CSV files.
@@ -13,18 +13,28 @@ Standardized 8-step model pipeline:
 8) Return 'analysis'
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, Tuple
+from pathlib import Path
+import sys
+from typing import Dict, Any, List, Optional, Tuple
 import yaml
 
+sys.path.append(str(Path(__file__).parent.parent))
+from models.utils.allocator import AllocationConfig
+from models.utils.analysis import MATERIALIZE_MODES, LazyAnalysis
+from models.utils.normalization import NORMALIZERS, aggregate, normalize, normalize_and_aggregate
+from models.utils.robustness import DEFAULT_CHUNK_SIZE, sample_allocations, summarize_allocations
+from models.utils.snapshot import TableSchema, load_table
+
 
 @dataclass
 class DataSnapshot:
     data_dir: str
     projects_file: str
     metrics_file: str
+    backend: str = 'csv'
 
 @dataclass
 class SimulationConfig:
@@ -33,6 +43,38 @@ class SimulationConfig:
     metrics: Dict[str, float]
     metric_variants: Dict[str, float]
     aggregation: Dict[str, str]
+    backend: str = 'pandas'
+    materialize: str = 'eager'
+
+@dataclass
+class MetricTensor:
+    """
+    Raw metrics summed into a dense (project, [chain,] metric, period) array.
+
+    Attributes:
+        values: Array of shape (projects, metrics, periods), or
+            (projects, chains, metrics, periods) when built per chain
+        projects: (project_id, project_name, display_name) labels of the first axis
+        chains: Chain labels of the chain axis (empty when chain-weighted)
+        metrics: Metric labels, in config order
+        periods: Period labels, in config order
+        observed: Boolean (metrics, periods) mask of combinations present in the data
+    """
+    values: np.ndarray
+    projects: pd.MultiIndex
+    chains: List[str]
+    metrics: List[str]
+    periods: List[str]
+    observed: np.ndarray
+
+VARIANTS = ['Adoption', 'Growth', 'Retention']
+
+# Analysis entries labelled from the arrays of _score_metric_tensor
+TENSOR_VARIANT_FRAMES = {
+    "pivoted_metric_variants": 'variants',
+    "normalized_metric_variants": 'normalized',
+    "weighted_metric_variants": 'weighted'
+}
 
 class OnchainBuildersCalculator:
     """
@@ -46,41 +88,310 @@ class OnchainBuildersCalculator:
     def run_analysis(self, df_data: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         """
         Main pipeline producing an 'analysis' dictionary with all intermediate steps.
+        With backend 'tensor', steps 1-6 run as array operations instead.
+
+        config.materialize controls which intermediates are built:
+        - 'eager' (default): every step runs and a plain dict is returned
+        - 'lazy': a LazyAnalysis is returned; each entry is computed on first access
+        - 'scores': only 'project_scores' is computed, with no intermediate frames
         """
-        analysis = {}
+        materialize = self.config.materialize
+        if materialize not in MATERIALIZE_MODES:
+            raise ValueError(f"Invalid materialize mode: {materialize}")
+        if self.config.backend not in ('pandas', 'tensor'):
+            raise ValueError(f"Invalid backend: {self.config.backend}")
+        if materialize == 'scores':
+            return self._run_scores_only(df_data)
+
+        analysis = LazyAnalysis(eager=materialize == 'eager')
+        if self.config.backend == 'tensor':
+            self._register_tensor_steps(analysis, df_data)
+        else:
+            self._register_pandas_steps(analysis, df_data)
+
+        # Step 7: Final weighting and flattening
+        analysis.register("final_results", lambda: self._prepare_final_results(analysis))
+
+        return dict(analysis) if materialize == 'eager' else analysis
 
+    def _register_pandas_steps(self, analysis: LazyAnalysis, df_data: pd.DataFrame) -> None:
         # Step 1: Pivot raw data
-        analysis["pivoted_raw_metrics_by_chain"] = self._filter_and_pivot_raw_metrics_by_chain(df_data)
+        analysis.register("pivoted_raw_metrics_by_chain", lambda: self._filter_and_pivot_raw_metrics_by_chain(df_data))
 
         # Step 2: Sum & weight
-        analysis["pivoted_raw_metrics_weighted_by_chain"] = self._sum_and_weight_raw_metrics_by_chain(
+        analysis.register("pivoted_raw_metrics_weighted_by_chain", lambda: self._sum_and_weight_raw_metrics_by_chain(
             analysis["pivoted_raw_metrics_by_chain"]
-        )
+        ))
 
         # Step 3: Calculate metric variants
-        analysis["pivoted_metric_variants"] = self._calculate_metric_variants(
+        analysis.register("pivoted_metric_variants", lambda: self._calculate_metric_variants(
             analysis["pivoted_raw_metrics_weighted_by_chain"]
-        )
+        ))
 
         # Step 4: Normalize
-        analysis["normalized_metric_variants"] = self._normalize_metric_variants(
+        analysis.register("normalized_metric_variants", lambda: self._normalize_metric_variants(
             analysis["pivoted_metric_variants"]
-        )
+        ))
 
         # Step 5: Apply weights
-        analysis["weighted_metric_variants"] = self._apply_weights_to_metric_variants(
+        analysis.register("weighted_metric_variants", lambda: self._apply_weights_to_metric_variants(
             analysis["normalized_metric_variants"]
-        )
+        ))
 
         # Step 6: Aggregate final scores
-        analysis["aggregated_project_scores"] = self._aggregate_metric_variants(
+        analysis.register("aggregated_project_scores", lambda: self._aggregate_metric_variants(
             analysis["weighted_metric_variants"]
+        ))
+
+    def _register_tensor_steps(self, analysis: LazyAnalysis, df_data: pd.DataFrame) -> None:
+        """
+        Run steps 1-6 on a (project, metric, period) tensor. The labelled
+        intermediate frames are registered as views of the tensor results;
+        the per-chain pivot is never built.
+        """
+        analysis["metric_tensor"] = self._build_metric_tensor(df_data)
+        analysis["metric_variant_arrays"] = self._score_metric_tensor(analysis["metric_tensor"].values)
+
+        analysis.register("pivoted_raw_metrics_weighted_by_chain", lambda: self._label_pivot(analysis["metric_tensor"]))
+        for key, array_name in TENSOR_VARIANT_FRAMES.items():
+            analysis.register(key, lambda name=array_name: self._label_variants(analysis, name))
+        analysis.register("aggregated_project_scores", lambda: pd.Series(
+            analysis["metric_variant_arrays"]['project_score'],
+            index=analysis["metric_tensor"].projects,
+            name='project_score'
+        ).to_frame())
+
+    def _run_scores_only(self, df_data: pd.DataFrame) -> LazyAnalysis:
+        """Score projects on the tensor and keep only the normalized weighted scores."""
+        tensor = self._build_metric_tensor(df_data)
+        scores = pd.Series(
+            self._score_projects(tensor.values),
+            index=tensor.projects,
+            name='weighted_score'
         )
+        analysis = LazyAnalysis()
+        analysis["project_scores"] = (scores / scores.sum()).sort_values(ascending=False)
+        return analysis
 
-        # Step 7: Final weighting and flattening
-        analysis["final_results"] = self._prepare_final_results(analysis)
+    def sample_allocations(
+        self,
+        df_data: pd.DataFrame,
+        allocation_config: AllocationConfig,
+        num_samples: int = 1000,
+        noise_scale: float = 0.1,
+        confidence: float = 0.9,
+        seed: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Estimate how stable allocations are under noise in the raw metrics.
+
+        Each draw multiplies every (project, chain, period, metric) amount by
+        mean-one lognormal noise, scores all draws as one stacked array and
+        allocates the budget for each with allocate_batch. Draws are scored with
+        the tensor kernel, which tests/test_onchain_builders.py checks against the
+        pandas steps.
+
+        Args:
+            df_data: Raw data as returned by load_data
+            allocation_config: AllocationConfig with budget and constraint parameters
+            num_samples: Number of perturbed draws
+            noise_scale: Standard deviation of the log noise (0 reproduces run_analysis)
+            confidence: Width of the reported interval
+            seed: Seed for reproducible draws
+            chunk_size: Draws scored per task
+            max_workers: Number of worker processes (1 runs in-process)
+
+        Returns:
+            DataFrame indexed by project_id with allocation mean, interval and funded share
+        """
+        tensor, shared = self._sampler_inputs(df_data, noise_scale)
+        allocations = sample_allocations(
+            _sample_onchain_scores, shared, allocation_config, num_samples,
+            seed=seed, chunk_size=chunk_size, max_workers=max_workers
+        )
+        project_ids = tensor.projects.get_level_values('project_id')
+        summary = summarize_allocations(project_ids, allocations, confidence)
+        display_names = pd.Series(tensor.projects.get_level_values('display_name'), index=project_ids)
+        summary.insert(0, 'display_name', summary.index.map(display_names))
+        return summary
+
+    def _sampler_inputs(self, df_data: pd.DataFrame, noise_scale: float) -> Tuple[MetricTensor, Dict[str, Any]]:
+        """Per-chain tensor and the shared base data of _sample_onchain_scores."""
+        tensor = self._build_metric_tensor(df_data, by_chain=True)
+
+        # Perturb only the nonzero per-chain amounts, then fold them into (project, metric, period) cells
+        project, chain, metric, period = np.nonzero(tensor.values)
+        shape = (len(tensor.projects), len(tensor.metrics), len(tensor.periods))
+        shared = {
+            'config': self.config,
+            'amounts': tensor.values[project, chain, metric, period] * self._chain_weights(tensor.chains)[chain],
+            'cells': np.ravel_multi_index((project, metric, period), shape),
+            'shape': shape,
+            'noise_scale': noise_scale
+        }
+        return tensor, shared
+
+    def _chain_weights(self, chains: Any) -> np.ndarray:
+        """Chain weight per entry of chains, defaulting to 1.0 for unlisted chains."""
+        return pd.Series(self.config.chains, dtype=np.float64).reindex(chains).fillna(1.0).to_numpy()
+
+    def _build_metric_tensor(self, df: pd.DataFrame, by_chain: bool = False) -> MetricTensor:
+        """
+        Accumulate raw metric amounts into a dense tensor in one bincount pass.
 
-        return analysis
+        Rows are filtered like _filter_and_pivot_raw_metrics_by_chain. Unless
+        by_chain is set, chain weights are applied while accumulating.
+        """
+        metrics = list(self.config.metrics.keys())
+        periods = list(self.config.periods.keys())
+        keys = ['project_id', 'project_name', 'display_name', 'chain']
+        df = df.loc[
+            df['metric_name'].isin(metrics) & df['measurement_period'].isin(periods),
+            keys + ['metric_name', 'measurement_period', 'amount']
+        ].dropna(subset=keys)
+
+        project_groups = df.groupby(keys[:3], sort=True, observed=True)
+        project_codes = project_groups.ngroup().to_numpy(dtype=np.int64)
+        projects = project_groups.size().index
+        metric_codes = _codes_in(df['metric_name'], metrics)
+        period_codes = _codes_in(df['measurement_period'], periods)
+        amounts = np.nan_to_num(df['amount'].to_numpy(dtype=np.float64))
+
+        num_metrics, num_periods = len(metrics), len(periods)
+        cell = metric_codes * num_periods + period_codes
+        if by_chain:
+            chain_codes, chains = pd.factorize(df['chain'], sort=True)
+            chains = list(chains)
+            slots = project_codes * len(chains) + chain_codes
+            shape = (len(projects), len(chains), num_metrics, num_periods)
+        else:
+            chain_codes, chain_labels = pd.factorize(df['chain'])
+            amounts = amounts * self._chain_weights(chain_labels)[chain_codes]
+            chains = []
+            slots = project_codes
+            shape = (len(projects), num_metrics, num_periods)
+
+        flat = slots * (num_metrics * num_periods) + cell
+        values = np.bincount(flat, weights=amounts, minlength=int(np.prod(shape))).reshape(shape)
+        observed = np.bincount(cell, minlength=num_metrics * num_periods).reshape(num_metrics, num_periods) > 0
+        return MetricTensor(values, projects, chains, metrics, periods, observed)
+
+    def _aggregation_settings(self) -> Tuple[str, str, float]:
+        """Return (normalization, method, p) from the aggregation config block."""
+        agg_config = self.config.aggregation if isinstance(self.config.aggregation, dict) else {}
+        return (
+            agg_config.get('normalization', 'minmax'),
+            agg_config.get('method', 'power_mean'),
+            agg_config.get('p', 2)
+        )
+
+    def _variant_weights(self) -> np.ndarray:
+        """(metrics, variants) weights; variants missing from the config keep their normalized value."""
+        return np.array([
+            [m_weight * self.config.metric_variants[v] if v in self.config.metric_variants else 1.0 for v in VARIANTS]
+            for m_weight in self.config.metrics.values()
+        ])
+
+    def _metric_variants(self, values: np.ndarray) -> np.ndarray:
+        """Adoption, Growth and Retention stacked on a new last axis of (..., projects, metrics, periods)."""
+        periods = list(self.config.periods.keys())
+        current_period = next(k for k, v in self.config.periods.items() if v == 'current')
+        previous_period = next(k for k, v in self.config.periods.items() if v == 'previous')
+        current = values[..., periods.index(current_period)]
+        previous = values[..., periods.index(previous_period)]
+        return np.stack([current, np.clip(current - previous, 0, None), np.minimum(current, previous)], axis=-1)
+
+    def _score_metric_tensor(self, values: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Compute steps 3-6 of run_analysis on chain-weighted metric arrays.
+
+        Args:
+            values: Array of shape (..., projects, metrics, periods); leading axes
+                (e.g. Monte-Carlo draws) are scored independently
+
+        Returns:
+            Dict of arrays: 'variants', 'normalized' and 'weighted' with shape
+            (..., projects, metrics, variants), and 'project_score' with shape (..., projects)
+        """
+        normalization, method, p = self._aggregation_settings()
+        variants = self._metric_variants(values)
+        normalized = normalize(variants, normalization, axis=-3)
+        weighted = normalized * self._variant_weights()
+        project_score = aggregate(weighted.reshape(weighted.shape[:-2] + (-1,)), method, p)
+        return {
+            'variants': variants,
+            'normalized': normalized,
+            'weighted': weighted,
+            'project_score': project_score
+        }
+
+    def _score_projects(self, values: np.ndarray, normalization: Optional[str] = None) -> np.ndarray:
+        """
+        Project scores only, with normalization, weighting and aggregation fused.
+
+        Args:
+            values: Array of shape (..., projects, metrics, periods)
+            normalization: Override for the configured normalization method
+
+        Returns:
+            Array of shape (..., projects) with unnormalized project scores
+        """
+        configured, method, p = self._aggregation_settings()
+        variants = self._metric_variants(values)
+        return normalize_and_aggregate(
+            variants.reshape(variants.shape[:-2] + (-1,)),
+            self._variant_weights().ravel(),
+            normalization or configured,
+            method,
+            p,
+            axis=-2
+        )
+
+    def compare_normalizations(self, df_data: pd.DataFrame, methods: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Score projects under several normalization methods in one pass over the data.
+
+        Args:
+            df_data: Raw data as returned by load_data
+            methods: Normalization methods to compare (defaults to all registered)
+
+        Returns:
+            DataFrame indexed by project with one column of weighted scores per method
+        """
+        tensor = self._build_metric_tensor(df_data)
+        scores = {}
+        for method in methods or list(NORMALIZERS):
+            project_score = self._score_projects(tensor.values, normalization=method)
+            scores[method] = project_score / project_score.sum()
+        return pd.DataFrame(scores, index=tensor.projects)
+
+    def _label_pivot(self, tensor: MetricTensor) -> pd.DataFrame:
+        """Chain-weighted tensor as the pivot layout of _sum_and_weight_raw_metrics_by_chain."""
+        # Only (period, metric) combinations present in the data, sorted like pivot_table
+        pivot_columns = sorted(
+            (period, metric)
+            for m, metric in enumerate(tensor.metrics)
+            for t, period in enumerate(tensor.periods)
+            if tensor.observed[m, t]
+        )
+        positions = [(tensor.metrics.index(metric), tensor.periods.index(period)) for period, metric in pivot_columns]
+        return pd.DataFrame(
+            tensor.values[:, [m for m, _ in positions], [t for _, t in positions]],
+            index=tensor.projects,
+            columns=pd.MultiIndex.from_tuples(pivot_columns, names=['measurement_period', 'metric_name'])
+        )
+
+    def _label_variants(self, analysis: Dict[str, Any], array_name: str) -> pd.DataFrame:
+        """One (projects, metrics, variants) array as a frame with (metric, variant) columns."""
+        tensor = analysis["metric_tensor"]
+        values = analysis["metric_variant_arrays"][array_name]
+        return pd.DataFrame(
+            values.reshape(len(tensor.projects), -1),
+            index=tensor.projects,
+            columns=pd.MultiIndex.from_product([tensor.metrics, VARIANTS])
+        )
 
     # --------------------------------------------------------------------
     # Internal methods
@@ -96,7 +407,8 @@ class OnchainBuildersCalculator:
                 columns=['measurement_period', 'metric_name'],
                 values='amount',
                 aggfunc='sum',
-                fill_value=0
+                fill_value=0,
+                observed=True
             )
         )
 
@@ -105,7 +417,7 @@ class OnchainBuildersCalculator:
         chain_weights = pd.Series(self.config.chains)
         weighted_df = (
             df.mul(df.index.get_level_values('chain').map(chain_weights).fillna(1.0), axis=0)
-              .groupby(['project_id', 'project_name', 'display_name'])
+              .groupby(['project_id', 'project_name', 'display_name'], observed=True)
               .sum()
         )
         return weighted_df
@@ -128,21 +440,15 @@ class OnchainBuildersCalculator:
 
     def _normalize_metric_variants(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Apply minmax normalization to each metric variant column.
-        TODO: Re-introduce support for other normalization methods.
-        """        
-        df_norm = df.copy()
-        for col in df_norm.columns:
-            df_norm[col] = self._minmax_scale(df_norm[col].values)
-        return df_norm
-    
-    def _minmax_scale(self, values: np.ndarray) -> np.ndarray:
-        """Min-max scaling with fallback to center_value if no range."""
-        center_value = 0.5
-        vmin, vmax = np.nanmin(values), np.nanmax(values)
-        if vmax == vmin:
-            return np.full_like(values, center_value)
-        return (values - vmin) / (vmax - vmin)
+        Normalize every metric variant column across projects in one call, using
+        the method named by `normalization` in the aggregation config (default minmax).
+        """
+        normalization, _, _ = self._aggregation_settings()
+        return pd.DataFrame(
+            normalize(df.to_numpy(dtype=np.float64), normalization, axis=0),
+            index=df.index,
+            columns=df.columns
+        )
 
     def _apply_weights_to_metric_variants(self, df: pd.DataFrame) -> pd.DataFrame:
         """Multiply metric & variant weights onto normalized data."""
@@ -158,24 +464,9 @@ class OnchainBuildersCalculator:
         Combine weighted, normalized metric variant columns into a single project score.
         By default, use a weighted power mean aggregator. The parameter 'p' can be tuned.
         """
-        n = df.shape[1]
+        _, method, p = self._aggregation_settings()
         out = df.copy()
-    
-        agg_config = getattr(self.config, 'aggregation', {})
-        method = agg_config.get('method', 'power_mean') if isinstance(agg_config, dict) else 'power_mean'
-        p = agg_config.get('p', 2) if isinstance(agg_config, dict) else 2
-        
-        if method == 'power_mean':
-            if p == 0: # geometric mean (not recommended)
-                epsilon = 1e-9
-                out['project_score'] = np.exp(np.log(df + epsilon).mean(axis=1))
-            else: # power mean
-                out['project_score'] = (df.pow(p).sum(axis=1) / n)**(1/p)
-        elif method == 'sum':
-            out['project_score'] = df.sum(axis=1)
-        else:
-            raise ValueError(f"Invalid aggregation method: {method}")
-
+        out['project_score'] = aggregate(df.to_numpy(dtype=np.float64), method, p, axis=1)
         return out
     
     def _flatten_columns(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -230,6 +521,25 @@ class OnchainBuildersCalculator:
         
         return final_df
 
+def _codes_in(values: pd.Series, labels: List[str]) -> np.ndarray:
+    """Position of each value in labels, resolved once per distinct value."""
+    codes, uniques = pd.factorize(values)
+    return pd.Index(labels).get_indexer(uniques)[codes].astype(np.int64)
+
+
+def _sample_onchain_scores(shared: Dict[str, Any], num_samples: int, rng: np.random.Generator) -> np.ndarray:
+    """Draw lognormal-perturbed per-chain metrics and score them as one stacked tensor."""
+    sigma = shared['noise_scale']
+    amounts = shared['amounts']
+    cell_count = int(np.prod(shared['shape']))
+    noise = np.exp(rng.normal(-0.5 * sigma ** 2, sigma, size=(num_samples, len(amounts))))
+    cells = shared['cells'][np.newaxis, :] + (np.arange(num_samples) * cell_count)[:, np.newaxis]
+    values = np.bincount(cells.ravel(), weights=(amounts * noise).ravel(), minlength=num_samples * cell_count)
+    values = values.reshape((num_samples,) + shared['shape'])
+    scores = OnchainBuildersCalculator(shared['config'])._score_projects(values)
+    return scores / scores.sum(axis=1, keepdims=True)
+
+
 # ------------------------------------------------------------------------
 # Load config & data
 # ------------------------------------------------------------------------
@@ -245,7 +555,8 @@ def load_config(config_path: str) -> Tuple[DataSnapshot, SimulationConfig]:
     ds = DataSnapshot(
         data_dir=ycfg['data_snapshot'].get('data_dir', "eval-algos/S7/data/onchain_testing"),
         projects_file=ycfg['data_snapshot'].get('projects_file', "projects_v1.csv"),
-        metrics_file=ycfg['data_snapshot'].get('metrics_file', "onchain_metrics_by_project.csv")
+        metrics_file=ycfg['data_snapshot'].get('metrics_file', "onchain_metrics_by_project.csv"),
+        backend=ycfg['data_snapshot'].get('backend', 'csv')
     )
 
     # Load simulation config directly from YAML
@@ -255,22 +566,47 @@ def load_config(config_path: str) -> Tuple[DataSnapshot, SimulationConfig]:
         chains=sim.get('chains', {}),
         metrics=sim.get('metrics', {}),
         metric_variants=sim.get('metric_variants', {}),
-        aggregation=sim.get('aggregation', {})
+        aggregation=sim.get('aggregation', {}),
+        backend=sim.get('backend', 'pandas'),
+        materialize=sim.get('materialize', 'eager')
     )
 
     return ds, sc
 
+# Typed layouts for the Parquet backend; only the projected columns are loaded
+PROJECTS_SCHEMA = TableSchema(
+    columns=('project_id', 'project_name', 'display_name')
+)
+METRICS_SCHEMA = TableSchema(
+    date_columns=('sample_date',),
+    categorical_columns=('project_id', 'chain', 'metric_name'),
+    columns=('project_id', 'chain', 'sample_date', 'metric_name', 'amount')
+)
+
+
 def load_data(ds: DataSnapshot) -> pd.DataFrame:
     """
     Load raw CSV data, merge into single DataFrame.
+    With backend 'parquet', the CSVs are read through a typed Parquet cache.
     """
     def path(x: str):
         return f"{ds.data_dir}/{x}"
 
-    df_projects = pd.read_csv(path(ds.projects_file))
-    df_metrics = pd.read_csv(path(ds.metrics_file))
-
-    df_metrics['measurement_period'] = pd.to_datetime(df_metrics['sample_date']).dt.strftime('%b %Y')
+    if ds.backend == 'parquet':
+        df_projects = load_table(path(ds.projects_file), PROJECTS_SCHEMA)
+        df_metrics = load_table(path(ds.metrics_file), METRICS_SCHEMA)
+    elif ds.backend == 'csv':
+        df_projects = pd.read_csv(path(ds.projects_file), usecols=PROJECTS_SCHEMA.columns)
+        df_metrics = pd.read_csv(path(ds.metrics_file), usecols=METRICS_SCHEMA.columns)
+    else:
+        raise ValueError(f"Invalid data snapshot backend: {ds.backend}")
+
+    # Format each distinct date once rather than every row
+    sample_dates = pd.to_datetime(df_metrics['sample_date'])
+    periods = pd.Series(sample_dates.unique())
+    df_metrics['measurement_period'] = sample_dates.map(
+        pd.Series(periods.dt.strftime('%b %Y').to_numpy(), index=periods)
+    )
     return df_metrics.merge(df_projects, on='project_id', how='left')
 
 
@@ -295,6 +631,29 @@ def run_simulation(config_path: str) -> Dict[str, Any]:
     return analysis
 
 
+def run_robustness_simulation(config_path: str, max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Run the Monte-Carlo allocation robustness check configured in the YAML
+    'robustness' and 'allocation' blocks.
+    """
+    with open(config_path, 'r') as f:
+        ycfg = yaml.safe_load(f)
+    robustness = ycfg.get('robustness', {})
+
+    ds, sim_cfg = load_config(config_path)
+    df_data = load_data(ds)
+    calculator = OnchainBuildersCalculator(sim_cfg)
+    return calculator.sample_allocations(
+        df_data,
+        AllocationConfig(**ycfg['allocation']),
+        num_samples=robustness.get('num_samples', 1000),
+        noise_scale=robustness.get('noise_scale', 0.1),
+        confidence=robustness.get('confidence', 0.9),
+        seed=robustness.get('seed'),
+        max_workers=max_workers
+    )
+
+
 # ------------------------------------------------------------------------
 # Serialize
 # ------------------------------------------------------------------------
@@ -309,7 +668,8 @@ def save_results(analysis: Dict[str, Any]) -> None:
         return
 
     out_path = f"{ds.data_dir}/onchain_builders_testing_results.csv"
-    analysis["final_results"].to_csv(out_path, index=True)
+    results = analysis["final_results"] if "final_results" in analysis else analysis["project_scores"]
+    results.to_csv(out_path, index=True)
     print(f"Saved onchain builders results to {out_path}")
 
 
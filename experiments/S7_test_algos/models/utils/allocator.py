@@ -1,15 +1,16 @@
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
+from typing import Optional
 
 
-BUDGET_TOLERANCE = 1.0 / 1_000_000  # Required precision for budget allocation
-MAX_NORM_ITERATIONS = 100  # Prevent infinite loops
-
 @dataclass
 class AllocationConfig:
     budget: float
     min_amount_per_project: float
     max_share_per_project: float
+    # Ignored: allocate_batch solves each allocation exactly, without iterating.
+    # Kept so that configs which still set it load unchanged.
     max_iterations: int = 50
 
 def allocate_with_constraints(
@@ -19,7 +20,7 @@ def allocate_with_constraints(
     rounding: int = 2,
 ) -> pd.Series:
     """
-    Iteratively allocates the budget while enforcing constraints.
+    Allocates the budget in proportion to scores while enforcing constraints.
     
     Args:
         project_scores: Series with project names as index and normalized scores as values (should sum to 1.0)
@@ -34,78 +35,112 @@ def allocate_with_constraints(
     if abs(project_scores.sum() - 1.0) > 1e-6:
         raise ValueError("Project scores must be normalized to sum to 1.0")
 
-    # 1. Initial allocation based on normalized scores
-    allocations = project_scores * config.budget
-    max_per_project = config.max_share_per_project * config.budget
-    
-    # 2. Cap projects above max and redistribute excess
-    while True:
-        over_max = allocations > max_per_project
-        if not over_max.any():
-            break
-            
-        excess = (allocations[over_max] - max_per_project).sum()
-        allocations[over_max] = max_per_project
-        
-        # Redistribute excess to projects under max
-        under_max = allocations < max_per_project
-        if under_max.any():
-            remaining_scores = project_scores[under_max]
-            remaining_scores = remaining_scores / remaining_scores.sum()
-            allocations[under_max] += remaining_scores * excess
-    
-    # 3. Remove projects below min and redistribute
-    while True:
-        below_min = (allocations > 0) & (allocations < config.min_amount_per_project)
-        if not below_min.any():
-            break
-            
-        excess = allocations[below_min].sum()
-        allocations[below_min] = 0
-        
-        # Redistribute to remaining projects proportionally
-        active_projects = allocations > 0
-        if active_projects.any():
-            space_to_max = max_per_project - allocations[active_projects]
-            if space_to_max.sum() > 0:
-                remaining_scores = project_scores[active_projects]
-                remaining_scores = remaining_scores / remaining_scores.sum()
-                additional = remaining_scores * excess
-                additional = additional.clip(upper=space_to_max)
-                allocations[active_projects] += additional
-    
-    # 4. Final max cap pass
-    over_max = allocations > max_per_project
-    if over_max.any():
-        excess = (allocations[over_max] - max_per_project).sum()
-        allocations[over_max] = max_per_project
-        
-        # Redistribute any remaining excess to projects under max
-        under_max = (allocations > 0) & (allocations < max_per_project)
-        if under_max.any():
-            space_to_max = max_per_project - allocations[under_max]
-            remaining_scores = project_scores[under_max]
-            remaining_scores = remaining_scores / remaining_scores.sum()
-            additional = remaining_scores * excess
-            additional = additional.clip(upper=space_to_max)
-            allocations[under_max] += additional
-
-    # 5. Final normalization to exactly match budget
-    norm_iteration = 0
-    while abs(allocations.sum() - config.budget) > BUDGET_TOLERANCE and norm_iteration < MAX_NORM_ITERATIONS:
-        if allocations.sum() > 0:
-            scale_factor = config.budget / allocations.sum()
-            allocations = allocations * scale_factor
-            # Clip to ensure we don't exceed max after scaling
-            allocations = allocations.clip(upper=max_per_project)
-        norm_iteration += 1
-    
-    allocations = allocations.round(rounding)
+    allocations = pd.Series(
+        allocate_batch(project_scores.to_numpy(dtype=np.float64)[np.newaxis, :], config, rounding)[0],
+        index=project_scores.index,
+        name=project_scores.name
+    )
     if print_results:
         print_results_to_terminal(allocations, config)
     return allocations
 
 
+def allocate_batch(
+    score_matrix: np.ndarray,
+    config: AllocationConfig,
+    rounding: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Allocates the budget for many score vectors at once by water-filling.
+
+    Each row is solved exactly: projects receive min(max_per_project, level * score),
+    with the level chosen so the row sums to the budget. Projects that would receive
+    less than min_amount_per_project are dropped, lowest scores first, keeping the
+    largest set of top-scored projects that all clear the minimum. If the budget
+    exceeds what the active projects can absorb at the cap, every active project is
+    capped and the remainder stays unallocated.
+
+    Args:
+        score_matrix: Array of shape (n_samples, n_projects) with non-negative scores;
+            rows need not be normalized
+        config: AllocationConfig with budget and constraint parameters
+        rounding: Number of decimal places to round allocations to (None to skip)
+
+    Returns:
+        Array of allocations with the same shape as score_matrix
+    """
+    scores = np.atleast_2d(np.asarray(score_matrix, dtype=np.float64))
+    if (scores < 0).any():
+        raise ValueError("Project scores must be non-negative")
+    n_rows, n_cols = scores.shape
+    if n_cols == 0:
+        return np.zeros_like(scores)
+    budget = config.budget
+    max_per_project = config.max_share_per_project * budget
+    rows = np.arange(n_rows)
+
+    # Sort each row by descending score; prefix[:, k] is the sum of the top k scores
+    order = np.argsort(-scores, axis=1, kind='stable')
+    sorted_scores = np.take_along_axis(scores, order, axis=1)
+    prefix = np.zeros((n_rows, n_cols + 1))
+    np.cumsum(sorted_scores, axis=1, out=prefix[:, 1:])
+    num_positive = (sorted_scores > 0).sum(axis=1)
+
+    def _level(active: np.ndarray, capped: np.ndarray) -> np.ndarray:
+        """Scale applied to uncapped scores when the top `capped` of `active` projects sit at the cap."""
+        tail = prefix[rows, active] - prefix[rows, capped]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(tail > 0, (budget - capped * max_per_project) / tail, 0.0)
+
+    def _num_capped(active: np.ndarray) -> np.ndarray:
+        """Smallest number of capped projects that keeps every uncapped project under the cap."""
+        lo, hi = np.zeros(n_rows, dtype=np.int64), active.astype(np.int64)
+        while (lo < hi).any():
+            mid = (lo + hi) // 2
+            next_score = sorted_scores[rows, np.minimum(mid, n_cols - 1)]
+            fits = (mid >= active) | (_level(active, mid) * next_score <= max_per_project)
+            hi = np.where(fits, mid, hi)
+            lo = np.where(fits, lo, mid + 1)
+        return lo
+
+    def _smallest_allocation(active: np.ndarray) -> np.ndarray:
+        capped = _num_capped(active)
+        last_score = sorted_scores[rows, np.maximum(active - 1, 0)]
+        uncapped = np.minimum(max_per_project, _level(active, capped) * last_score)
+        return np.where(capped >= active, max_per_project, uncapped)
+
+    # The smallest allocation only shrinks as more projects share the budget, so
+    # binary search for the largest active set that clears the minimum
+    lo, hi = np.zeros(n_rows, dtype=np.int64), num_positive.astype(np.int64)
+    while (lo < hi).any():
+        searching = lo < hi
+        mid = (lo + hi + 1) // 2
+        clears = _smallest_allocation(mid) >= config.min_amount_per_project
+        lo = np.where(searching & clears, mid, lo)
+        hi = np.where(searching & ~clears, mid - 1, hi)
+    active = lo
+
+    # Tied projects share a fate: if the cut falls inside a tie, drop the whole tie
+    first_dropped = sorted_scores[rows, np.minimum(active, n_cols - 1)]
+    above_cut = (sorted_scores > first_dropped[:, np.newaxis]).sum(axis=1)
+    active = np.where(active < num_positive, np.minimum(active, above_cut), active)
+
+    capped = _num_capped(active)
+    level = _level(active, capped)
+    position = np.arange(n_cols)[np.newaxis, :]
+    sorted_alloc = np.where(
+        position < capped[:, np.newaxis],
+        max_per_project,
+        np.where(position < active[:, np.newaxis], level[:, np.newaxis] * sorted_scores, 0.0)
+    )
+
+    allocations = np.empty_like(sorted_alloc)
+    np.put_along_axis(allocations, order, sorted_alloc, axis=1)
+    if rounding is not None:
+        allocations = allocations.round(rounding)
+    return allocations
+
+
 def print_results_to_terminal(
     allocations: pd.Series,
     config: AllocationConfig
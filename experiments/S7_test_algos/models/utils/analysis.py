@@ -0,0 +1,116 @@
+"""
+Lazy container for model 'analysis' dicts.
+
+Entries are either stored values or registered callables that compute the value
+on first access. Materialized DataFrames can be dropped again (and recomputed
+on demand) or spilled to Parquet and read back when next accessed.
+"""
+from collections.abc import MutableMapping
+from pathlib import Path
+import pandas as pd
+from typing import Any, Callable, Dict, Iterator, Union
+
+
+MATERIALIZE_MODES = ('eager', 'lazy', 'scores')
+
+
+class LazyAnalysis(MutableMapping):
+    """
+    Dict-like analysis store with on-demand computation of registered entries.
+
+    Example:
+        analysis = LazyAnalysis()
+        analysis.register('final_results', build_final_results)
+        analysis['final_results']          # computed here, then cached
+        analysis.spill('final_results', 'tmp/')
+        analysis['final_results']          # read back from Parquet
+    """
+
+    def __init__(self, eager: bool = False):
+        self.eager = eager
+        self._values: Dict[str, Any] = {}
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._keys: Dict[str, None] = {}
+
+    def register(self, key: str, loader: Callable[[], Any]) -> None:
+        """
+        Register a callable that produces the entry for key.
+
+        The callable may return the value or store it into this container itself.
+        In eager mode it runs immediately.
+        """
+        self._keys[key] = None
+        self._loaders[key] = loader
+        self._values.pop(key, None)
+        if self.eager:
+            self[key]
+
+    def is_materialized(self, key: str) -> bool:
+        return key in self._values
+
+    def drop(self, key: str) -> None:
+        """Release a materialized entry; entries without a loader are removed entirely."""
+        self._values.pop(key, None)
+        if key not in self._loaders:
+            self._keys.pop(key, None)
+
+    def spill(self, key: str, directory: Union[str, Path]) -> Path:
+        """
+        Write a DataFrame or Series entry to Parquet and release it from memory.
+
+        Returns:
+            Path to the written Parquet file
+
+        Raises:
+            TypeError: If the entry is not a DataFrame or Series.
+        """
+        value = self[key]
+        if not isinstance(value, (pd.DataFrame, pd.Series)):
+            raise TypeError(f"Only DataFrame or Series entries can be spilled, got {type(value).__name__} for '{key}'")
+
+        path = Path(directory) / f"{key}.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        is_series = isinstance(value, pd.Series)
+        series_name = value.name if is_series else None
+        (value.to_frame() if is_series else value).to_parquet(path)
+
+        def load() -> Any:
+            df = pd.read_parquet(path)
+            return df.iloc[:, 0].rename(series_name) if is_series else df
+
+        self._loaders[key] = load
+        self._values.pop(key)
+        return path
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._values:
+            if key not in self._loaders:
+                raise KeyError(key)
+            value = self._loaders[key]()
+            if key not in self._values:
+                self._values[key] = value
+        return self._values[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._keys[key] = None
+        self._values[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._keys:
+            raise KeyError(key)
+        del self._keys[key]
+        self._values.pop(key, None)
+        self._loaders.pop(key, None)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        entries = ', '.join(f"{k}{'' if k in self._values else ' (lazy)'}" for k in self._keys)
+        return f"LazyAnalysis({entries})"
@@ -0,0 +1,419 @@
+"""
+Native EigenTrust solver built on NumPy arrays.
+
+The transition matrix is stored in CSR form (row pointers, column indices and
+row-normalized values) built directly from edge columns, so large graphs never
+round-trip through Python objects.
+"""
+from dataclasses import dataclass
+from functools import cached_property
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+
+DEFAULT_TOLERANCE = 1e-8   # L1 change between iterations treated as converged
+DEFAULT_MAX_ITERATIONS = 1000
+DEFAULT_BATCH_BYTES = 512 * 1024 ** 2   # Working memory budget of one batched solve
+
+# Peak bytes a batched solve holds per (edge, sample): the weights, flattened source
+# and target indices, normalized values and the gathered trust, plus temporaries
+BATCH_BYTES_PER_EDGE_SAMPLE = 8 * 8
+
+
+@dataclass
+class TrustGraph:
+    """
+    Row-normalized transition matrix in CSR form.
+
+    Attributes:
+        node_ids: Array mapping node index -> original node id
+        indptr: CSR row pointers (length n + 1)
+        indices: CSR column indices (target node per edge)
+        data: Row-normalized edge weights
+        dangling: Boolean mask of nodes without outgoing trust
+        weights: Coalesced edge weights before normalization (kept for patch_trust_graph)
+    """
+    node_ids: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    dangling: np.ndarray
+    weights: Optional[np.ndarray] = None
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    @cached_property
+    def rows(self) -> np.ndarray:
+        """Expand CSR row pointers into a source index per edge."""
+        return np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+
+    @cached_property
+    def node_index(self) -> pd.Index:
+        """Lookup from node id to node index."""
+        return pd.Index(self.node_ids)
+
+    def propagate(self, t: np.ndarray) -> np.ndarray:
+        """Compute C^T t, i.e. the trust each node receives from its sources."""
+        return np.bincount(self.indices, weights=self.data * t[self.rows], minlength=self.num_nodes)
+
+
+@dataclass
+class EigenTrustResult:
+    scores: pd.Series
+    iterations: int
+    residual: float
+    converged: bool
+
+    def diagnostics(self) -> Dict[str, Any]:
+        return {
+            'iterations': self.iterations,
+            'residual': self.residual,
+            'converged': self.converged
+        }
+
+
+@dataclass
+class EigenTrustBatchResult:
+    """
+    Scores of a batched solve, with convergence diagnostics per sample.
+
+    Attributes:
+        node_ids: Array mapping node index -> original node id
+        scores: Array of shape (n_samples, n_nodes)
+        iterations: Number of power iterations run (shared by all samples)
+        residuals: Final L1 change between iterations of each sample
+        converged: Whether each sample's residual fell below the tolerance
+    """
+    node_ids: np.ndarray
+    scores: np.ndarray
+    iterations: int
+    residuals: np.ndarray
+    converged: np.ndarray
+
+
+def batch_size(num_edges: int, max_bytes: int = DEFAULT_BATCH_BYTES) -> int:
+    """Number of samples a batched solve over num_edges edges can take within max_bytes."""
+    return max(1, int(max_bytes // (BATCH_BYTES_PER_EDGE_SAMPLE * max(num_edges, 1))))
+
+
+def _index_nodes(
+    src: pd.Series,
+    dst: pd.Series,
+    extra_nodes: Optional[pd.Series] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Factorize edge endpoints (and extra nodes) into a shared integer index."""
+    all_ids = [np.asarray(src), np.asarray(dst)]
+    if extra_nodes is not None:
+        all_ids.append(np.asarray(extra_nodes))
+    codes, node_ids = pd.factorize(np.concatenate(all_ids))
+    src_idx = codes[:len(src)].astype(np.int64)
+    dst_idx = codes[len(src):len(src) + len(dst)].astype(np.int64)
+    return src_idx, dst_idx, np.asarray(node_ids)
+
+
+def build_trust_graph(
+    src: pd.Series,
+    dst: pd.Series,
+    weights: pd.Series,
+    extra_nodes: Optional[pd.Series] = None
+) -> TrustGraph:
+    """
+    Build a CSR transition matrix from edge columns.
+
+    Duplicate (src, dst) pairs are summed and each row is normalized so that the
+    outgoing trust of every node sums to 1.
+
+    Args:
+        src: Source node id per edge
+        dst: Target node id per edge
+        weights: Non-negative edge weights
+        extra_nodes: Additional node ids (e.g. pretrust seeds) to include in the index
+
+    Returns:
+        TrustGraph over the union of all node ids
+    """
+    src_idx, dst_idx, node_ids = _index_nodes(src, dst, extra_nodes)
+    keys, values = _coalesce(src_idx * len(node_ids) + dst_idx, weights)
+    return _from_coalesced(node_ids, keys, values)
+
+
+def patch_trust_graph(
+    graph: TrustGraph,
+    scale: Optional[np.ndarray] = None,
+    removed: Optional[Tuple[pd.Series, pd.Series]] = None,
+    added: Optional[Tuple[pd.Series, pd.Series, pd.Series]] = None,
+    extra_nodes: Optional[pd.Series] = None
+) -> TrustGraph:
+    """
+    Update a TrustGraph in place of rebuilding it from the full edge list.
+
+    Existing weights are rescaled, (src, dst) pairs in removed are deleted and
+    the edges in added are summed in; only the changed entries are located
+    (by binary search over the sorted CSR keys) and the rows are renormalized.
+    New node ids are appended, so existing nodes keep their index.
+
+    Args:
+        graph: TrustGraph built by build_trust_graph
+        scale: Factor per existing entry (in CSR order) applied to its weight
+        removed: Source and target node ids of the entries to delete
+        added: Source, target and weight columns of the edges to add
+        extra_nodes: Additional node ids to include in the index
+
+    Returns:
+        TrustGraph equal to rebuilding from the updated edge list, up to node order
+    """
+    values = graph.weights if scale is None else graph.weights * scale
+    added_src, added_dst, added_weights = added if added is not None else ((), (), ())
+    node_ids = _extend_node_ids(graph, [added_src, added_dst, () if extra_nodes is None else extra_nodes])
+    n = len(node_ids)
+    keys = graph.rows * n + graph.indices
+
+    if removed is not None and len(removed[0]):
+        src_idx = graph.node_index.get_indexer(np.asarray(removed[0]))
+        dst_idx = graph.node_index.get_indexer(np.asarray(removed[1]))
+        known = (src_idx >= 0) & (dst_idx >= 0)
+        found, positions = _locate(keys, src_idx[known] * n + dst_idx[known])
+        keep = np.ones(len(keys), dtype=bool)
+        keep[positions[found]] = False
+        keys, values = keys[keep], values[keep]
+
+    if len(added_src):
+        index = pd.Index(node_ids)
+        new_keys = index.get_indexer(np.asarray(added_src)) * n + index.get_indexer(np.asarray(added_dst))
+        new_keys, new_values = _coalesce(new_keys, added_weights)
+        found, positions = _locate(keys, new_keys)
+        values = values.copy() if values is graph.weights else values
+        values[positions[found]] += new_values[found]
+        keys = np.insert(keys, positions[~found], new_keys[~found])
+        values = np.insert(values, positions[~found], new_values[~found])
+
+    return _from_coalesced(node_ids, keys, values)
+
+
+def _coalesce(keys: np.ndarray, weights: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum weights of duplicate keys; keys sort by row first, giving CSR ordering."""
+    keys, inverse = np.unique(keys, return_inverse=True)
+    return keys, np.bincount(inverse, weights=np.asarray(weights, dtype=np.float64))
+
+
+def _locate(keys: np.ndarray, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Insertion positions of targets in sorted keys, and whether each is present."""
+    positions = np.searchsorted(keys, targets)
+    found = positions < len(keys)
+    found[found] = keys[positions[found]] == targets[found]
+    return found, positions
+
+
+def _extend_node_ids(graph: TrustGraph, id_columns: Sequence[Sequence[Any]]) -> np.ndarray:
+    """Append ids not yet in the graph to its node index, in order of first appearance."""
+    ids = np.concatenate([np.asarray(col, dtype=object) for col in id_columns])
+    missing = pd.unique(ids[graph.node_index.get_indexer(ids) < 0])
+    if not len(missing):
+        return graph.node_ids
+    return np.concatenate([graph.node_ids, np.asarray(missing)])
+
+
+def _from_coalesced(node_ids: np.ndarray, keys: np.ndarray, values: np.ndarray) -> TrustGraph:
+    """Row-normalize sorted (row * n + column) keys and their summed weights into CSR form."""
+    n = len(node_ids)
+    keep = values > 0
+    keys, values = keys[keep], values[keep]
+    rows, indices = np.divmod(keys, n)
+
+    row_sums = np.bincount(rows, weights=values, minlength=n)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n))])
+
+    return TrustGraph(
+        node_ids=node_ids,
+        indptr=indptr,
+        indices=indices,
+        data=values / row_sums[rows],
+        dangling=row_sums == 0,
+        weights=values
+    )
+
+
+def align_pretrust(node_ids: np.ndarray, ids: pd.Series, values: pd.Series) -> np.ndarray:
+    """
+    Map pretrust values onto the node index and normalize them to sum to 1.
+
+    Raises:
+        ValueError: If no positive pretrust lands on a node in the graph.
+    """
+    p = (
+        pd.Series(np.asarray(values, dtype=np.float64), index=np.asarray(ids))
+        .groupby(level=0).sum()
+        .reindex(node_ids, fill_value=0.0)
+        .to_numpy()
+    )
+    p = np.clip(p, 0, None)
+    total = p.sum()
+    if total <= 0:
+        raise ValueError("No pretrust scores found - check computed pretrust scores")
+    return p / total
+
+
+def power_iterate(
+    graph: TrustGraph,
+    pretrust: np.ndarray,
+    alpha: float,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    initial: Optional[np.ndarray] = None
+) -> EigenTrustResult:
+    """
+    Run EigenTrust power iteration: t = (1 - alpha) * C^T t + alpha * p.
+
+    Trust held by dangling nodes is teleported back according to pretrust.
+
+    Args:
+        graph: TrustGraph with row-normalized transitions
+        pretrust: Normalized pretrust vector aligned to graph.node_ids
+        alpha: Teleport probability towards pretrust
+        tolerance: L1 change between iterations below which the solve stops
+        max_iterations: Hard cap on the number of iterations
+        initial: Optional starting vector (defaults to pretrust)
+
+    Returns:
+        EigenTrustResult with scores indexed by node id and convergence diagnostics
+    """
+    t = pretrust.copy() if initial is None else initial / initial.sum()
+    residual = np.inf
+    iterations = 0
+    while iterations < max_iterations:
+        dangling_mass = t[graph.dangling].sum()
+        t_new = (1 - alpha) * (graph.propagate(t) + dangling_mass * pretrust) + alpha * pretrust
+        residual = np.abs(t_new - t).sum()
+        t = t_new
+        iterations += 1
+        if residual < tolerance:
+            break
+
+    return EigenTrustResult(
+        scores=pd.Series(t, index=pd.Index(graph.node_ids, name='i'), name='v'),
+        iterations=iterations,
+        residual=float(residual),
+        converged=bool(residual < tolerance)
+    )
+
+
+def run_eigentrust(
+    df_edges: pd.DataFrame,
+    df_pretrust: pd.DataFrame,
+    alpha: float,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    initial_scores: Optional[pd.Series] = None
+) -> EigenTrustResult:
+    """
+    Run EigenTrust on edge and pretrust frames.
+
+    Args:
+        df_edges: DataFrame with columns 'i', 'j' and 'v' (edge weight)
+        df_pretrust: DataFrame with columns 'i' and 'v' (pretrust weight)
+        alpha: Teleport probability towards pretrust
+        tolerance: Convergence tolerance on the L1 change between iterations
+        max_iterations: Maximum number of power iterations
+        initial_scores: Optional scores indexed by node id to warm-start from
+            (e.g. the previous snapshot); nodes missing from it start at pretrust
+
+    Returns:
+        EigenTrustResult with scores indexed by node id
+    """
+    graph = build_trust_graph(df_edges['i'], df_edges['j'], df_edges['v'], extra_nodes=df_pretrust['i'])
+    return solve_eigentrust(graph, df_pretrust, alpha, tolerance, max_iterations, initial_scores)
+
+
+def solve_eigentrust(
+    graph: TrustGraph,
+    df_pretrust: pd.DataFrame,
+    alpha: float,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    initial_scores: Optional[pd.Series] = None
+) -> EigenTrustResult:
+    """
+    Run EigenTrust on a prebuilt TrustGraph; see run_eigentrust.
+
+    The graph must include every pretrust node (build it with extra_nodes).
+    """
+    pretrust = align_pretrust(graph.node_ids, df_pretrust['i'], df_pretrust['v'])
+    initial = None
+    if initial_scores is not None:
+        initial = initial_scores.groupby(level=0).sum().reindex(graph.node_ids).to_numpy(dtype=np.float64)
+        initial = np.where(np.isnan(initial), pretrust, initial)
+    return power_iterate(graph, pretrust, alpha, tolerance, max_iterations, initial=initial)
+
+
+def run_eigentrust_batch(
+    df_edges: pd.DataFrame,
+    df_pretrust: pd.DataFrame,
+    weight_samples: np.ndarray,
+    alpha: float,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS
+) -> EigenTrustBatchResult:
+    """
+    Run EigenTrust for many edge weightings of the same graph at once.
+
+    All samples share the edge structure and pretrust; each column of
+    weight_samples gives one weighting. Iteration stops once every sample has
+    converged. Working memory is about BATCH_BYTES_PER_EDGE_SAMPLE bytes per
+    (edge, sample); use batch_size to pick how many samples to pass at once.
+
+    Args:
+        df_edges: DataFrame with columns 'i' and 'j'
+        df_pretrust: DataFrame with columns 'i' and 'v' (pretrust weight)
+        weight_samples: Non-negative array of shape (n_edges, n_samples)
+        alpha: Teleport probability towards pretrust
+        tolerance: Convergence tolerance on the L1 change between iterations
+        max_iterations: Maximum number of power iterations
+
+    Returns:
+        EigenTrustBatchResult with scores of shape (n_samples, n_nodes)
+    """
+    src, dst, node_ids = _index_nodes(df_edges['i'], df_edges['j'], df_pretrust['i'])
+    n = len(node_ids)
+    weights = np.asarray(weight_samples, dtype=np.float64).T    # (n_samples, n_edges)
+    num_samples = weights.shape[0]
+
+    # Offset node indices per sample so a single bincount covers the whole batch
+    offsets = (np.arange(num_samples) * n)[:, np.newaxis]
+    flat_src = (src[np.newaxis, :] + offsets).ravel()
+    flat_dst = (dst[np.newaxis, :] + offsets).ravel()
+
+    row_sums = np.bincount(flat_src, weights=weights.ravel(), minlength=num_samples * n).reshape(num_samples, n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        data = np.where(weights > 0, weights / row_sums[:, src], 0.0).ravel()
+    dangling = row_sums == 0
+    del weights, row_sums
+
+    pretrust = align_pretrust(node_ids, df_pretrust['i'], df_pretrust['v'])
+
+    t = np.tile(pretrust, (num_samples, 1))
+    residual = np.full(num_samples, np.inf)
+    iterations = 0
+    while iterations < max_iterations:
+        dangling_mass = (t * dangling).sum(axis=1, keepdims=True)
+        received = np.bincount(flat_dst, weights=data * t.ravel()[flat_src], minlength=num_samples * n)
+        t_new = (1 - alpha) * (received.reshape(num_samples, n) + dangling_mass * pretrust) + alpha * pretrust
+        residual = np.abs(t_new - t).sum(axis=1)
+        t = t_new
+        iterations += 1
+        if (residual < tolerance).all():
+            break
+
+    return EigenTrustBatchResult(
+        node_ids=node_ids,
+        scores=t,
+        iterations=iterations,
+        residuals=residual,
+        converged=residual < tolerance
+    )
@@ -0,0 +1,152 @@
+"""
+Vectorized normalization and aggregation of metric matrices.
+
+Every normalizer maps an array to [0, 1] along one axis (the project axis) in a
+single call, so whole variant matrices or stacked Monte-Carlo tensors are
+normalized at once. Columns without any spread fall back to CENTER_VALUE.
+"""
+import numpy as np
+from typing import Callable, Dict
+
+
+CENTER_VALUE = 0.5   # Score given to every project when a column has no spread
+ZSCORE_CLIP = 3.0    # Standard deviations mapped onto [0, 1] by the z-score normalizer
+IQR_FENCE = 1.5      # Tukey fence multiplier used by the robust normalizer
+
+Normalizer = Callable[[np.ndarray, int], np.ndarray]
+
+NORMALIZERS: Dict[str, Normalizer] = {}
+
+
+def register_normalizer(name: str) -> Callable[[Normalizer], Normalizer]:
+    """Decorator adding a normalizer (values, axis) -> normalized values to the registry."""
+    def decorator(func: Normalizer) -> Normalizer:
+        NORMALIZERS[name] = func
+        return func
+    return decorator
+
+
+def _rescale(values: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """Map [low, high] onto [0, 1], using CENTER_VALUE where low == high."""
+    span = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(span == 0, CENTER_VALUE, (values - low) / span)
+
+
+@register_normalizer('minmax')
+def minmax(values: np.ndarray, axis: int = 0) -> np.ndarray:
+    return _rescale(values, np.nanmin(values, axis=axis, keepdims=True), np.nanmax(values, axis=axis, keepdims=True))
+
+
+@register_normalizer('log_minmax')
+def log_minmax(values: np.ndarray, axis: int = 0) -> np.ndarray:
+    """Min-max on log1p of the (non-negative part of the) values, compressing heavy tails."""
+    return minmax(np.log1p(np.clip(values, 0, None)), axis=axis)
+
+
+@register_normalizer('zscore')
+def zscore(values: np.ndarray, axis: int = 0) -> np.ndarray:
+    """Z-scores clipped to +/- ZSCORE_CLIP and mapped linearly onto [0, 1]."""
+    mean = np.nanmean(values, axis=axis, keepdims=True)
+    std = np.nanstd(values, axis=axis, keepdims=True)
+    low, high = mean - ZSCORE_CLIP * std, mean + ZSCORE_CLIP * std
+    return _rescale(np.clip(values, low, high), low, high)
+
+
+@register_normalizer('robust')
+def robust(values: np.ndarray, axis: int = 0) -> np.ndarray:
+    """
+    Min-max after clipping to the Tukey fences (Q1 - 1.5 IQR, Q3 + 1.5 IQR).
+    Columns with a zero IQR are not clipped.
+    """
+    q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=axis, keepdims=True)
+    iqr = q3 - q1
+    low = np.where(iqr > 0, q1 - IQR_FENCE * iqr, -np.inf)
+    high = np.where(iqr > 0, q3 + IQR_FENCE * iqr, np.inf)
+    return minmax(np.clip(values, low, high), axis=axis)
+
+
+@register_normalizer('rank')
+def rank(values: np.ndarray, axis: int = 0) -> np.ndarray:
+    """Percentile rank, (rank - 1) / (n - 1), with ties sharing their average rank."""
+    moved = np.moveaxis(values, axis, -1)
+    n = moved.shape[-1]
+    rows = moved.reshape(-1, n)
+    if n <= 1:
+        return np.full_like(values, CENTER_VALUE, dtype=np.float64)
+
+    order = np.argsort(rows, axis=1, kind='stable')
+    sorted_rows = np.take_along_axis(rows, order, axis=1)
+
+    # Label runs of equal values, unique across rows, and average their positions
+    starts = np.ones_like(sorted_rows, dtype=bool)
+    starts[:, 1:] = sorted_rows[:, 1:] != sorted_rows[:, :-1]
+    groups = np.cumsum(starts.ravel()) - 1
+    positions = np.tile(np.arange(n, dtype=np.float64), len(rows))
+    average = np.bincount(groups, weights=positions) / np.bincount(groups)
+
+    ranks = np.empty_like(rows, dtype=np.float64)
+    np.put_along_axis(ranks, order, average[groups].reshape(rows.shape), axis=1)
+    return np.moveaxis((ranks / (n - 1)).reshape(moved.shape), -1, axis)
+
+
+def normalize(values: np.ndarray, method: str = 'minmax', axis: int = 0) -> np.ndarray:
+    """
+    Normalize values along axis with a registered method.
+
+    Raises:
+        ValueError: If the method is not registered.
+    """
+    if method not in NORMALIZERS:
+        raise ValueError(f"Invalid normalization method: {method} (available: {', '.join(NORMALIZERS)})")
+    return NORMALIZERS[method](np.asarray(values, dtype=np.float64), axis)
+
+
+def aggregate(weighted: np.ndarray, method: str = 'power_mean', p: float = 2, axis: int = -1) -> np.ndarray:
+    """
+    Combine weighted, normalized columns into one score.
+
+    Args:
+        weighted: Array of weighted, normalized values
+        method: 'power_mean' (geometric mean for p == 0) or 'sum'
+        p: Power mean exponent
+        axis: Axis holding the columns to combine
+
+    Returns:
+        Array with axis reduced
+    """
+    if method == 'power_mean':
+        if p == 0: # geometric mean (not recommended)
+            epsilon = 1e-9
+            return np.exp(np.log(weighted + epsilon).mean(axis=axis))
+        return (np.power(weighted, p).sum(axis=axis) / weighted.shape[axis]) ** (1 / p)
+    if method == 'sum':
+        return weighted.sum(axis=axis)
+    raise ValueError(f"Invalid aggregation method: {method}")
+
+
+def normalize_and_aggregate(
+    values: np.ndarray,
+    weights: np.ndarray,
+    normalization: str = 'minmax',
+    method: str = 'power_mean',
+    p: float = 2,
+    axis: int = 0
+) -> np.ndarray:
+    """
+    Normalize, weight and aggregate in one pass without keeping intermediates.
+
+    Args:
+        values: Array of shape (..., projects, columns) with the project axis at `axis`
+        weights: Column weights broadcastable against values
+        normalization: Registered normalization method
+        method: Aggregation method passed to aggregate
+        p: Power mean exponent
+        axis: Project axis used for normalization
+
+    Returns:
+        Array of shape (..., projects) with one score per project
+    """
+    weighted = normalize(values, normalization, axis=axis)
+    weighted *= weights
+    return aggregate(weighted, method, p, axis=-1)
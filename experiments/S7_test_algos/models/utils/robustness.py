@@ -0,0 +1,112 @@
+"""
+Monte-Carlo helpers for allocation robustness checks.
+
+A sampler draws a block of score vectors from shared base data; blocks are
+spread over a process pool with independent, reproducible random streams, and
+the stacked allocations are summarized into per-project confidence intervals.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from .allocator import AllocationConfig, allocate_batch
+
+
+DEFAULT_CHUNK_SIZE = 250   # Samples drawn per task
+
+Sampler = Callable[[Dict[str, Any], int, np.random.Generator], np.ndarray]
+
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_worker(sampler: Sampler, shared: Dict[str, Any], allocation_config: AllocationConfig) -> None:
+    _WORKER_STATE.update(sampler=sampler, shared=shared, allocation_config=allocation_config)
+
+
+def _run_chunk(task: Any) -> np.ndarray:
+    num_samples, seed_sequence = task
+    rng = np.random.default_rng(seed_sequence)
+    scores = _WORKER_STATE['sampler'](_WORKER_STATE['shared'], num_samples, rng)
+    return allocate_batch(scores, _WORKER_STATE['allocation_config'])
+
+
+def sample_allocations(
+    sampler: Sampler,
+    shared: Dict[str, Any],
+    allocation_config: AllocationConfig,
+    num_samples: int,
+    seed: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: Optional[int] = None
+) -> np.ndarray:
+    """
+    Draw score samples in chunks and allocate the budget for each.
+
+    Every chunk gets its own child seed, so results are reproducible for a given
+    seed regardless of max_workers.
+
+    Args:
+        sampler: Module-level function (shared, n, rng) -> (n, n_projects) score matrix
+        shared: Base data passed to every sampler call
+        allocation_config: AllocationConfig with budget and constraint parameters
+        num_samples: Total number of draws
+        seed: Seed for the random streams
+        chunk_size: Draws per task
+        max_workers: Number of worker processes (1 runs in-process)
+
+    Returns:
+        Array of shape (num_samples, n_projects) with allocations per draw
+    """
+    sizes = [chunk_size] * (num_samples // chunk_size)
+    if num_samples % chunk_size:
+        sizes.append(num_samples % chunk_size)
+    tasks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+    try:
+        if max_workers == 1:
+            _init_worker(sampler, shared, allocation_config)
+            chunks = [_run_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(sampler, shared, allocation_config)
+            ) as executor:
+                chunks = list(executor.map(_run_chunk, tasks))
+    finally:
+        # Do not keep the base data alive in this process once sampling is done
+        _WORKER_STATE.clear()
+    return np.vstack(chunks)
+
+
+def summarize_allocations(
+    project_ids: Sequence[Any],
+    allocations: np.ndarray,
+    confidence: float = 0.9
+) -> pd.DataFrame:
+    """
+    Summarize sampled allocations into per-project confidence intervals.
+
+    Args:
+        project_ids: Project identifiers matching the allocation columns
+        allocations: Array of shape (num_samples, n_projects)
+        confidence: Width of the central interval (e.g. 0.9 for the 5th-95th percentiles)
+
+    Returns:
+        DataFrame indexed by project with mean, std, interval bounds and the share
+        of draws in which the project was funded, sorted by mean allocation
+    """
+    tail = (1 - confidence) / 2
+    lower, median, upper = np.quantile(allocations, [tail, 0.5, 1 - tail], axis=0)
+    return pd.DataFrame(
+        {
+            'allocation_mean': allocations.mean(axis=0),
+            'allocation_std': allocations.std(axis=0),
+            'allocation_lower': lower,
+            'allocation_median': median,
+            'allocation_upper': upper,
+            'funded_share': (allocations > 0).mean(axis=0)
+        },
+        index=pd.Index(project_ids, name='project_id')
+    ).sort_values('allocation_mean', ascending=False)
@@ -0,0 +1,141 @@
+"""
+Typed Parquet cache for S7 data snapshots.
+
+Each CSV in a snapshot is converted once into a Parquet file under CACHE_DIR, with
+dates parsed and string IDs and low-cardinality columns dictionary-encoded.
+Later loads read the Parquet file through Arrow, projecting only the requested
+columns; dictionary columns stay encoded as pandas categoricals and other
+strings stay Arrow-backed instead of materializing Python objects.
+"""
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Optional, Tuple, Union
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    """
+    Typing hints for one snapshot file.
+
+    Attributes:
+        date_columns: Columns parsed as timestamps during conversion
+        categorical_columns: Columns (IDs and low-cardinality labels) stored
+            dictionary-encoded and loaded as pandas categoricals
+        columns: Column projection applied when loading (None loads all columns)
+    """
+    date_columns: Tuple[str, ...] = ()
+    categorical_columns: Tuple[str, ...] = ()
+    columns: Optional[Tuple[str, ...]] = None
+
+    def fingerprint(self) -> str:
+        """Hash of the conversion settings, stored with the Parquet file to detect schema changes."""
+        settings = {k: v for k, v in asdict(self).items() if k != 'columns'}
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16]
+
+
+FINGERPRINT_KEY = b's7_snapshot_schema'
+
+# Arrow-backed strings with NaN missing values, like pandas' default string dtype;
+# string[pyarrow] would turn results derived from them into ArrowDtype columns
+try:
+    STRING_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan)
+except TypeError:   # pandas < 2.3
+    STRING_DTYPE = pd.StringDtype('pyarrow_numpy')
+
+
+# Kept out of data/ so the converted files never sit next to the tracked CSVs
+CACHE_DIR = Path(__file__).resolve().parents[2] / '.snapshot_cache'
+
+
+def parquet_path_for(csv_path: Union[str, Path], cache_dir: Union[str, Path] = CACHE_DIR) -> Path:
+    """
+    Cache location for csv_path: a folder per snapshot directory, named after it and
+    suffixed with a hash of its absolute path so equally named snapshots do not collide.
+    """
+    csv_path = Path(csv_path).resolve()
+    parent_hash = hashlib.sha256(str(csv_path.parent).encode()).hexdigest()[:8]
+    return Path(cache_dir) / f'{csv_path.parent.name}-{parent_hash}' / f'{csv_path.stem}.parquet'
+
+
+def convert_csv_to_parquet(
+    csv_path: Union[str, Path],
+    schema: TableSchema = TableSchema(),
+    cache_dir: Union[str, Path] = CACHE_DIR
+) -> Path:
+    """
+    Convert a CSV file into a typed, dictionary-encoded Parquet file in cache_dir.
+
+    Returns:
+        Path to the written Parquet file
+    """
+    parquet_path = parquet_path_for(csv_path, cache_dir)
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+    df = pd.read_csv(csv_path, parse_dates=list(schema.date_columns))
+    for col in schema.categorical_columns:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        FINGERPRINT_KEY: schema.fingerprint().encode()
+    })
+    pq.write_table(table, parquet_path, use_dictionary=True, compression='zstd')
+    return parquet_path
+
+
+def _is_stale(csv_path: Path, parquet_path: Path, schema: TableSchema) -> bool:
+    if not parquet_path.exists():
+        return True
+    if not csv_path.exists():
+        return False
+    if csv_path.stat().st_mtime > parquet_path.stat().st_mtime:
+        return True
+    metadata = pq.read_schema(parquet_path).metadata or {}
+    return metadata.get(FINGERPRINT_KEY) != schema.fingerprint().encode()
+
+
+def load_table(
+    csv_path: Union[str, Path],
+    schema: TableSchema = TableSchema(),
+    refresh: bool = False,
+    cache_dir: Union[str, Path] = CACHE_DIR
+) -> pd.DataFrame:
+    """
+    Load a snapshot table through its Parquet cache, converting the CSV if needed.
+
+    The cache is rebuilt when it is missing, older than the CSV, was written with
+    different dates or categoricals than schema, or refresh is set. If only the
+    Parquet file is present, it is read directly.
+
+    Args:
+        csv_path: Path to the source CSV file
+        schema: TableSchema describing dates, categoricals and column projection
+        refresh: Force re-conversion of the CSV
+        cache_dir: Directory holding the converted Parquet files
+
+    Returns:
+        DataFrame with Arrow-backed strings, parsed dates, categorical columns
+        and NumPy numeric columns
+    """
+    csv_path = Path(csv_path)
+    parquet_path = parquet_path_for(csv_path, cache_dir)
+    if refresh or _is_stale(csv_path, parquet_path, schema):
+        convert_csv_to_parquet(csv_path, schema, cache_dir)
+
+    columns = list(schema.columns) if schema.columns is not None else None
+    table = pq.read_table(parquet_path, columns=columns)
+
+    # Decode dictionary columns that should not become categoricals
+    for idx, name in enumerate(table.column_names):
+        if pa.types.is_dictionary(table.schema.field(name).type) and name not in schema.categorical_columns:
+            table = table.set_column(idx, name, table.column(name).cast(pa.string()))
+
+    return table.to_pandas(
+        types_mapper={pa.string(): STRING_DTYPE, pa.large_string(): STRING_DTYPE}.get
+    )
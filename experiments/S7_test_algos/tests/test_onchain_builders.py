@@ -0,0 +1,73 @@
+"""
+Tests that the tensor scoring kernels of the onchain builders model reproduce the
+pandas steps on the sample data in data/onchain_testing.
+
+Run from experiments/S7_test_algos with `python -m pytest tests` or
+`python -m unittest discover tests`.
+"""
+from dataclasses import replace
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+S7_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, S7_DIR)
+
+from models.onchain_builders import (
+    OnchainBuildersCalculator, _sample_onchain_scores, load_config, load_data
+)
+
+
+CONFIG_PATH = os.path.join(S7_DIR, 'weights', 'onchain_builders_testing.yaml')
+
+
+class BackendParityTest(unittest.TestCase):
+    """
+    Steps 3-6 exist twice: as the pandas frame steps and as the tensor kernels used by
+    the tensor backend, 'scores' mode and the Monte-Carlo sampler.
+    """
+
+    RTOL = 1e-9
+    ATOL = 1e-12
+
+    @classmethod
+    def setUpClass(cls):
+        data_snapshot, cls.config = load_config(CONFIG_PATH)
+        data_snapshot = replace(data_snapshot, data_dir=os.path.join(S7_DIR, 'data', 'onchain_testing'))
+        cls.df_data = load_data(data_snapshot)
+        cls.expected = cls.run_analysis('pandas', 'eager')['final_results']
+
+    @classmethod
+    def run_analysis(cls, backend: str, materialize: str):
+        config = replace(cls.config, backend=backend, materialize=materialize)
+        return OnchainBuildersCalculator(config).run_analysis(cls.df_data)
+
+    def assertMatchesPandas(self, actual: pd.DataFrame):
+        self.assertEqual(len(actual), len(self.expected))
+        self.assertTrue(actual.index.isin(self.expected.index).all())
+        self.assertTrue(actual.columns.isin(self.expected.columns).all())
+        np.testing.assert_allclose(
+            actual.to_numpy(dtype=np.float64),
+            self.expected.loc[actual.index, actual.columns].to_numpy(dtype=np.float64),
+            rtol=self.RTOL,
+            atol=self.ATOL
+        )
+
+    def test_tensor_backend(self):
+        self.assertMatchesPandas(self.run_analysis('tensor', 'eager')['final_results'])
+
+    def test_scores_mode(self):
+        self.assertMatchesPandas(self.run_analysis('tensor', 'scores')['project_scores'].to_frame())
+
+    def test_noise_free_draw(self):
+        calculator = OnchainBuildersCalculator(self.config)
+        tensor, shared = calculator._sampler_inputs(self.df_data, noise_scale=0.0)
+        draw = _sample_onchain_scores(shared, 1, np.random.default_rng(0))[0]
+        self.assertMatchesPandas(pd.Series(draw, index=tensor.projects).to_frame('weighted_score'))
+
+
+if __name__ == '__main__':
+    unittest.main()
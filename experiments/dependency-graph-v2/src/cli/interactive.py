@@ -330,16 +330,15 @@ class InteractiveWorkflow:
             f"Dependencies analyzed: {len(final_deps)} dependencies found"
         )
         
-        click.echo(f"Dependencies saved to {self.data_manager.dependencies_path}")
+        click.echo(f"Dependencies saved to {self.data_manager.dependency_store_path}")
     
     def _generate_snapshot(self) -> None:
         """Generate a dependency snapshot."""
         click.echo("Generating dependency snapshot...")
         
-        # Get all dependencies from the dependencies.json file
+        # Get all dependencies from the dependency store
         try:
-            with open(self.data_manager.dependencies_path, 'r') as f:
-                dependencies_data = json.load(f)
+            dependencies_data = list(self.data_manager.get_dependencies().values())
             
             # Create snapshot
             snapshot = DependencySnapshot(dependencies_data)
@@ -54,7 +54,7 @@ def fetch_dependencies(ctx, repo_url, source, overwrite, no_merge):
     data_manager = ctx.obj['data_manager']
     config_mgr = ctx.obj['config_manager']
     
-    repo_manager = RepositoryManager()
+    repo_manager = RepositoryManager(data_manager=data_manager)
     
     # Determine which repositories to process
     if repo_url:
@@ -79,23 +79,27 @@ def fetch_dependencies(ctx, repo_url, source, overwrite, no_merge):
     else:  # 'all'
         sources = ['github_api', 'package_files', 'sbom']
     
-    # Fetch dependencies
-    dependencies = repo_manager.fetch_dependencies(
-        repo_urls=repo_urls, 
-        sources=sources,
-        merge_with_existing=not no_merge
-    )
-    
-    # Save dependencies
-    data_manager.save_dependencies(dependencies, overwrite=overwrite)
-    
-    # Update repository status
-    for repo_url, deps in dependencies.items():
+    def save_repo(repo_url, deps):
+        # Save each repository and update its status as soon as it completes
+        try:
+            data_manager.save_dependencies({repo_url: deps}, overwrite=overwrite)
+        except Exception as e:
+            print(f"Error saving dependencies for {repo_url}: {str(e)}")
+            data_manager.update_repo_status(repo_url, f"Error saving dependencies: {str(e)}")
+            return
         data_manager.update_repo_status(
             repo_url,
             f"Dependencies fetched: {len(deps)} dependencies found"
         )
     
+    # Fetch dependencies
+    repo_manager.fetch_dependencies(
+        repo_urls=repo_urls, 
+        sources=sources,
+        merge_with_existing=not no_merge,
+        on_repo_fetched=save_repo
+    )
+    
     print("Dependency fetching complete.")
 
 @dependencies_group.command("import-sbom")
@@ -126,24 +130,29 @@ def import_sbom(ctx, sbom_file, repo_url, overwrite):
         print(f"Error: SBOM file {sbom_file} not found.")
         return
     
-    # Extract dependencies from SBOM
-    dependencies = repo_manager.import_sbom(sbom_file, repo_url)
-    if not dependencies:
-        print("No dependencies found in SBOM file.")
-        return
-    
-    print(f"Found {len(dependencies)} dependencies in SBOM file.")
+    # Stream dependencies from the SBOM file into the dependency store
+    num_found = 0
+    def count_batches(batches):
+        nonlocal num_found
+        for batch in batches:
+            num_found += len(batch)
+            yield batch
     
-    # Save dependencies
-    data_manager.save_dependencies(
-        {repo_url: dependencies},
+    data_manager.save_dependency_batches(
+        repo_url,
+        count_batches(repo_manager.iter_sbom_batches(sbom_file, repo_url)),
         overwrite=overwrite
     )
+    if not num_found:
+        print("No dependencies found in SBOM file.")
+        return
+    
+    print(f"Found {num_found} dependencies in SBOM file.")
     
     # Update repository status
     data_manager.update_repo_status(
         repo_url,
-        f"SBOM imported: {len(dependencies)} dependencies found"
+        f"SBOM imported: {num_found} dependencies found"
     )
     
     print(f"Successfully imported SBOM for {repo_url}.")
@@ -176,24 +185,29 @@ def import_csv(ctx, csv_file, repo_url, overwrite):
         print(f"Error: CSV file {csv_file} not found.")
         return
     
-    # Extract dependencies from CSV
-    dependencies = repo_manager.import_sbom(csv_file, repo_url)
-    if not dependencies:
-        print("No dependencies found in CSV file.")
-        return
+    # Stream dependencies from the CSV file into the dependency store
+    num_found = 0
+    def count_batches(batches):
+        nonlocal num_found
+        for batch in batches:
+            num_found += len(batch)
+            yield batch
     
-    print(f"Found {len(dependencies)} dependencies in CSV file.")
-    
-    # Save dependencies
-    data_manager.save_dependencies(
-        {repo_url: dependencies},
+    data_manager.save_dependency_batches(
+        repo_url,
+        count_batches(repo_manager.iter_sbom_batches(csv_file, repo_url)),
         overwrite=overwrite
     )
+    if not num_found:
+        print("No dependencies found in CSV file.")
+        return
+    
+    print(f"Found {num_found} dependencies in CSV file.")
     
     # Update repository status
     data_manager.update_repo_status(
         repo_url,
-        f"CSV SBOM imported: {len(dependencies)} dependencies found"
+        f"CSV SBOM imported: {num_found} dependencies found"
     )
     
     print(f"Successfully imported CSV SBOM for {repo_url}.")
@@ -264,16 +278,14 @@ def repo_status(ctx, repo_url):
 def generate_snapshot(ctx):
     """Generate a dependency snapshot across all repositories."""
     from ..core.snapshot import DependencySnapshot
-    import json
     import os
     
     print("Generating dependency snapshot...")
     data_manager = ctx.obj['data_manager']
     
-    # Get all dependencies from the dependencies.json file
+    # Get all dependencies from the dependency store
     try:
-        with open(data_manager.dependencies_path, 'r') as f:
-            dependencies_data = json.load(f)
+        dependencies_data = list(data_manager.get_dependencies().values())
         
         # Create snapshot
         snapshot = DependencySnapshot(dependencies_data)
@@ -330,8 +342,10 @@ def map_to_github(ctx, input_file, output_file):
         client = setup_oso_client()
         print("OSO client setup complete.")
         
-        # Load dependencies
+        # Load dependencies, exporting the dependency store if reading the default file
         dependencies_path = Path(input_file)
+        if dependencies_path.resolve() == data_manager.dependencies_path.resolve():
+            data_manager.export_dependencies()
         if not dependencies_path.exists():
             print(f"Error: Dependencies file not found at {dependencies_path}")
             return
@@ -486,7 +500,7 @@ def analyze_repo(ctx, repo_url):
     """Interactive workflow to analyze a repository's dependencies."""
     print("Starting interactive repository analysis workflow...")
     data_manager = ctx.obj['data_manager']
-    repo_manager = RepositoryManager()
+    repo_manager = RepositoryManager(data_manager=data_manager)
     
     workflow = InteractiveWorkflow(data_manager=data_manager, repo_manager=repo_manager)
     workflow.run(repo_url=repo_url)
@@ -14,6 +14,8 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 OUTPUT_DIR = PROJECT_ROOT / "output"
+HTTP_CACHE_DIR = OUTPUT_DIR / "http_cache"  # ETag / HEAD SHA cache of GitHub responses
+MANIFEST_CACHE_DIR = OUTPUT_DIR / "manifest_cache"  # LLM manifest analysis cache
 
 # Create directories if they don't exist
 DATA_DIR.mkdir(exist_ok=True)
@@ -22,6 +24,12 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 # GitHub API settings
 GITHUB_HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"}
 
+# Maximum number of concurrent repository/source fetches
+FETCH_MAX_WORKERS = 8
+
+# Number of dependencies per batch when streaming SBOMs into the dependency store
+SBOM_BATCH_SIZE = 5000
+
 # Gemini model settings
 GEMINI_MODEL = "gemini-2.0-flash"
 
@@ -1,7 +1,23 @@
+import hashlib
 import json
+import os
+import shutil
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Set, Union
+from typing import Dict, Iterable, List, Optional, Any, Set, Union
+
+
+# Unique key of a stored dependency
+DEPENDENCY_KEY = ["repo_url", "packageName", "packageManager", "source_type", "version"]
+
+# Sources whose dependencies are keyed by version too: an SBOM lists every resolved
+# version of a package, while other sources hold one requirement per package
+VERSIONED_SOURCE_TYPES = {"spdx_sbom"}
+
+# Partition schema: the typed key columns plus the full dependency record as JSON
+STORE_SCHEMA = pa.schema([(column, pa.string()) for column in DEPENDENCY_KEY] + [("record", pa.string())])
 
 
 class DataManager:
@@ -10,7 +26,8 @@ class DataManager:
         self.config = config
         
         # Define file paths
-        self.dependencies_path = self.output_dir / "dependencies.json"
+        self.dependencies_path = self.output_dir / "dependencies.json"  # legacy export
+        self.dependency_store_path = self.output_dir / "dependency_store"
         self.analyzed_dependencies_path = self.output_dir / "analyzed_dependencies.json"
         self.repo_status_path = self.output_dir / "repo_status.txt"
         
@@ -22,155 +39,255 @@ class DataManager:
         # Create directories if they don't exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+    def _repo_partition(self, repo_url: str, store_path: Optional[Path] = None) -> Path:
+        """
+        Path of the Parquet partition holding one repository's dependencies.
+
+        Partitions are named by a hash of the normalized URL, so distinct URLs never share a
+        partition; the URL itself is kept in the partition's metadata.
+        """
+        digest = hashlib.sha256(repo_url.encode("utf-8")).hexdigest()[:16]
+        return (store_path or self.dependency_store_path) / f"repo={digest}" / "dependencies.parquet"
+
+    @staticmethod
+    def _to_table(repo_url: str, deps: List[Dict]) -> pa.Table:
+        """
+        Convert dependency dicts to rows of the store schema.
+
+        Dependency records are free-form, so only the key columns are typed; each full
+        record (including explicit nulls) is kept as a JSON payload.
+        """
+        columns = {"repo_url": [repo_url] * len(deps)}
+        for column in DEPENDENCY_KEY[1:-1]:
+            columns[column] = ["" if dep.get(column) is None else str(dep.get(column)) for dep in deps]
+        columns["version"] = [
+            str(dep.get("requirements") or "") if dep.get("source_type") in VERSIONED_SOURCE_TYPES else ""
+            for dep in deps
+        ]
+        columns["record"] = [json.dumps(dep, default=str) for dep in deps]
+        return pa.Table.from_pydict(columns, schema=STORE_SCHEMA)
+
+    @staticmethod
+    def _read_records(path: Path) -> List[Dict]:
+        """Dependency dicts stored in a partition."""
+        return [json.loads(record) for record in pq.read_table(path, columns=["record"]).column("record").to_pylist()]
+
+    @staticmethod
+    def _partition_repo_url(path: Path) -> Optional[str]:
+        """Repository URL stored in a partition's metadata, so empty partitions keep their repo."""
+        metadata = pq.read_schema(path).metadata or {}
+        repo_url = metadata.get(b"repo_url")
+        return repo_url.decode() if repo_url else None
+
+    def _write_partition(self, path: Path, repo_url: str, table: pa.Table):
+        """Atomically replace one repository's partition."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = table.replace_schema_metadata({b"repo_url": repo_url.encode()})
+        tmp_path = path.with_suffix(".parquet.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def _upgrade_partition(self, path: Path, repo_url: str):
+        """Rebuild the key columns of a partition written with an older DEPENDENCY_KEY."""
+        if path.exists() and pq.read_schema(path).names != STORE_SCHEMA.names:
+            self._write_partition(path, repo_url, self._to_table(repo_url, self._read_records(path)))
+
+    def _ensure_dependency_store(self):
+        """
+        Import a legacy dependencies.json into the partitioned store the first time it is used.
+
+        The store is built in a temporary directory and renamed into place at the end, so
+        an interrupted migration is simply retried on next use. Dependencies that share a
+        key are merged into the last of them, and the number merged is printed per repository.
+        """
+        if self.dependency_store_path.exists() or not self.dependencies_path.exists():
+            return
+        from ..utils.url_utils import normalize_url
+
+        print(f"Migrating {self.dependencies_path} to {self.dependency_store_path}...")
+        with open(self.dependencies_path, 'r') as f:
+            legacy_data = json.load(f)
+        tmp_store_path = self.dependency_store_path.with_name(f"{self.dependency_store_path.name}.tmp")
+        shutil.rmtree(tmp_store_path, ignore_errors=True)
+        tmp_store_path.mkdir(parents=True)
+        num_legacy, num_stored = {}, {}
+        for repo_data in legacy_data:
+            if repo_data.get("repo_url"):
+                repo_url = normalize_url(repo_data["repo_url"])
+                deps = repo_data.get("dependencies", [])
+                num_legacy[repo_url] = num_legacy.get(repo_url, 0) + len(deps)
+                num_stored[repo_url] = self._upsert_dependencies(repo_url, deps, store_path=tmp_store_path)
+        os.replace(tmp_store_path, self.dependency_store_path)
+        for repo_url, count in num_legacy.items():
+            if num_stored[repo_url] < count:
+                print(f"Merged {count - num_stored[repo_url]} of {count} dependencies of {repo_url} that share a key")
+
+    def _upsert_dependencies(self, repo_url: str, deps: List[Dict], overwrite: bool = False, store_path: Optional[Path] = None) -> int:
+        """
+        Upsert dependencies into one repository's partition, keyed by DEPENDENCY_KEY.
+
+        Only that partition is read and rewritten. Returns the number of stored dependencies.
+        """
+        path = self._repo_partition(repo_url, store_path)
+        self._upgrade_partition(path, repo_url)
+        table = self._to_table(repo_url, deps)
+        if not overwrite and path.exists():
+            table = pa.concat_tables([pq.read_table(path).replace_schema_metadata(None), table])
+        keep = self._keep_mask(table.select(DEPENDENCY_KEY).to_pandas())
+        table = table.filter(pa.array(keep.values))
+        self._write_partition(path, repo_url, table)
+        return len(table)
+
     def get_dependencies(self, repo_url: Optional[str] = None) -> Dict:
         """
         Get dependencies data for all repositories or a specific repository.
         
         Args:
-            repo_url: Optional repository URL to filter by.
+            repo_url: Optional repository URL to filter by. Only that repository's
+                      partition is read.
             
         Returns:
             Dictionary mapping repository URLs to their dependencies.
         """
-        if not self.dependencies_path.exists():
+        self._ensure_dependency_store()
+        if not self.dependency_store_path.exists():
             return {}
         
-        try:
-            with open(self.dependencies_path, 'r') as f:
-                all_dependencies = json.load(f)
-            
-            if repo_url:
-                # Filter for a specific repository
-                for repo_data in all_dependencies:
-                    if repo_data.get("repo_url") == repo_url:
-                        return {repo_url: repo_data}
+        if repo_url:
+            from ..utils.url_utils import normalize_url
+            repo_url = normalize_url(repo_url)
+            path = self._repo_partition(repo_url)
+            if not path.exists():
                 return {}
-            else:
-                # Convert to dictionary with repo_url as key
-                result = {}
-                for repo_data in all_dependencies:
-                    repo_url = repo_data.get("repo_url")
-                    if repo_url:
-                        result[repo_url] = repo_data
-                return result
-        except Exception as e:
-            print(f"Error loading dependencies: {str(e)}")
-            return {}
+            return {repo_url: {"repo_url": repo_url, "dependencies": self._read_records(path)}}
+
+        result = {}
+        for path in sorted(self.dependency_store_path.glob("repo=*/dependencies.parquet")):
+            try:
+                url = self._partition_repo_url(path)
+                if url:
+                    result[url] = {"repo_url": url, "dependencies": self._read_records(path)}
+            except Exception as e:
+                print(f"Error reading dependency partition {path}: {str(e)}")
+        return result
 
     def save_dependencies(self, dependencies_data: Dict[str, List[Dict]], overwrite: bool = False):
         """
         Save dependencies data for repositories.
         
+        Each repository is stored in its own Parquet partition, so an update only reads and
+        rewrites the partitions of the repositories in dependencies_data.
+        
         Args:
             dependencies_data: Dictionary mapping repository URLs to their dependencies.
-            overwrite: If True, overwrite existing data. If False, merge with existing data.
+            overwrite: If True, replace the repositories' existing dependencies. If False,
+                       upsert by (packageName, packageManager, source_type), plus the
+                       version for SBOM dependencies.
+                       
+        Raises:
+            Exception: If a repository's partition cannot be read or written; repositories
+                       before it are saved, it and later ones are left unchanged.
         """
         from ..utils.url_utils import normalize_url
         
-        # Normalize repository URLs
-        normalized_dependencies_data = {}
+        self._ensure_dependency_store()
         for repo_url, deps in dependencies_data.items():
             normalized_url = normalize_url(repo_url)
-            normalized_dependencies_data[normalized_url] = deps
+            num_dependencies = self._upsert_dependencies(normalized_url, deps, overwrite=overwrite)
+            print(f"Saved {num_dependencies} dependencies for {normalized_url} to {self.dependency_store_path}")
+
+    @staticmethod
+    def _keep_mask(keys: pd.DataFrame, exclude: Optional[pd.MultiIndex] = None) -> pd.Series:
+        """Rows to keep: the last of each key, minus keys in exclude."""
+        keep = ~keys.duplicated(keep="last")
+        if exclude is not None:
+            keep &= ~pd.MultiIndex.from_frame(keys).isin(exclude)
+        return keep
+
+    def save_dependency_batches(self, repo_url: str, batches: Iterable[List[Dict]], overwrite: bool = False) -> int:
+        """
+        Stream batches of dependencies for one repository into its partition.
         
-        # Format for storage
-        formatted_data = []
-        for repo_url, deps in normalized_dependencies_data.items():
-            formatted_data.append({
-                "repo_url": repo_url,
-                "dependencies": deps
-            })
+        Batches are written to disk as they arrive, so memory is bounded by the batch size
+        (plus the key columns used to upsert) rather than the number of dependencies.
         
-        if not overwrite and self.dependencies_path.exists():
-            try:
-                # Load existing data
-                with open(self.dependencies_path, 'r') as f:
-                    existing_data = json.load(f)
-                
-                # Create a map of existing data with normalized URLs
-                existing_map = {}
-                for item in existing_data:
-                    if item.get("repo_url"):
-                        normalized_url = normalize_url(item.get("repo_url"))
-                        existing_map[normalized_url] = item
-                
-                # Update or add new data
-                for item in formatted_data:
-                    repo_url = item.get("repo_url")
-                    if repo_url in existing_map:
-                        # Merge dependencies instead of replacing
-                        existing_deps = existing_map[repo_url].get("dependencies", [])
-                        new_deps = item.get("dependencies", [])
-                        
-                        # Create a unique identifier for each dependency to avoid duplicates
-                        existing_deps_map = {}
-                        for dep in existing_deps:
-                            # Create a unique key based on package name, manager, and source type
-                            key = f"{dep.get('packageName', '')}-{dep.get('packageManager', '')}-{dep.get('source_type', '')}"
-                            existing_deps_map[key] = dep
-                        
-                        # Add or update dependencies
-                        for dep in new_deps:
-                            key = f"{dep.get('packageName', '')}-{dep.get('packageManager', '')}-{dep.get('source_type', '')}"
-                            existing_deps_map[key] = dep
-                        
-                        # Update the dependencies list
-                        existing_map[repo_url]["dependencies"] = list(existing_deps_map.values())
-                    else:
-                        # Add new entry
-                        existing_data.append(item)
-                
-                # Save updated data
-                with open(self.dependencies_path, 'w') as f:
-                    json.dump(existing_data, f, indent=2)
-                
-                print(f"Updated dependencies data saved to {self.dependencies_path}")
-                return
-            except Exception as e:
-                print(f"Error updating dependencies: {str(e)}")
-                # Fall back to overwriting
+        Args:
+            repo_url: URL of the repository.
+            batches: Iterable of lists of dependencies, e.g. SpdxSbomSource.iter_sbom_batches.
+            overwrite: If True, replace the repository's existing dependencies. If False,
+                       upsert by (packageName, packageManager, source_type), plus the
+                       version for SBOM dependencies.
+                       
+        Returns:
+            Number of dependencies stored for the repository, 0 if there were no batches.
+        """
+        from ..utils.url_utils import normalize_url
         
-        # Save new data (overwrite or fallback)
-        try:
-            # If overwrite is True but we still want to preserve other repositories
-            if overwrite and self.dependencies_path.exists():
-                try:
-                    # Load existing data
-                    with open(self.dependencies_path, 'r') as f:
-                        existing_data = json.load(f)
-                    
-                    # Create a map of existing data with normalized URLs
-                    existing_map = {}
-                    for item in existing_data:
-                        if item.get("repo_url"):
-                            normalized_url = normalize_url(item.get("repo_url"))
-                            existing_map[normalized_url] = item
-                    
-                    # Replace or add new data
-                    for item in formatted_data:
-                        repo_url = item.get("repo_url")
-                        existing_map[repo_url] = item
-                    
-                    # Convert back to list
-                    final_data = list(existing_map.values())
-                    
-                    # Save updated data
-                    with open(self.dependencies_path, 'w') as f:
-                        json.dump(final_data, f, indent=2)
-                    
-                    print(f"Updated dependencies data saved to {self.dependencies_path}")
-                    return
-                except Exception as e:
-                    print(f"Error updating dependencies during overwrite: {str(e)}")
-                    # Fall back to complete overwrite
-            
-            # Complete overwrite or fallback
-            with open(self.dependencies_path, 'w') as f:
-                json.dump(formatted_data, f, indent=2)
+        self._ensure_dependency_store()
+        repo_url = normalize_url(repo_url)
+        path = self._repo_partition(repo_url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._upgrade_partition(path, repo_url)
+        new_path = path.with_suffix(".new.parquet.tmp")
+        
+        # 1. Write the incoming batches as they arrive
+        num_batches = 0
+        with pq.ParquetWriter(new_path, STORE_SCHEMA) as writer:
+            for batch in batches:
+                if batch:
+                    writer.write_table(self._to_table(repo_url, batch))
+                    num_batches += 1
+        
+        if num_batches == 0:
+            # Nothing to store; leave the partition as it is
+            new_path.unlink()
+            return 0
+        
+        # 2. Upsert: keep the last of each new key, and existing rows with other keys
+        new_file = pq.ParquetFile(new_path)
+        new_keys = new_file.read(columns=DEPENDENCY_KEY).to_pandas()
+        new_keep = self._keep_mask(new_keys)
+        sources = [(new_file, new_keep)]
+        if not overwrite and path.exists():
+            existing_file = pq.ParquetFile(path)
+            existing_keys = existing_file.read(columns=DEPENDENCY_KEY).to_pandas()
+            exclude = pd.MultiIndex.from_frame(new_keys[new_keep])
+            sources.insert(0, (existing_file, self._keep_mask(existing_keys, exclude)))
+        
+        # 3. Rewrite the partition one row group at a time
+        schema = STORE_SCHEMA.with_metadata({b"repo_url": repo_url.encode()})
+        tmp_path = path.with_suffix(".parquet.tmp")
+        num_dependencies = 0
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for parquet_file, keep in sources:
+                offset = 0
+                for i in range(parquet_file.num_row_groups):
+                    row_group = parquet_file.read_row_group(i)
+                    mask = pa.array(keep.values[offset:offset + len(row_group)])
+                    offset += len(row_group)
+                    row_group = row_group.filter(mask)
+                    num_dependencies += len(row_group)
+                    writer.write_table(row_group.replace_schema_metadata(schema.metadata))
+        os.replace(tmp_path, path)
+        new_path.unlink()
+        return num_dependencies
+
+    def export_dependencies(self, output_path: Optional[Path] = None) -> Path:
+        """
+        Export the dependency store to the legacy dependencies.json format, for tools that
+        read the JSON file (mapper, cleaner).
+        
+        Args:
+            output_path: Where to write the export. Defaults to dependencies.json.
             
-            print(f"Dependencies data saved to {self.dependencies_path}")
-        except Exception as e:
-            print(f"Error saving dependencies: {str(e)}")
+        Returns:
+            Path of the exported file.
+        """
+        output_path = output_path or self.dependencies_path
+        with open(output_path, 'w') as f:
+            json.dump(list(self.get_dependencies().values()), f, indent=2)
+        print(f"Dependencies exported to {output_path}")
+        return output_path
 
     def save_analyzed_dependencies(self, analyzed_data: List[Dict], overwrite: bool = False):
         """
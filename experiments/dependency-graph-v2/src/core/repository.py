@@ -1,10 +1,10 @@
 """
 Repository manager for handling repository operations.
 """
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Set, Union
+from typing import Callable, Dict, Iterator, List, Optional, Any, Set, Union
 
 from ..dependency.sources import (
     DependencySource,
@@ -12,6 +12,9 @@ from ..dependency.sources import (
     PackageFileSource,
     SpdxSbomSource
 )
+from ..config.settings import FETCH_MAX_WORKERS, HTTP_CACHE_DIR, SBOM_BATCH_SIZE
+from ..utils.http import GitHubRateLimiter, HttpCache, create_session
+from .data_manager import DataManager
 from .repository_source_manager import RepositorySourceManager
 from ..utils.url_utils import normalize_url
 
@@ -22,12 +25,25 @@ class RepositoryManager:
     Supports selective updates for specific repositories.
     """
     
-    def __init__(self):
+    def __init__(self, data_manager: Optional[DataManager] = None):
         """
         Initialize the repository manager.
+        
+        Args:
+            data_manager: Data manager holding the stored dependencies.
+                          Defaults to one on the "output" directory.
         """
-        self.github_api_source = GitHubApiSource()
-        self.package_file_source = PackageFileSource()
+        self.data_manager = data_manager or DataManager(Path("output"))
+        # Sources share one connection pool, one GitHub rate-limit budget and one response cache
+        self.session = create_session(pool_size=FETCH_MAX_WORKERS)
+        self.rate_limiter = GitHubRateLimiter(max_concurrent=FETCH_MAX_WORKERS)
+        self.http_cache = HttpCache(HTTP_CACHE_DIR)
+        self.github_api_source = GitHubApiSource(
+            session=self.session, rate_limiter=self.rate_limiter, cache=self.http_cache
+        )
+        self.package_file_source = PackageFileSource(
+            session=self.session, rate_limiter=self.rate_limiter, cache=self.http_cache
+        )
         self.sbom_source = SpdxSbomSource()
         
         # Initialize repository source manager
@@ -70,15 +86,85 @@ class RepositoryManager:
         """
         return self.source_manager.remove_repo(normalize_url(repo_url))
     
+    def _fetch_source(self, repo_url: str, source_type: str, repo_source_config: Optional[Dict]) -> List[Dict]:
+        """
+        Fetch dependencies for one repository from one source.
+        
+        Args:
+            repo_url: Normalized URL of the repository.
+            source_type: One of "github_api", "package_files", "sbom".
+            repo_source_config: The repository's source configuration, if any.
+            
+        Returns:
+            List of dependencies found by the source.
+        """
+        if source_type == "github_api":
+            print(f"Fetching dependencies from GitHub API for {repo_url}...")
+            github_deps = self.github_api_source.fetch_dependencies(repo_url)
+            print(f"Found {len(github_deps)} dependencies from GitHub API for {repo_url}")
+            return github_deps
+        
+        if source_type == "package_files":
+            print(f"Fetching dependencies from package files for {repo_url}...")
+            # Use package files from repository source configuration if available
+            if repo_source_config:
+                for source in repo_source_config["sources"]:
+                    if source["type"] == "package_files" and source.get("enabled", False):
+                        # Update package file source with files from configuration
+                        files = source.get("files", [])
+                        if files:
+                            print(f"Using {len(files)} package files from configuration")
+                            # Analyze each file individually
+                            package_deps = []
+                            for file_url in files:
+                                normalized_file_url = normalize_url(file_url)
+                                deps = self.package_file_source.analyze_file(repo_url, normalized_file_url)
+                                package_deps.extend(deps)
+                            print(f"Found {len(package_deps)} dependencies from package files for {repo_url}")
+                            return package_deps
+                        break
+                return []
+            # Fall back to default behavior
+            package_deps = self.package_file_source.fetch_dependencies(repo_url)
+            print(f"Found {len(package_deps)} dependencies from package files for {repo_url}")
+            return package_deps
+        
+        if source_type == "sbom" and repo_source_config:
+            # Check if there's an SBOM source configured
+            for source in repo_source_config["sources"]:
+                if source["type"] == "sbom" and source.get("enabled", False):
+                    location = source.get("location", {})
+                    location_type = location.get("type")
+                    
+                    if location_type == "local":
+                        path = location.get("path")
+                        if path and os.path.exists(path):
+                            print(f"Importing SBOM from local file: {path}")
+                            sbom_deps = self.sbom_source.import_sbom(path, repo_url)
+                            print(f"Found {len(sbom_deps)} dependencies from SBOM for {repo_url}")
+                            return sbom_deps
+                    elif location_type == "url":
+                        url = location.get("url")
+                        if url:
+                            print(f"SBOM URL source not implemented yet: {url}")
+                            # TODO: Implement fetching SBOM from URL
+                    break
+        return []
+    
     def fetch_dependencies(
         self, 
         repo_urls: Optional[List[str]] = None, 
         sources: Optional[List[str]] = None,
-        merge_with_existing: bool = True
+        merge_with_existing: bool = True,
+        max_workers: int = FETCH_MAX_WORKERS,
+        on_repo_fetched: Optional[Callable[[str, List[Dict]], None]] = None
     ) -> Dict[str, List[Dict]]:
         """
         Fetch dependencies for specified repositories using specified sources.
         
+        Every (repository, source) pair is fetched concurrently on a bounded thread pool.
+        The sources share one pooled HTTP session and one GitHub rate-limit budget.
+        
         Args:
             repo_urls: List of repository URLs to fetch dependencies for.
                        If None, fetch for all repositories.
@@ -87,6 +173,10 @@ class RepositoryManager:
                      If None, use enabled sources from repository_sources.json.
             merge_with_existing: If True, merge with existing dependencies.
                                 If False, replace existing dependencies.
+            max_workers: Maximum number of concurrent source fetches.
+            on_repo_fetched: Optional callback called with (repo_url, dependencies) as soon
+                             as each repository completes, e.g. to save it to the store.
+                             Callbacks run on the calling thread, one at a time.
                      
         Returns:
             Dictionary mapping repository URLs to their dependencies.
@@ -95,108 +185,71 @@ class RepositoryManager:
             repo_urls = self.get_all_repos()
         
         result = {}
+        base_dependencies = {}
+        fetched = {}
         
-        # Load existing dependencies if merging
-        existing_dependencies = {}
-        if merge_with_existing:
-            try:
-                output_dir = Path("output")
-                dependencies_path = output_dir / "dependencies.json"
-                if dependencies_path.exists():
-                    with open(dependencies_path, 'r') as f:
-                        data = json.load(f)
-                    
-                    # Convert to dictionary with repo_url as key
-                    for repo_data in data:
-                        repo_url = repo_data.get("repo_url")
-                        if repo_url:
-                            existing_dependencies[repo_url] = repo_data.get("dependencies", [])
-            except Exception as e:
-                print(f"Error loading existing dependencies: {str(e)}")
-        
-        for repo_url in repo_urls:
-            normalized_url = normalize_url(repo_url)
-            print(f"\nProcessing repository: {normalized_url}")
-            repo_dependencies = []
-            
-            # Get enabled sources for this repository
-            repo_sources = sources
-            if repo_sources is None:
-                repo_sources = self.source_manager.get_enabled_sources(normalized_url)
-                if not repo_sources:
-                    repo_sources = ["github_api", "package_files"]  # Default if no sources configured
-            
-            print(f"Using sources: {', '.join(repo_sources)}")
-            
-            # Start with existing dependencies if merging
-            if merge_with_existing and normalized_url in existing_dependencies:
-                # Filter out dependencies from sources we're about to refresh
-                repo_dependencies = [
-                    dep for dep in existing_dependencies[normalized_url]
-                    if "source_type" in dep and dep["source_type"] not in repo_sources
-                ]
-                print(f"Starting with {len(repo_dependencies)} existing dependencies from other sources")
-            
-            # Get repository source configuration
-            repo_source_config = self.source_manager.get_repo_sources(normalized_url)
-            
-            if "github_api" in repo_sources:
-                print("Fetching dependencies from GitHub API...")
-                github_deps = self.github_api_source.fetch_dependencies(normalized_url)
-                repo_dependencies.extend(github_deps)
-                print(f"Found {len(github_deps)} dependencies from GitHub API")
-            
-            if "package_files" in repo_sources:
-                print("Fetching dependencies from package files...")
-                # Use package files from repository source configuration if available
-                if repo_source_config:
-                    for source in repo_source_config["sources"]:
-                        if source["type"] == "package_files" and source.get("enabled", False):
-                            # Update package file source with files from configuration
-                            files = source.get("files", [])
-                            if files:
-                                print(f"Using {len(files)} package files from configuration")
-                                # Analyze each file individually
-                                package_deps = []
-                                for file_url in files:
-                                    normalized_file_url = normalize_url(file_url)
-                                    deps = self.package_file_source.analyze_file(normalized_url, normalized_file_url)
-                                    package_deps.extend(deps)
-                                repo_dependencies.extend(package_deps)
-                                print(f"Found {len(package_deps)} dependencies from package files")
-                            break
-                else:
-                    # Fall back to default behavior
-                    package_deps = self.package_file_source.fetch_dependencies(normalized_url)
-                    repo_dependencies.extend(package_deps)
-                    print(f"Found {len(package_deps)} dependencies from package files")
-            
-            if "sbom" in repo_sources and repo_source_config:
-                # Check if there's an SBOM source configured
-                for source in repo_source_config["sources"]:
-                    if source["type"] == "sbom" and source.get("enabled", False):
-                        location = source.get("location", {})
-                        location_type = location.get("type")
-                        
-                        if location_type == "local":
-                            path = location.get("path")
-                            if path and os.path.exists(path):
-                                print(f"Importing SBOM from local file: {path}")
-                                sbom_deps = self.sbom_source.import_sbom(path, normalized_url)
-                                repo_dependencies.extend(sbom_deps)
-                                print(f"Found {len(sbom_deps)} dependencies from SBOM")
-                        elif location_type == "url":
-                            url = location.get("url")
-                            if url:
-                                print(f"SBOM URL source not implemented yet: {url}")
-                                # TODO: Implement fetching SBOM from URL
-                        break
-            
+        def complete(normalized_url: str):
+            # Keep the sequential order: existing dependencies, then sources in the order requested
+            repo_dependencies = list(base_dependencies.pop(normalized_url))
+            for source_deps in fetched.pop(normalized_url).values():
+                repo_dependencies.extend(source_deps)
             result[normalized_url] = repo_dependencies
             print(f"Total dependencies for {normalized_url}: {len(repo_dependencies)}")
             
             # Update last_updated timestamp
             self.source_manager.update_repo_last_updated(normalized_url)
+            if on_repo_fetched:
+                on_repo_fetched(normalized_url, repo_dependencies)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for normalized_url in dict.fromkeys(normalize_url(url) for url in repo_urls):
+                print(f"\nProcessing repository: {normalized_url}")
+                
+                # Get enabled sources for this repository
+                repo_sources = sources
+                if repo_sources is None:
+                    repo_sources = self.source_manager.get_enabled_sources(normalized_url)
+                    if not repo_sources:
+                        repo_sources = ["github_api", "package_files"]  # Default if no sources configured
+                
+                print(f"Using sources: {', '.join(repo_sources)}")
+                
+                # Start with existing dependencies if merging
+                base_dependencies[normalized_url] = []
+                existing_dependencies = {}
+                if merge_with_existing:
+                    existing_dependencies = self.data_manager.get_dependencies(normalized_url)
+                if normalized_url in existing_dependencies:
+                    # Filter out dependencies from sources we're about to refresh
+                    base_dependencies[normalized_url] = [
+                        dep for dep in existing_dependencies[normalized_url]["dependencies"]
+                        if "source_type" in dep and dep["source_type"] not in repo_sources
+                    ]
+                    print(f"Starting with {len(base_dependencies[normalized_url])} existing dependencies from other sources")
+                
+                # Get repository source configuration
+                repo_source_config = self.source_manager.get_repo_sources(normalized_url)
+                
+                fetched[normalized_url] = {}
+                for source_type in ["github_api", "package_files", "sbom"]:
+                    if source_type in repo_sources:
+                        fetched[normalized_url][source_type] = []
+                        future = executor.submit(self._fetch_source, normalized_url, source_type, repo_source_config)
+                        futures[future] = (normalized_url, source_type)
+                if not fetched[normalized_url]:
+                    complete(normalized_url)
+            
+            pending = {url: len(source_deps) for url, source_deps in fetched.items()}
+            for future in as_completed(futures):
+                normalized_url, source_type = futures[future]
+                try:
+                    fetched[normalized_url][source_type] = future.result()
+                except Exception as e:
+                    print(f"Error fetching {source_type} dependencies for {normalized_url}: {str(e)}")
+                pending[normalized_url] -= 1
+                if pending[normalized_url] == 0:
+                    complete(normalized_url)
         
         return result
     
@@ -211,6 +264,20 @@ class RepositoryManager:
         Returns:
             List of dependencies extracted from the SBOM.
         """
+        return [dep for batch in self.iter_sbom_batches(file_path, repo_url) for dep in batch]
+    
+    def iter_sbom_batches(self, file_path: str, repo_url: str, batch_size: int = SBOM_BATCH_SIZE) -> Iterator[List[Dict]]:
+        """
+        Import dependencies from an SPDX SBOM file as a stream of batches.
+        
+        Args:
+            file_path: Path to the SPDX SBOM file (JSON or CSV).
+            repo_url: URL of the repository the SBOM belongs to.
+            batch_size: Number of dependencies per batch.
+            
+        Returns:
+            Iterator over lists of dependencies, for DataManager.save_dependency_batches.
+        """
         # Normalize the URL
         normalized_url = normalize_url(repo_url)
         
@@ -227,7 +294,7 @@ class RepositoryManager:
         )
         
         # Import SBOM dependencies
-        return self.sbom_source.import_sbom(file_path, normalized_url)
+        return self.sbom_source.iter_sbom_batches(file_path, normalized_url, batch_size)
     
     def add_dependency_file(self, repo_url: str, file_url: str) -> bool:
         """
@@ -0,0 +1,87 @@
+"""
+Content-addressed cache of LLM manifest analysis results.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class ManifestCache:
+    """
+    Persistent LRU cache of dependencies extracted from manifest files.
+
+    Entries are keyed by the sha256 of the file content and the prompt version, so a
+    byte-identical manifest is analyzed once per prompt. Each entry is a JSON file whose
+    modification time records its last use; the least recently used entries are evicted
+    once the cache exceeds max_entries or max_bytes.
+    """
+
+    def __init__(self, cache_dir: Path, prompt_version: str, max_entries: int = 10_000, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding one JSON file per entry.
+            prompt_version: Version of the prompt the results were produced with.
+            max_entries: Maximum number of cached manifests.
+            max_bytes: Maximum total size of the cached results.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.prompt_version = prompt_version
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Entry sizes in least to most recently used order
+        paths = sorted(self.cache_dir.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        self._entries = OrderedDict((path.stem, path.stat().st_size) for path in paths)
+        self._total_bytes = sum(self._entries.values())
+
+    def key(self, file_content: str) -> str:
+        """Cache key of a manifest's content under the current prompt version."""
+        return hashlib.sha256(f"{self.prompt_version}\0{file_content}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Cached dependencies for a key, or None."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(self._path(key), 'r') as f:
+                dependencies = json.load(f)
+            os.utime(self._path(key))
+            return dependencies
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self._total_bytes -= self._entries.pop(key, 0)
+            return None
+
+    def put(self, key: str, dependencies: List[Dict]):
+        """Store dependencies for a key and evict the least recently used entries if needed."""
+        content = json.dumps(dependencies)
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(content.encode("utf-8"))
+            self._total_bytes += self._entries[key]
+            evicted = []
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+                old_key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._path(old_key).unlink(missing_ok=True)
@@ -0,0 +1,240 @@
+"""
+Deterministic parsers for common dependency manifests.
+
+These cover the manifest types that can be read exactly without a model: package.json,
+Cargo.toml, go.mod, requirements*.txt and pyproject.toml. Each parser returns dependency
+dicts in the same shape as the LLM analysis (packageName, packageManager, requirements,
+relationship), or None if the file cannot be parsed, in which case the caller falls back
+to the LLM. Local packages (path, file and workspace references to code in the same
+repository) are not external dependencies and are left out.
+"""
+import json
+import re
+import tomllib
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+
+NPM_DEPENDENCY_SECTIONS = ["dependencies", "devDependencies", "peerDependencies", "optionalDependencies"]
+CARGO_DEPENDENCY_SECTIONS = ["dependencies", "dev-dependencies", "build-dependencies"]
+
+# NPM version specs that point at a package in the same repository (npm, yarn, pnpm)
+NPM_LOCAL_PREFIXES = ("file:", "link:", "workspace:", "portal:")
+
+# PEP 508 requirement: name, optional extras, then version specifiers / URL and markers
+PEP508_PATTERN = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*(.*)$")
+
+
+def _dependency(name: str, manager: str, requirements: Optional[str], relationship: str = "direct") -> Dict:
+    return {
+        "packageName": name,
+        "packageManager": manager,
+        "requirements": requirements or None,
+        "relationship": relationship
+    }
+
+
+def _parse_pep508(requirement: str) -> Optional[Dict]:
+    """Parse a PEP 508 requirement string into a PIP dependency, or None if it does not match."""
+    match = PEP508_PATTERN.match(requirement.strip())
+    if not match:
+        return None
+    name, _, rest = match.groups()
+    rest = rest.split(";")[0].strip()
+    if rest.startswith("@"):
+        rest = rest[1:].strip()
+    return _dependency(name, "PIP", rest)
+
+
+def _is_local_pep508(dependency: Dict) -> bool:
+    """Whether a parsed PEP 508 requirement is a direct reference to a local path."""
+    return (dependency["requirements"] or "").startswith("file:")
+
+
+def parse_package_json(content: str) -> Optional[List[Dict]]:
+    """Parse an NPM package.json."""
+    try:
+        manifest = json.loads(content)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(manifest, dict):
+        return None
+
+    dependencies = []
+    for section in NPM_DEPENDENCY_SECTIONS:
+        packages = manifest.get(section) or {}
+        if not isinstance(packages, dict):
+            return None
+        for name, version in packages.items():
+            if isinstance(version, str) and version.startswith(NPM_LOCAL_PREFIXES):
+                continue
+            dependencies.append(_dependency(name, "NPM", version if isinstance(version, str) else None))
+    return dependencies
+
+
+def parse_requirements_txt(content: str) -> Optional[List[Dict]]:
+    """Parse a pip requirements file; editable installs and bare URLs fall back to the LLM."""
+    dependencies = []
+    for line in content.splitlines():
+        line = re.sub(r"(^|\s)#.*$", "", line).strip()
+        if not line:
+            continue
+        if line.startswith("-"):
+            if line.startswith(("-r ", "-c ", "--requirement", "--constraint", "--index-url", "--extra-index-url")):
+                continue
+            return None
+        if "://" in line and "@" not in line.split("://")[0]:
+            # Bare URL / archive requirements have no package name to parse
+            return None
+        dependency = _parse_pep508(line)
+        if dependency is None:
+            return None
+        if not _is_local_pep508(dependency):
+            dependencies.append(dependency)
+    return dependencies
+
+
+def parse_go_mod(content: str) -> Optional[List[Dict]]:
+    """Parse a go.mod; requirements marked `// indirect` are indirect dependencies."""
+    dependencies = []
+    in_require_block = False
+    for line in content.splitlines():
+        line = line.strip()
+        if in_require_block:
+            if line == ")":
+                in_require_block = False
+                continue
+            spec = line
+        elif line.startswith("require ("):
+            in_require_block = True
+            continue
+        elif line.startswith("require "):
+            spec = line[len("require "):]
+        else:
+            continue
+
+        spec, _, comment = spec.partition("//")
+        parts = spec.split()
+        if not parts:
+            continue
+        if len(parts) != 2:
+            return None
+        relationship = "indirect" if "indirect" in comment else "direct"
+        dependencies.append(_dependency(parts[0], "GO", parts[1], relationship))
+    return dependencies
+
+
+def _git_requirement(spec: Dict) -> str:
+    """Requirement string for a git dependency table, in PEP 508 direct-reference form."""
+    ref = spec.get("rev") or spec.get("tag") or spec.get("branch")
+    return f"git+{spec['git']}" + (f"@{ref}" if ref else "")
+
+
+def _cargo_dependencies(packages: Dict, workspace_packages: Dict) -> List[Dict]:
+    dependencies = []
+    for name, spec in packages.items():
+        version = spec
+        if isinstance(spec, dict):
+            if "path" in spec:
+                # Crates in the same repository
+                continue
+            if spec.get("workspace") is True and name in workspace_packages:
+                # Inherited from [workspace.dependencies], which is reported itself
+                continue
+            # Renamed dependencies refer to the crate in `package`
+            name = spec.get("package", name)
+            version = spec.get("version") or (_git_requirement(spec) if "git" in spec else None)
+        dependencies.append(_dependency(name, "RUST", version if isinstance(version, str) else None))
+    return dependencies
+
+
+def parse_cargo_toml(content: str) -> Optional[List[Dict]]:
+    """Parse a Cargo.toml, including workspace and target-specific dependencies."""
+    try:
+        manifest = tomllib.loads(content)
+    except tomllib.TOMLDecodeError:
+        return None
+
+    workspace = manifest.get("workspace", {})
+    tables = [manifest, workspace]
+    tables.extend(manifest.get("target", {}).values())
+
+    workspace_packages = workspace.get("dependencies", {})
+    dependencies = []
+    for table in tables:
+        for section in CARGO_DEPENDENCY_SECTIONS:
+            dependencies.extend(_cargo_dependencies(table.get(section, {}), workspace_packages))
+    return dependencies
+
+
+def parse_pyproject_toml(content: str) -> Optional[List[Dict]]:
+    """Parse a pyproject.toml: PEP 621 project dependencies, PEP 735 groups and Poetry."""
+    try:
+        manifest = tomllib.loads(content)
+    except tomllib.TOMLDecodeError:
+        return None
+
+    requirements = list(manifest.get("project", {}).get("dependencies", []))
+    for group in manifest.get("project", {}).get("optional-dependencies", {}).values():
+        requirements.extend(group)
+    for group in manifest.get("dependency-groups", {}).values():
+        # Skip {include-group = ...} entries
+        requirements.extend(item for item in group if isinstance(item, str))
+
+    dependencies = []
+    for requirement in requirements:
+        dependency = _parse_pep508(requirement)
+        if dependency is None:
+            return None
+        if not _is_local_pep508(dependency):
+            dependencies.append(dependency)
+
+    poetry = manifest.get("tool", {}).get("poetry", {})
+    poetry_sections = [poetry.get("dependencies", {}), poetry.get("dev-dependencies", {})]
+    poetry_sections.extend(group.get("dependencies", {}) for group in poetry.get("group", {}).values())
+    for packages in poetry_sections:
+        for name, spec in packages.items():
+            if name.lower() == "python":
+                continue
+            version = spec
+            if isinstance(spec, dict):
+                if "path" in spec:
+                    # Packages in the same repository
+                    continue
+                version = spec.get("version") or (_git_requirement(spec) if "git" in spec else None)
+            dependencies.append(_dependency(name, "PIP", version if isinstance(version, str) else None))
+    return dependencies
+
+
+def get_manifest_parser(file_url: str) -> Optional[Callable[[str], Optional[List[Dict]]]]:
+    """Get the deterministic parser for a manifest URL, or None for other file types."""
+    filename = urlparse(file_url).path.rstrip("/").split("/")[-1]
+    if filename == "package.json":
+        return parse_package_json
+    if filename == "Cargo.toml":
+        return parse_cargo_toml
+    if filename == "go.mod":
+        return parse_go_mod
+    if filename == "pyproject.toml":
+        return parse_pyproject_toml
+    if re.fullmatch(r"requirements.*\.txt", filename):
+        return parse_requirements_txt
+    return None
+
+
+def parse_manifest(file_url: str, file_content: str) -> Optional[List[Dict]]:
+    """
+    Parse a manifest deterministically.
+
+    Args:
+        file_url: URL of the manifest, used to pick the parser.
+        file_content: Raw content of the manifest.
+
+    Returns:
+        List of dependencies, or None if there is no parser for the file type or the
+        file could not be parsed.
+    """
+    parser = get_manifest_parser(file_url)
+    if parser is None:
+        return None
+    return parser(file_content)
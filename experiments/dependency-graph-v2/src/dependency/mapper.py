@@ -1,7 +1,7 @@
 """
 Script to map dependencies to GitHub repositories using OSO.
 
-This script reads the dependencies.json file, queries OSO's deps.dev package model
+This script exports the dependency store to dependencies.json, reads it, queries OSO's deps.dev package model
 to find the corresponding GitHub repository for each dependency, and updates the
 dependency information with the GitHub repo URL or marks it as unknown if not found.
 
@@ -32,6 +32,7 @@ from pyoso import Client
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.config.config_manager import ConfigManager
+from src.core.data_manager import DataManager
 
 # Constants
 DEPENDENCIES_FILE = "output/dependencies.json"
@@ -481,7 +482,7 @@ def main() -> None:
     
     This function:
     1. Sets up the OSO client
-    2. Loads dependencies from dependencies.json
+    2. Exports the dependency store to dependencies.json and loads it
     3. Processes dependencies to extract package information
     4. Queries OSO for GitHub repository information
     5. Merges dependency information with GitHub repository information
@@ -495,8 +496,9 @@ def main() -> None:
         client = setup_oso_client()
         print("OSO client setup complete.")
         
-        # Load dependencies
+        # Load dependencies, exporting the dependency store first so the file is current
         dependencies_path = Path(DEPENDENCIES_FILE)
+        DataManager(dependencies_path.parent).export_dependencies(dependencies_path)
         if not dependencies_path.exists():
             print(f"Error: Dependencies file not found at {dependencies_path}")
             return
@@ -0,0 +1,156 @@
+"""
+Throughput benchmark for SPDX SBOM ingestion.
+
+Generates a synthetic SPDX JSON SBOM (GitHub dependency-graph export layout) and measures
+streaming it through SpdxSbomSource.iter_spdx_sbom and into the dependency store, reporting
+packages/s, MB/s and peak Python memory. Optionally compares against loading the whole
+document with json.load and parse_spdx_sbom.
+
+Usage:
+    python -m src.dependency.sbom_benchmark --packages 500000 [--compare-json-load]
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.core.data_manager import DataManager
+from src.dependency.sources import SpdxSbomSource
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark streaming SPDX SBOM ingestion.")
+    parser.add_argument("--packages", type=int, default=200_000, help="Number of packages in the synthetic SBOM.")
+    parser.add_argument("--direct-share", type=float, default=0.05, help="Share of packages that are direct dependencies.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Dependencies per streamed batch.")
+    parser.add_argument("--compare-json-load", action="store_true", help="Also time json.load + parse_spdx_sbom.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    return parser.parse_args()
+
+
+def write_synthetic_sbom(path: Path, num_packages: int, direct_share: float, seed: int = 0):
+    """
+    Write a synthetic SPDX JSON SBOM package by package, so generation memory stays flat.
+
+    Args:
+        path: Output path.
+        num_packages: Number of dependency packages (plus one root package).
+        direct_share: Share of packages the root depends on directly.
+        seed: Random seed.
+    """
+    rng = random.Random(seed)
+    root_id = "SPDXRef-github-org-repo-main"
+    header = {
+        "spdxVersion": "SPDX-2.3",
+        "dataLicense": "CC0-1.0",
+        "SPDXID": "SPDXRef-DOCUMENT",
+        "name": "com.github.org/repo",
+        "documentNamespace": "https://spdx.org/spdxdocs/synthetic",
+        "creationInfo": {"creators": ["Tool: sbom_benchmark"], "created": "2025-01-01T00:00:00Z"}
+    }
+    with open(path, "w") as f:
+        f.write(json.dumps(header)[:-1] + ',"packages":[')
+        f.write(json.dumps({"name": "org/repo", "SPDXID": root_id, "versionInfo": "main"}))
+        for i in range(num_packages):
+            name = f"pkg-{i}"
+            version = f"{rng.randint(0, 9)}.{rng.randint(0, 30)}.{rng.randint(0, 99)}"
+            f.write(",")
+            f.write(json.dumps({
+                "name": name,
+                "SPDXID": f"SPDXRef-npm-{name}-{i}",
+                "versionInfo": version,
+                "downloadLocation": "NOASSERTION",
+                "filesAnalyzed": False,
+                "licenseConcluded": rng.choice(["MIT", "Apache-2.0", "ISC", "NOASSERTION"]),
+                "externalRefs": [{
+                    "referenceCategory": "PACKAGE-MANAGER",
+                    "referenceType": "purl",
+                    "referenceLocator": f"pkg:npm/{name}@{version}"
+                }]
+            }))
+        f.write('],"relationships":[')
+        f.write(json.dumps({"spdxElementId": "SPDXRef-DOCUMENT", "relatedSpdxElement": root_id, "relationshipType": "DESCRIBES"}))
+        for i in range(num_packages):
+            source = root_id if rng.random() < direct_share else f"SPDXRef-npm-pkg-{rng.randrange(num_packages)}-0"
+            f.write(",")
+            f.write(json.dumps({"spdxElementId": source, "relatedSpdxElement": f"SPDXRef-npm-pkg-{i}-{i}", "relationshipType": "DEPENDS_ON"}))
+        f.write("]}")
+
+
+def measure(name: str, run: Callable[[], int], size_mb: float) -> Dict:
+    """
+    Time a run, then repeat it under tracemalloc to record its peak Python memory.
+
+    Tracing slows allocation-heavy Python code far more than C parsing, so the timed run
+    is untraced. run returns the number of dependencies.
+    """
+    start = time.perf_counter()
+    num_dependencies = run()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {
+        "name": name,
+        "dependencies": num_dependencies,
+        "seconds": elapsed,
+        "packages_per_second": num_dependencies / elapsed,
+        "mb_per_second": size_mb / elapsed,
+        "peak_memory_mb": peak / 1024 / 1024
+    }
+    print(f"{name:<28} {num_dependencies:>10,} deps {elapsed:8.2f}s "
+          f"{result['packages_per_second']:>10,.0f} pkg/s {result['mb_per_second']:7.1f} MB/s "
+          f"peak {result['peak_memory_mb']:8.1f} MB")
+    return result
+
+
+def main():
+    args = parse_args()
+    source = SpdxSbomSource()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sbom_path = Path(tmp_dir) / "synthetic_sbom.json"
+        print(f"Writing synthetic SBOM with {args.packages:,} packages...")
+        write_synthetic_sbom(sbom_path, args.packages, args.direct_share, args.seed)
+        size_mb = sbom_path.stat().st_size / 1024 / 1024
+        print(f"SBOM size: {size_mb:.1f} MB\n")
+
+        def stream_parse():
+            return sum(len(batch) for batch in source.iter_spdx_sbom(str(sbom_path), args.batch_size))
+
+        def stream_to_store():
+            data_manager = DataManager(Path(tmp_dir) / "output")
+            return data_manager.save_dependency_batches(
+                "https://github.com/org/repo",
+                source.iter_spdx_sbom(str(sbom_path), args.batch_size),
+                overwrite=True
+            )
+
+        def json_load():
+            with open(sbom_path, "r") as f:
+                return len(source.parse_spdx_sbom(json.load(f)))
+
+        measure("stream parse", stream_parse, size_mb)
+        measure("stream parse + store", stream_to_store, size_mb)
+        if args.compare_json_load:
+            measure("json.load + parse", json_load, size_mb)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,24 @@
 Dependency source implementations for fetching dependencies from different sources.
 """
 import base64
+import hashlib
 import json
 import os
 import re
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Set
 
 import google.generativeai as genai
 import requests
 from dotenv import load_dotenv
 
 from ..config.prompts.dependency_prompts import DEPENDENCY_ANALYSIS_PROMPT
-from ..config.settings import GITHUB_HEADERS
+from ..config.settings import GITHUB_HEADERS, HTTP_CACHE_DIR, MANIFEST_CACHE_DIR, SBOM_BATCH_SIZE
+from ..utils.http import GitHubRateLimiter, HttpCache, create_session
+from ..utils.json_stream import iter_json_array_items
+from .manifest_cache import ManifestCache
+from .manifest_parsers import parse_manifest
 
 
 class DependencySource(ABC):
@@ -34,13 +39,28 @@ class DependencySource(ABC):
 class GitHubApiSource(DependencySource):
     """Fetch dependencies using GitHub's GraphQL API."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        rate_limiter: Optional[GitHubRateLimiter] = None,
+        cache: Optional[HttpCache] = None
+    ):
+        """
+        Args:
+            session: HTTP session to share with other sources. Created if not given.
+            rate_limiter: GitHub budget to share with other sources. Created if not given.
+            cache: Persistent response cache. Defaults to HTTP_CACHE_DIR.
+        """
+        self.session = session or create_session()
+        self.rate_limiter = rate_limiter or GitHubRateLimiter()
+        self.cache = cache or HttpCache(HTTP_CACHE_DIR)
         load_dotenv()
         self.github_token = os.getenv("GITHUB_TOKEN")
         if not self.github_token:
             raise ValueError("GITHUB_TOKEN environment variable is required")
         
-        # GraphQL endpoint
+        # API endpoints
+        self.api_url = "https://api.github.com"
         self.graphql_url = "https://api.github.com/graphql"
         self.headers = {
             "Authorization": f"Bearer {self.github_token}",
@@ -54,8 +74,33 @@ class GitHubApiSource(DependencySource):
             raise ValueError(f"Invalid GitHub URL: {repo_url}")
         return parts[-2], parts[-1]
     
+    def _get_head_sha(self, owner: str, repo: str) -> Optional[str]:
+        """
+        Get the SHA of the default branch HEAD, revalidated with a conditional request.
+        
+        Unchanged repositories answer 304 Not Modified, which costs no rate-limit budget.
+        """
+        try:
+            response = self.cache.request(
+                self.rate_limiter,
+                self.session,
+                "GET",
+                f"{self.api_url}/repos/{owner}/{repo}/commits/HEAD",
+                headers={**self.headers, "Accept": "application/vnd.github.sha"}
+            )
+            response.raise_for_status()
+            return response.text.strip() or None
+        except Exception as e:
+            print(f"Error fetching HEAD commit for {owner}/{repo}: {str(e)}")
+            return None
+    
     def fetch_dependencies(self, repo_url: str) -> List[Dict]:
-        """Fetch repository dependencies using GitHub's GraphQL API."""
+        """
+        Fetch repository dependencies using GitHub's GraphQL API.
+        
+        The GraphQL response is cached with the default branch HEAD it was fetched at, and
+        reused without querying the dependency graph while HEAD has not moved.
+        """
         owner, repo = self._extract_repo_info(repo_url)
         
         query = """
@@ -85,17 +130,32 @@ class GitHubApiSource(DependencySource):
             "repo": repo
         }
         
+        payload = {"query": query, "variables": variables}
+        
         try:
-            response = requests.post(
-                self.graphql_url,
-                headers=self.headers,
-                json={"query": query, "variables": variables}
-            )
-            response.raise_for_status()
-            data = response.json()
+            head_sha = self._get_head_sha(owner, repo)
+            cache_key = self.cache.key("POST", self.graphql_url, payload)
+            cached = self.cache.get(cache_key)
+            
+            if head_sha and cached and cached.get("sha") == head_sha:
+                print(f"\nUsing cached dependencies for {owner}/{repo} at {head_sha[:7]}")
+                data = json.loads(cached["content"])
+            else:
+                response = self.rate_limiter.request(
+                    self.session,
+                    "POST",
+                    self.graphql_url,
+                    headers=self.headers,
+                    json=payload
+                )
+                response.raise_for_status()
+                data = response.json()
+                if head_sha and "errors" not in data:
+                    self.cache.put(cache_key, {"sha": head_sha, "content": response.text})
+                
+                # Add debug logging
+                print(f"\nFetching dependencies for {owner}/{repo}")
             
-            # Add debug logging
-            print(f"\nFetching dependencies for {owner}/{repo}")
             if "errors" in data:
                 print(f"GraphQL errors: {data['errors']}")
                 return []
@@ -134,7 +194,21 @@ class GitHubApiSource(DependencySource):
 class PackageFileSource(DependencySource):
     """Analyze package files to extract dependencies."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        rate_limiter: Optional[GitHubRateLimiter] = None,
+        cache: Optional[HttpCache] = None
+    ):
+        """
+        Args:
+            session: HTTP session to share with other sources. Created if not given.
+            rate_limiter: GitHub budget to share with other sources. Created if not given.
+            cache: Persistent response cache. Defaults to HTTP_CACHE_DIR.
+        """
+        self.session = session or create_session()
+        self.rate_limiter = rate_limiter or GitHubRateLimiter()
+        self.cache = cache or HttpCache(HTTP_CACHE_DIR)
         load_dotenv()
         self.github_token = os.getenv("GITHUB_TOKEN")
         if not self.github_token:
@@ -145,7 +219,12 @@ class PackageFileSource(DependencySource):
             raise ValueError("GEMINI_API_KEY environment variable is required")
         
         genai.configure(api_key=self.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self.model_name = 'gemini-2.0-flash'
+        self.model = genai.GenerativeModel(self.model_name)
+        
+        # Results are only reused for the same model and prompt
+        prompt_version = hashlib.sha256(f"{self.model_name}\0{DEPENDENCY_ANALYSIS_PROMPT}".encode()).hexdigest()[:16]
+        self.manifest_cache = ManifestCache(MANIFEST_CACHE_DIR, prompt_version)
         
         self.headers = {
             "Authorization": f"Bearer {self.github_token}",
@@ -192,8 +271,10 @@ class PackageFileSource(DependencySource):
         print(f"\nFetching file from: {url}")
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.cache.request(self.rate_limiter, self.session, "GET", url, headers=self.headers)
             response.raise_for_status()
+            if response.from_cache:
+                print("File unchanged since last fetch, using cached content")
             
             # Try to parse as JSON first
             try:
@@ -226,6 +307,30 @@ class PackageFileSource(DependencySource):
             return ""
     
     def _analyze_dependencies(self, file_content: str, file_url: str) -> List[Dict]:
+        """
+        Extract the dependencies in a file.
+        
+        Common manifest types are parsed deterministically. Other files are analyzed by
+        Gemini, with results cached by content hash so unchanged files are not re-sent.
+        """
+        deps = parse_manifest(file_url, file_content)
+        if deps is not None:
+            print(f"Parsed {len(deps)} dependencies from {file_url} without LLM")
+        else:
+            cache_key = self.manifest_cache.key(file_content)
+            deps = self.manifest_cache.get(cache_key)
+            if deps is not None:
+                print(f"Using cached analysis of {file_url} ({len(deps)} dependencies)")
+            else:
+                deps = self._analyze_dependencies_with_llm(file_content, file_url)
+                if deps:
+                    self.manifest_cache.put(cache_key, deps)
+        
+        for dep in deps:
+            dep["source_type"] = self.get_source_type()
+        return deps
+    
+    def _analyze_dependencies_with_llm(self, file_content: str, file_url: str) -> List[Dict]:
         """Use Gemini to analyze dependencies in a file."""
         print(f"Analyzing dependencies for file: {file_url}")
         prompt = DEPENDENCY_ANALYSIS_PROMPT.format(
@@ -378,28 +483,137 @@ class SpdxSbomSource(DependencySource):
     
     def import_sbom(self, file_path: str, repo_url: str) -> List[Dict]:
         """Import dependencies from an SPDX SBOM file."""
+        return [dep for batch in self.iter_sbom_batches(file_path, repo_url) for dep in batch]
+    
+    def iter_sbom_batches(self, file_path: str, repo_url: str, batch_size: int = SBOM_BATCH_SIZE) -> Iterator[List[Dict]]:
+        """
+        Stream dependencies from an SPDX SBOM file (JSON or CSV) in batches.
+        
+        Memory is bounded by the batch size rather than the SBOM size, so the batches can
+        be written to storage as they are produced.
+        
+        Args:
+            file_path: Path to the SBOM file.
+            repo_url: URL of the repository the SBOM belongs to.
+            batch_size: Number of dependencies per batch.
+            
+        Yields:
+            Lists of up to batch_size dependencies.
+        """
         try:
-            with open(file_path, 'r') as f:
-                if file_path.lower().endswith('.json'):
-                    sbom_data = json.load(f)
-                    return self.parse_spdx_sbom(sbom_data)
-                elif file_path.lower().endswith('.csv'):
-                    return self.parse_csv_sbom(f, repo_url)
-                else:
-                    print(f"Unsupported file format: {file_path}. Only JSON and CSV formats are supported.")
-                    return []
+            if file_path.lower().endswith('.json'):
+                yield from self.iter_spdx_sbom(file_path, batch_size)
+            elif file_path.lower().endswith('.csv'):
+                with open(file_path, 'r', newline='') as f:
+                    yield from self.iter_csv_sbom(f, repo_url, batch_size)
+            else:
+                print(f"Unsupported file format: {file_path}. Only JSON and CSV formats are supported.")
         except Exception as e:
             print(f"Error importing SBOM from {file_path}: {str(e)}")
-            return []
     
-    def parse_spdx_sbom(self, sbom_data: Dict) -> List[Dict]:
-        """Parse SPDX SBOM data into dependency objects."""
-        dependencies = []
+    def _scan_spdx_relationships(self, file_path: str, root_pkg_id: Optional[str] = None) -> tuple[Optional[str], Set[str]]:
+        """
+        Stream the relationships of an SPDX JSON SBOM to find the root package and its
+        direct dependencies.
+        
+        Args:
+            file_path: Path to the SPDX JSON file.
+            root_pkg_id: Root package, if already known.
+            
+        Returns:
+            (root package SPDXID, SPDXIDs of the packages the root depends on).
+        """
+        direct_deps = set()
+        document_describes = None
+        missed_dependencies = False
+        
+        with open(file_path, 'r') as f:
+            for key, item in iter_json_array_items(f, ["relationships", "documentDescribes"]):
+                if key == "documentDescribes":
+                    if document_describes is None:
+                        document_describes = item
+                    continue
+                
+                rel_type = item.get("relationshipType")
+                if rel_type == "DESCRIBES" and root_pkg_id is None:
+                    root_pkg_id = item.get("relatedSpdxElement")
+                elif rel_type == "DEPENDS_ON":
+                    # If the source is the root package, this is a direct dependency
+                    if root_pkg_id is None:
+                        missed_dependencies = True
+                    elif item.get("spdxElementId") == root_pkg_id:
+                        direct_deps.add(item.get("relatedSpdxElement"))
+        
+        # If no DESCRIBES relationship, fall back to what the document describes
+        if root_pkg_id is None and document_describes is not None:
+            root_pkg_id = document_describes
         
-        # Create a mapping of SPDXID to package info
-        package_map = {pkg["SPDXID"]: pkg for pkg in sbom_data.get("packages", [])}
+        # Dependencies listed before the root was known need a second pass
+        if missed_dependencies and root_pkg_id is not None:
+            return self._scan_spdx_relationships(file_path, root_pkg_id)
+        return root_pkg_id, direct_deps
+    
+    def _spdx_dependency(self, pkg: Dict, root_pkg_id: Optional[str], direct_deps: Set[str]) -> Optional[Dict]:
+        """Convert an SPDX package into a dependency object, or None for the root package."""
+        pkg_id = pkg.get("SPDXID")
+        if pkg_id == root_pkg_id:
+            # Skip the root package itself
+            return None
+        
+        # Extract package manager from PURL
+        pkg_manager = "UNKNOWN"
+        purl = ""
+        for ref in pkg.get("externalRefs", []):
+            if ref.get("referenceType") == "purl":
+                purl = ref.get("referenceLocator", "")
+                if purl.startswith("pkg:"):
+                    pkg_manager = purl.split("/")[0].split(":")[1].upper()
+                    break
+        
+        # Determine relationship (direct or transitive)
+        relationship = "transitive"  # Default to transitive
+        if pkg_id in direct_deps:
+            relationship = "direct"
+        # For NPM packages, the comment may say if it's a direct dependency
+        elif pkg_manager == "NPM" and "comment" in pkg:
+            comment = pkg.get("comment", "").lower()
+            if "direct dependency" in comment or "production dependency" in comment:
+                relationship = "direct"
         
-        # Find the root package (usually the first one or the one with the document describes relationship)
+        return {
+            "packageName": pkg.get("name"),
+            "packageManager": pkg_manager,
+            "requirements": pkg.get("versionInfo", ""),
+            "relationship": relationship,
+            "packageUrl": purl,
+            "source_type": self.get_source_type()
+        }
+    
+    def iter_spdx_sbom(self, file_path: str, batch_size: int = SBOM_BATCH_SIZE) -> Iterator[List[Dict]]:
+        """
+        Stream an SPDX JSON SBOM into batches of dependency objects.
+        
+        The file is read incrementally: one pass over the relationships to find the direct
+        dependencies, then one pass over the packages.
+        """
+        root_pkg_id, direct_deps = self._scan_spdx_relationships(file_path)
+        
+        batch = []
+        with open(file_path, 'r') as f:
+            for _, pkg in iter_json_array_items(f, ["packages"]):
+                dependency = self._spdx_dependency(pkg, root_pkg_id, direct_deps)
+                if dependency is None:
+                    continue
+                batch.append(dependency)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+    
+    def parse_spdx_sbom(self, sbom_data: Dict) -> List[Dict]:
+        """Parse SPDX SBOM data into dependency objects."""
+        # Find the root package (the one with the document describes relationship)
         root_pkg_id = None
         for rel in sbom_data.get("relationships", []):
             if rel.get("relationshipType") == "DESCRIBES":
@@ -411,69 +625,17 @@ class SpdxSbomSource(DependencySource):
             if isinstance(sbom_data["documentDescribes"], list) and sbom_data["documentDescribes"]:
                 root_pkg_id = sbom_data["documentDescribes"][0]
         
-        # Process relationships to determine direct vs. transitive dependencies
-        direct_deps = set()
-        transitive_deps = set()
-        
-        for rel in sbom_data.get("relationships", []):
-            rel_type = rel.get("relationshipType")
-            source_id = rel.get("spdxElementId")
-            target_id = rel.get("relatedSpdxElement")
-            
-            if rel_type == "DEPENDS_ON":
-                # If the source is the root package, this is a direct dependency
-                if source_id == root_pkg_id:
-                    direct_deps.add(target_id)
-                # Otherwise, it's a transitive dependency
-                elif source_id in package_map and target_id in package_map:
-                    transitive_deps.add(target_id)
-        
-        # For NPM packages, we can also look at the package.json dependencies vs devDependencies
-        npm_direct_deps = set()
-        npm_dev_deps = set()
-        
-        # Process each package
-        for pkg_id, pkg in package_map.items():
-            pkg_name = pkg.get("name")
-            pkg_version = pkg.get("versionInfo", "")
-            
-            # Extract package manager from PURL
-            pkg_manager = "UNKNOWN"
-            purl = ""
-            for ref in pkg.get("externalRefs", []):
-                if ref.get("referenceType") == "purl":
-                    purl = ref.get("referenceLocator", "")
-                    if purl.startswith("pkg:"):
-                        pkg_manager = purl.split("/")[0].split(":")[1].upper()
-                        break
-            
-            # For NPM packages, try to determine if it's a direct or dev dependency
-            if pkg_manager == "NPM" and "comment" in pkg:
-                comment = pkg.get("comment", "").lower()
-                if "direct dependency" in comment or "production dependency" in comment:
-                    npm_direct_deps.add(pkg_id)
-                elif "dev dependency" in comment or "development dependency" in comment:
-                    npm_dev_deps.add(pkg_id)
-            
-            # Determine relationship (direct or transitive)
-            relationship = "transitive"  # Default to transitive
-            
-            if pkg_id == root_pkg_id:
-                # Skip the root package itself
-                continue
-            elif pkg_id in direct_deps or pkg_id in npm_direct_deps:
-                relationship = "direct"
-            
-            dependencies.append({
-                "packageName": pkg_name,
-                "packageManager": pkg_manager,
-                "requirements": pkg_version,
-                "relationship": relationship,
-                "packageUrl": purl,
-                "source_type": self.get_source_type()
-            })
+        # If the source is the root package, this is a direct dependency
+        direct_deps = {
+            rel.get("relatedSpdxElement")
+            for rel in sbom_data.get("relationships", [])
+            if rel.get("relationshipType") == "DEPENDS_ON" and rel.get("spdxElementId") == root_pkg_id
+        }
         
-        return dependencies
+        # Packages are keyed by SPDXID, so later duplicates replace earlier ones
+        packages = {pkg["SPDXID"]: pkg for pkg in sbom_data.get("packages", [])}
+        dependencies = [self._spdx_dependency(pkg, root_pkg_id, direct_deps) for pkg in packages.values()]
+        return [dep for dep in dependencies if dep is not None]
     
     def parse_csv_sbom(self, file_obj, repo_url: str) -> List[Dict]:
         """Parse CSV export from GitHub SBOM into dependency objects.
@@ -481,9 +643,13 @@ class SpdxSbomSource(DependencySource):
         Expected CSV format:
         package_url,name,version,type,namespace,license,dependency_type
         """
+        return [dep for batch in self.iter_csv_sbom(file_obj, repo_url) for dep in batch]
+    
+    def iter_csv_sbom(self, file_obj, repo_url: str, batch_size: int = SBOM_BATCH_SIZE) -> Iterator[List[Dict]]:
+        """Stream a CSV export from GitHub SBOM into batches of dependency objects, row by row."""
         import csv
         
-        dependencies = []
+        batch = []
         reader = csv.DictReader(file_obj)
         
         for row in reader:
@@ -514,7 +680,7 @@ class SpdxSbomSource(DependencySource):
                 except (ValueError, TypeError):
                     pass
             
-            dependencies.append({
+            batch.append({
                 "packageName": row.get("name", ""),
                 "packageManager": pkg_manager,
                 "requirements": row.get("version", ""),
@@ -524,8 +690,12 @@ class SpdxSbomSource(DependencySource):
                 "license": row.get("license", ""),
                 "source_type": self.get_source_type()
             })
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
         
-        return dependencies
+        if batch:
+            yield batch
     
     def get_source_type(self) -> str:
         return "spdx_sbom"
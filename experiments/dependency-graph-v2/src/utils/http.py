@@ -0,0 +1,254 @@
+"""
+Shared HTTP session, GitHub rate-limit budget and conditional-request cache.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_size: int = 16) -> requests.Session:
+    """
+    Create a requests session with a connection pool large enough for concurrent workers.
+
+    Args:
+        pool_size: Maximum number of pooled connections per host.
+
+    Returns:
+        A requests.Session that can be shared across threads.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class GitHubRateLimiter:
+    """
+    Global GitHub API budget shared by all workers.
+
+    Caps the number of in-flight requests and tracks the X-RateLimit-* headers of every
+    response per rate-limit resource (core REST, GraphQL, search), so that once the
+    remaining budget of a resource drops to `reserve` all workers wait for its reset
+    instead of burning through the quota and getting rejected.
+    """
+
+    def __init__(self, max_concurrent: int = 8, reserve: int = 50, max_retries: int = 3):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            max_concurrent: Maximum number of concurrent GitHub requests.
+            reserve: Remaining requests to keep in reserve before waiting for the reset.
+            max_retries: Retries for requests rejected by the (secondary) rate limit.
+        """
+        self.reserve = reserve
+        self.max_retries = max_retries
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        # Remaining requests and reset time of each resource, once a response reported them
+        self.remaining: Dict[str, int] = {}
+        self.reset_at: Dict[str, float] = {}
+
+    @staticmethod
+    def resource(url: str) -> str:
+        """Rate-limit resource a GitHub API request counts against."""
+        path = urlparse(url).path
+        if path.rstrip("/").endswith("/graphql"):
+            return "graphql"
+        if path.startswith("/search/"):
+            return "search"
+        return "core"
+
+    def _wait_for_budget(self, resource: str) -> Optional[float]:
+        """Wait until the resource has budget; returns the reset time of the window a request was claimed from."""
+        with self._lock:
+            if resource not in self.remaining:
+                return None
+            if self.remaining[resource] > self.reserve:
+                # Claim one request of the budget before the response reports it
+                self.remaining[resource] -= 1
+                return self.reset_at[resource]
+            wait = self.reset_at[resource] - time.time()
+        if wait > 0:
+            print(f"GitHub {resource} rate limit budget exhausted, waiting {wait:.0f}s for reset...")
+            time.sleep(wait)
+        with self._lock:
+            if resource in self.reset_at and time.time() >= self.reset_at[resource]:
+                del self.remaining[resource], self.reset_at[resource]
+        return None
+
+    def _refund(self, resource: str, claimed_window: float):
+        """Return a claimed request to the budget, unless a new window has started since."""
+        with self._lock:
+            if self.reset_at.get(resource) == claimed_window:
+                self.remaining[resource] += 1
+
+    def _update(self, response: requests.Response, resource: str):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset_at = response.headers.get("X-RateLimit-Reset")
+        if remaining is None or reset_at is None:
+            return
+        resource = response.headers.get("X-RateLimit-Resource", resource)
+        with self._lock:
+            reset_at = float(reset_at)
+            if resource not in self.reset_at or reset_at > self.reset_at[resource]:
+                # A new rate-limit window started
+                self.remaining[resource], self.reset_at[resource] = int(remaining), reset_at
+            elif reset_at == self.reset_at[resource]:
+                self.remaining[resource] = min(self.remaining[resource], int(remaining))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Seconds to wait before retrying a rate-limited response, or None if not rate limited."""
+        if response.status_code not in (403, 429):
+            return None
+        if "Retry-After" in response.headers:
+            return float(response.headers["Retry-After"])
+        if response.headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in response.headers:
+            return max(float(response.headers["X-RateLimit-Reset"]) - time.time(), 1)
+        return None
+
+    def request(self, session: requests.Session, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Make a GitHub API request within the shared budget.
+
+        Args:
+            session: Session to send the request with.
+            method: HTTP method.
+            url: Request URL.
+            **kwargs: Passed on to session.request.
+
+        Returns:
+            The response of the last attempt.
+        """
+        resource = self.resource(url)
+        for attempt in range(self.max_retries + 1):
+            claimed_window = self._wait_for_budget(resource)
+            with self._slots:
+                response = session.request(method, url, **kwargs)
+            if response.status_code == 304 and claimed_window is not None:
+                # Conditional requests answered 304 Not Modified do not count against the limit
+                self._refund(resource, claimed_window)
+            self._update(response, resource)
+            retry_after = self._retry_after(response)
+            if retry_after is None or attempt == self.max_retries:
+                return response
+            print(f"GitHub rate limited ({response.status_code}), retrying in {retry_after:.0f}s...")
+            time.sleep(retry_after)
+        return response
+
+
+class HttpCache:
+    """
+    Persistent HTTP response cache with conditional revalidation.
+
+    Entries are keyed by method, URL and request body and store the response body with
+    its ETag / Last-Modified validators, plus an optional version tag such as the commit
+    SHA the response was computed at. Revalidation requests that come back 304 Not
+    Modified do not count against GitHub's rate limit.
+    """
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding one JSON file per cached response.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(method: str, url: str, body: Optional[Dict] = None) -> str:
+        """Cache key of a request."""
+        request = json.dumps([method.upper(), url, body], sort_keys=True)
+        return hashlib.sha256(request.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached entry for a key, or None."""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, entry: Dict):
+        """Store an entry, atomically replacing any previous one."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def to_response(entry: Dict, url: str) -> requests.Response:
+        """Rebuild a response from a cached entry."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = "utf-8"
+        response._content = entry["content"].encode("utf-8")
+        response.headers.update(entry.get("headers", {}))
+        response.from_cache = True
+        return response
+
+    def request(
+        self,
+        rate_limiter: GitHubRateLimiter,
+        session: requests.Session,
+        method: str,
+        url: str,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Make a request, revalidating a cached response with If-None-Match / If-Modified-Since.
+
+        Args:
+            rate_limiter: GitHub budget to make the request within.
+            session: Session to send the request with.
+            method: HTTP method.
+            url: Request URL.
+            **kwargs: Passed on to session.request.
+
+        Returns:
+            The fresh response, or the cached response if the server reports it unchanged.
+        """
+        key = self.key(method, url, kwargs.get("json"))
+        entry = self.get(key)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = rate_limiter.request(session, method, url, headers=headers, **kwargs)
+        if response.status_code == 304 and entry:
+            return self.to_response(entry, url)
+
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if response.status_code == 200 and (etag or last_modified):
+            self.put(key, {
+                "etag": etag,
+                "last_modified": last_modified,
+                "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+                "content": response.text
+            })
+        response.from_cache = False
+        return response
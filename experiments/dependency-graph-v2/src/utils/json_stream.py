@@ -0,0 +1,142 @@
+"""
+Incremental reading of large JSON documents.
+
+Iterates over the elements of top-level arrays of a JSON object without loading the
+whole document: the file is read in chunks, elements are decoded one at a time, and the
+values of other keys are skipped one element at a time.
+"""
+import json
+import re
+from typing import Any, Iterable, Iterator, TextIO, Tuple
+
+
+WHITESPACE = re.compile(r"\s*")
+DELIMITERS = frozenset(",:]} \t\r\n")
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class JsonStreamReader:
+    """Chunked JSON reader over a text file object."""
+
+    def __init__(self, file_obj: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.file_obj = file_obj
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Read the next chunk, dropping the consumed part of the buffer. False at end of file."""
+        chunk = self.file_obj.read(self.chunk_size)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it; '' at end of file."""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {self.peek()!r}")
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        """Decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number cut off at the end of the chunk may continue in the next one
+                if self.eof or (end < len(self.buffer) and self.buffer[end] in DELIMITERS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def skip_value(self):
+        """
+        Skip the next JSON value without building it.
+
+        Arrays and objects are walked element by element, so only one element is decoded
+        (and discarded) at a time; decoding with the C scanner is much faster than
+        tokenizing the skipped text in Python.
+        """
+        char = self.peek()
+        if char == "[":
+            for _ in self.iter_array():
+                pass
+        elif char == "{":
+            self.pos += 1
+            if self.peek() == "}":
+                self.pos += 1
+                return
+            while True:
+                self.read_value()
+                self.expect(":")
+                self.skip_value()
+                if self.peek() == ",":
+                    self.pos += 1
+                else:
+                    self.expect("}")
+                    return
+        else:
+            self.read_value()
+
+    def iter_array(self) -> Iterator[Any]:
+        """Decode the elements of the next JSON array one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self.peek() == ",":
+                self.pos += 1
+            else:
+                self.expect("]")
+                return
+
+
+def iter_json_array_items(file_obj: TextIO, keys: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream the elements of the given top-level arrays of a JSON object.
+
+    Args:
+        file_obj: Text file object positioned at the start of a JSON object.
+        keys: Top-level keys whose arrays to stream. Other keys are skipped.
+        chunk_size: Number of characters to read at a time.
+
+    Yields:
+        (key, element) for every element of the selected arrays, in document order.
+        A selected key whose value is not an array yields the value once.
+    """
+    keys = set(keys)
+    reader = JsonStreamReader(file_obj, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.read_value()
+        reader.expect(":")
+        if key not in keys:
+            reader.skip_value()
+        elif reader.peek() == "[":
+            for item in reader.iter_array():
+                yield key, item
+        else:
+            yield key, reader.read_value()
+        if reader.peek() == ",":
+            reader.pos += 1
+        else:
+            reader.expect("}")
+            return
@@ -0,0 +1,187 @@
+"""
+Tests for the conditional-request cache and the GitHub rate-limit budget against a local
+stub of the GitHub API.
+
+Run from experiments/dependency-graph-v2 with `python -m pytest tests` or
+`python -m unittest discover tests`.
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.http import GitHubRateLimiter, HttpCache, create_session
+
+
+class StubGitHub:
+    """
+    Serves a mutable document per path with an ETag, answering If-None-Match with 304.
+
+    Like GitHub, every response reports the rate-limit budget, and only requests that
+    are not answered 304 Not Modified consume it.
+    """
+
+    def __init__(self, limit: int = 5000):
+        self.documents = {}
+        self.requests = []
+        self.remaining = limit
+        self.reset_at = int(time.time()) + 3600
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, status: int, body: str = "", etag: str = None):
+                if status != 304:
+                    stub.remaining -= 1
+                content = body.encode()
+                self.send_response(status)
+                self.send_header("X-RateLimit-Remaining", str(stub.remaining))
+                self.send_header("X-RateLimit-Reset", str(stub.reset_at))
+                self.send_header("X-RateLimit-Resource", "graphql" if self.path == "/graphql" else "core")
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                stub.requests.append(("GET", self.path, self.headers.get("If-None-Match")))
+                if self.path not in stub.documents:
+                    self._respond(404)
+                    return
+                body, etag = stub.documents[self.path]
+                if self.headers.get("If-None-Match") == etag:
+                    self._respond(304, etag=etag)
+                else:
+                    self._respond(200, body, etag)
+
+            def do_POST(self):
+                payload = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.requests.append(("POST", self.path, json.loads(payload)))
+                self._respond(200, json.dumps(stub.documents["/graphql"][0]))
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def publish(self, path: str, body, etag: str = None):
+        self.documents[path] = (body, etag)
+
+    def count(self, method: str, path: str) -> int:
+        return sum(1 for m, p, _ in self.requests if (m, p) == (method, path))
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class HttpCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = HttpCache(self.tmp_dir.name)
+        self.session = create_session()
+        self.rate_limiter = GitHubRateLimiter()
+        self.stub = StubGitHub().__enter__()
+
+    def tearDown(self):
+        self.stub.__exit__()
+        self.session.close()
+        self.tmp_dir.cleanup()
+
+    def get(self, path: str):
+        return self.cache.request(self.rate_limiter, self.session, "GET", f"{self.stub.url}{path}")
+
+    def test_not_modified_is_served_from_cache(self):
+        self.stub.publish("/repos/o/r/contents/package.json", '{"name": "r"}', '"v1"')
+        first = self.get("/repos/o/r/contents/package.json")
+        second = self.get("/repos/o/r/contents/package.json")
+
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), {"name": "r"})
+        self.assertEqual(self.stub.requests[-1][2], '"v1"')
+
+    def test_changed_etag_is_refetched(self):
+        path = "/repos/o/r/contents/package.json"
+        self.stub.publish(path, '{"version": 1}', '"v1"')
+        self.get(path)
+        self.stub.publish(path, '{"version": 2}', '"v2"')
+
+        changed = self.get(path)
+        self.assertFalse(changed.from_cache)
+        self.assertEqual(changed.json(), {"version": 2})
+
+        # The new version replaced the cached one
+        again = self.get(path)
+        self.assertTrue(again.from_cache)
+        self.assertEqual(again.json(), {"version": 2})
+        self.assertEqual(self.stub.requests[-1][2], '"v2"')
+
+    def test_not_modified_does_not_consume_budget(self):
+        path = "/repos/o/r/commits/HEAD"
+        self.stub.publish(path, "abc123", '"abc123"')
+        self.get(path)
+        self.assertEqual(self.rate_limiter.remaining["core"], self.stub.remaining)
+
+        for _ in range(3):
+            self.assertTrue(self.get(path).from_cache)
+        self.assertEqual(self.stub.remaining, 4999)
+        self.assertEqual(self.rate_limiter.remaining["core"], 4999)
+
+
+class GitHubApiSourceCacheTest(unittest.TestCase):
+
+    GRAPHQL_RESPONSE = {"data": {"repository": {"dependencyGraphManifests": {"nodes": [
+        {"filename": "package.json", "dependencies": {"nodes": [
+            {"packageName": "left-pad", "packageManager": "NPM", "requirements": "^1.3.0", "relationship": "direct"}
+        ]}}
+    ]}}}}
+
+    def setUp(self):
+        from src.dependency.sources import GitHubApiSource
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.stub = StubGitHub().__enter__()
+        self.stub.publish("/graphql", self.GRAPHQL_RESPONSE)
+        os.environ.setdefault("GITHUB_TOKEN", "test-token")
+        self.source = GitHubApiSource(cache=HttpCache(self.tmp_dir.name))
+        self.source.api_url = self.stub.url
+        self.source.graphql_url = f"{self.stub.url}/graphql"
+
+    def tearDown(self):
+        self.stub.__exit__()
+        self.source.session.close()
+        self.tmp_dir.cleanup()
+
+    def test_unchanged_head_skips_graphql(self):
+        self.stub.publish("/repos/o/r/commits/HEAD", "sha1", '"sha1"')
+        first = self.source.fetch_dependencies("https://github.com/o/r")
+        second = self.source.fetch_dependencies("https://github.com/o/r")
+
+        self.assertEqual([d["packageName"] for d in first], ["left-pad"])
+        self.assertEqual(second, first)
+        self.assertEqual(self.stub.count("POST", "/graphql"), 1)
+        self.assertEqual(self.stub.count("GET", "/repos/o/r/commits/HEAD"), 2)
+
+        # A new commit on the default branch queries the dependency graph again
+        self.stub.publish("/repos/o/r/commits/HEAD", "sha2", '"sha2"')
+        self.source.fetch_dependencies("https://github.com/o/r")
+        self.assertEqual(self.stub.count("POST", "/graphql"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,196 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
 import numpy as np
 
 
+MIN_VOTE = 1   # voters stop casting votes once their largest possible vote drops below this
+
+
+def generate_votes(ratings, owner_ids, voter_ids, total_op, laziness, expertise, n=1, rng=None):
+    """
+    Draw the ballots of n voting rounds at once.
+
+    Every voter ranks all projects by their own noisy view of the projects' ratings and
+    votes on the top of that list, spending a share of their remaining balance on each
+    project. Abstentions (projects outside the ballot, conflicts of interest, votes too
+    small to cast) are masked.
+
+    Returns a masked array of shape (n, num_voters, num_projects).
+    """
+    rng = np.random if rng is None else rng
+    ratings = np.asarray(ratings, dtype=np.float64)
+    owner_ids = np.asarray(owner_ids)
+    voter_ids = np.asarray(voter_ids)
+    total_op = np.asarray(total_op, dtype=np.float64)
+    laziness = np.asarray(laziness, dtype=np.float64)
+    expertise = np.asarray(expertise, dtype=np.float64)
+    num_voters, num_projects = len(voter_ids), len(ratings)
+    shape = (n, num_voters, num_projects)
+
+    # each voter's ranking of the projects, from their subjective ratings; only the
+    # top max(ballot_size) positions of each ranking are ever voted on
+    subjectivity_scores = rng.uniform(expertise[:, None], 2 - expertise[:, None], shape)
+    personal_ratings = -(ratings * subjectivity_scores)
+    ballot_size = ((1 - laziness) * num_projects).astype(np.int64)
+    top = int(ballot_size.max(initial=0))
+    if top < num_projects:
+        candidates = np.argpartition(personal_ratings, top, axis=-1)[..., :top]
+    else:
+        candidates = np.broadcast_to(np.arange(num_projects), shape)
+    order = np.argsort(np.take_along_axis(personal_ratings, candidates, axis=-1), axis=-1)
+    ranked_projects = np.take_along_axis(candidates, order, axis=-1)
+
+    # ballot position first, so each step below reads contiguous (n, num_voters) slices;
+    # projects owned by the voter are never voted on
+    conflicts = np.moveaxis(owner_ids[ranked_projects] == voter_ids[:, None], -1, 0).copy()
+    draws = rng.uniform(0, 1, (top, n, num_voters))
+
+    # votes in ballot order; each vote depends on the balance left by the previous ones
+    ranked_votes = np.full((top, n, num_voters), np.nan)
+    balance = np.broadcast_to(total_op, (n, num_voters)).copy()
+    for idx in range(top):
+        on_ballot = idx < ballot_size
+        remaining = np.sqrt(np.maximum(ballot_size - idx, 1))
+        max_vote_per_project = balance * laziness / remaining
+        cast = on_ballot & (max_vote_per_project >= MIN_VOTE) & ~conflicts[idx]
+        amount = np.where(cast, draws[idx] * max_vote_per_project, 0)
+        ranked_votes[idx][cast] = amount[cast]
+        balance -= amount
+
+    votes = np.full(shape, np.nan)
+    np.put_along_axis(votes, ranked_projects, np.moveaxis(ranked_votes, 0, -1), axis=-1)
+    return np.ma.masked_invalid(votes, copy=False)
+
+
+def _quantile_bounds(sorted_votes, counts, q):
+    """Linear-interpolation quantile of the first `counts` entries along axis -2, as np.quantile."""
+    position = q * np.maximum(counts - 1, 0)
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, np.maximum(counts - 1, 0))
+    a = np.take_along_axis(sorted_votes, below[..., None, :], axis=-2)[..., 0, :]
+    b = np.take_along_axis(sorted_votes, above[..., None, :], axis=-2)[..., 0, :]
+    t = position - below
+    diff = b - a
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+
+def score_votes(votes, scoring_method='median', quorum=1, min_amount=1):
+    """
+    Score every project from a masked vote array of shape (..., num_voters, num_projects).
+
+    Projects below the vote quorum, or scoring below min_amount, score 0.
+    Returns an array of shape (..., num_projects).
+    """
+    if not isinstance(votes, np.ma.MaskedArray):
+        votes = np.ma.masked_invalid(votes)
+    counts = votes.count(axis=-2)
+    filled = votes.filled(np.nan)
+
+    if scoring_method in ('median', 'outliers'):
+        sorted_votes = np.sort(filled, axis=-2)   # abstentions (NaN) sort last
+    if scoring_method == 'median':
+        upper = counts // 2
+        lower = np.maximum(counts - 1, 0) // 2
+        a = np.take_along_axis(sorted_votes, lower[..., None, :], axis=-2)[..., 0, :]
+        b = np.take_along_axis(sorted_votes, upper[..., None, :], axis=-2)[..., 0, :]
+        scores = (a + b) / 2
+    elif scoring_method == 'mean':
+        scores = np.nansum(filled, axis=-2) / np.maximum(counts, 1)
+    elif scoring_method == 'quadratic':
+        scores = np.nansum(np.sqrt(filled), axis=-2)
+    elif scoring_method == 'outliers':
+        # mean of the votes inside the interquartile range
+        lo = _quantile_bounds(sorted_votes, counts, .25)[..., None, :]
+        hi = _quantile_bounds(sorted_votes, counts, .75)[..., None, :]
+        inside = (filled >= lo) & (filled <= hi)
+        scores = np.where(inside, filled, 0).sum(axis=-2) / np.maximum(inside.sum(axis=-2), 1)
+    else:
+        scores = np.nansum(filled, axis=-2)
+
+    scores = np.where((counts < quorum) | (counts == 0), 0, scores)
+    return np.where(scores < min_amount, 0, scores)
+
+
+def allocate_scores(scores, max_funding, normalize=True):
+    # share max_funding in proportion to the project scores along the last axis
+    if not normalize:
+        return scores
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.round(scores / scores.sum(axis=-1, keepdims=True) * max_funding, 2)
+
+
+def summarize_payouts(allocations):
+    # payout statistics over the funded projects of each round, along the last axis
+    payouts = np.ma.masked_less_equal(allocations, 0)
+    return {
+        'num_projects_above_quorum': payouts.count(axis=-1),
+        'avg_payout': np.ma.filled(payouts.mean(axis=-1), np.nan),
+        'median_payout': np.ma.filled(np.ma.median(payouts, axis=-1), np.nan),
+        'max_payout': np.ma.filled(payouts.max(axis=-1), np.nan)
+    }
+
+
+class RunningStats:
+    # running mean and variance (Welford / Chan et al.) of arrays streamed along axis 0
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, batch):
+        batch = np.asarray(batch, dtype=np.float64)
+        other = RunningStats()
+        other.count = len(batch)
+        other.mean = batch.mean(axis=0)
+        other.m2 = ((batch - other.mean) ** 2).sum(axis=0)
+        self.merge(other)
+
+    def merge(self, other):
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+SUMMARY_KEYS = ('num_projects_above_quorum', 'avg_payout', 'median_payout', 'max_payout')
+DEFAULT_BATCH_SIZE = 50   # rounds drawn per task
+
+_WORKER_STATE = {}
+
+
+def _init_worker(arrays, max_funding, grid, normalize):
+    _WORKER_STATE.update(arrays=arrays, max_funding=max_funding, grid=grid, normalize=normalize)
+
+
+def _simulate_batch(task):
+    # draw one batch of rounds and score it under every grid setting
+    num_rounds, seed_sequence = task
+    rng = np.random.default_rng(seed_sequence)
+    votes = generate_votes(**_WORKER_STATE['arrays'], n=num_rounds, rng=rng)
+    num_votes = votes.count(axis=1)
+    results = []
+    for scoring_method, quorum, min_amount in _WORKER_STATE['grid']:
+        scores = score_votes(votes, scoring_method, quorum, min_amount)
+        allocations = allocate_scores(scores, _WORKER_STATE['max_funding'], _WORKER_STATE['normalize'])
+        stats = {}
+        for key, values in {'num_votes': num_votes, 'token_amount': allocations, **summarize_payouts(allocations)}.items():
+            stats[key] = RunningStats()
+            stats[key].update(values)
+        results.append(stats)
+    return results
+
+
 class Project:
     def __init__(self, project_id, rating, owner_id=None):
         self.project_id = project_id
@@ -9,7 +199,8 @@ class Project:
         # a project's "true" impact
         self.rating = rating    
 
-        # variables needed for voting simulations
+        # variables needed for voting simulations; votes only holds votes cast one at a
+        # time (Voter.cast_vote, add_zeroes), while num_votes also counts the round's votes
         self.votes = []
         self.num_votes = 0
         self.score = None
@@ -25,8 +216,8 @@ class Project:
 
     def add_vote(self, vote):
         self.votes.append(vote)
-        votes = self.get_votes()
-        self.num_votes = len(votes)
+        if vote.amount is not None:
+            self.num_votes += 1
 
     def add_zeroes(self, num_zeroes):
         for _ in range(num_zeroes):
@@ -54,6 +245,8 @@ class Vote:
 class Voter:
     def __init__(self, voter_id, op_available, laziness, expertise):
         self.voter_id = voter_id
+
+        # votes cast through cast_vote; empty after Simulation.simulate_voting
         self.votes = []
 
         # how much total OP they are willing to put in their ballot
@@ -93,6 +286,9 @@ class Round:
         self.num_voters = 0
         self.num_projects = 0
 
+        # masked (voters x projects) vote array filled by Simulation.simulate_voting
+        self.votes = None
+
     def add_projects(self, projects):
         self.projects.extend(projects)
         self.num_projects += len(projects)
@@ -101,40 +297,29 @@ class Round:
         self.voters.extend(voters)
         self.num_voters += len(voters)
 
-    def calculate_allocations(self, scoring_method, quorum, min_amount, normalize=True):        
-        scores = []
-        for project in self.projects:
-            votes = project.get_votes()
-            if len(votes) < quorum:
-                score = 0
-            else:
-                if scoring_method == 'median':
-                    score = np.median(votes)
-                elif scoring_method == 'mean':
-                    score = np.mean(votes)
-                elif scoring_method == 'quadratic':
-                    score = sum(np.sqrt(votes))
-                elif scoring_method == 'outliers':
-                    lo = np.quantile(votes, .25)
-                    hi = np.quantile(votes, .75)
-                    score = np.mean([v for v in votes if lo <= v <= hi])
-                else:
-                    score = sum(votes)            
-                if score < min_amount:
-                    score = 0            
-            project.score = score
-            scores.append(score)
-        
-        total_score = sum(scores)
-        allocations = []
+    def vote_matrix(self):
+        # masked (voters x projects) array of the round's votes; votes cast one at a
+        # time through Voter.cast_vote / Project.add_zeroes are appended as extra rows
+        rows = [self.votes] if self.votes is not None else []
+        project_votes = [project.get_votes() for project in self.projects]
+        num_rows = max((len(votes) for votes in project_votes), default=0)
+        if num_rows or not rows:
+            extra = np.full((num_rows, self.num_projects), np.nan)
+            for i, votes in enumerate(project_votes):
+                extra[:len(votes), i] = votes
+            rows.append(np.ma.masked_invalid(extra))
+        return np.ma.concatenate(rows, axis=0)
+
+    def calculate_allocations(self, scoring_method, quorum, min_amount, normalize=True):
+        votes = self.vote_matrix()
+        scores = score_votes(votes, scoring_method, quorum, min_amount)
+        allocations = allocate_scores(scores, self.max_funding, normalize)
+        num_votes = votes.count(axis=0)
         for i, project in enumerate(self.projects):
-            if normalize:
-                allocation = np.round(scores[i] / total_score * self.max_funding, 2)
-            else:
-                allocation = scores[i]
-            project.token_amount = allocation
-            allocations.append(allocation)
-        return allocations
+            project.num_votes = int(num_votes[i])
+            project.score = scores[i]
+            project.token_amount = allocations[i]
+        return allocations.tolist()
 
 
 class Simulation:
@@ -146,6 +331,7 @@ class Simulation:
 
     def reset_round(self):
         # reset the voting simulation
+        self.round.votes = None
         if self.round.num_projects:
             for project in self.round.projects:
                 project.reset_project()
@@ -189,29 +375,29 @@ class Simulation:
     def get_project_data(self):
         return [p.show_results() for p in self.round.projects]
 
-    def simulate_voting(self):
-
-        num_projects = self.round.num_projects
-        for voter in self.round.voters:
-            ballot_size = int((1 - voter.laziness_factor) * num_projects)
-
-            # Create an array for subjectivity scores and personal ratings
-            subjectivity_scores = np.random.uniform(voter.expertise_factor, 2 - voter.expertise_factor, num_projects)
-            personal_ratings = np.array([project.rating for project in self.round.projects]) * subjectivity_scores
-            
-            sorted_project_indices = np.argsort(-personal_ratings)
-            for idx, project_idx in enumerate(sorted_project_indices):
-                project = self.round.projects[project_idx]
-                if idx >= ballot_size:
-                    amount = None
-                else:                
-                    max_vote_per_project = (voter.balance_op * voter.laziness_factor) / np.sqrt(ballot_size - idx)
-                    
-                    if max_vote_per_project < 1:
-                        amount = None
-                    else:
-                        amount = np.random.uniform(0, max_vote_per_project)
-                voter.cast_vote(project, amount)
+    def round_arrays(self):
+        # project and voter attributes as arrays for the vectorized voting engine
+        projects, voters = self.round.projects, self.round.voters
+        return {
+            'ratings': np.array([p.rating for p in projects], dtype=np.float64),
+            'owner_ids': np.array([-1 if p.owner_id is None else p.owner_id for p in projects]),
+            'voter_ids': np.array([v.voter_id for v in voters]),
+            'total_op': np.array([v.total_op for v in voters], dtype=np.float64),
+            'laziness': np.array([v.laziness_factor for v in voters], dtype=np.float64),
+            'expertise': np.array([v.expertise_factor for v in voters], dtype=np.float64)
+        }
+
+    def simulate_voting(self, rng=None):
+        # the ballots are stored as one array in Round.votes: Voter.votes, Project.votes
+        # and their get_votes() stay empty, only num_votes and balance_op are updated
+        votes = generate_votes(**self.round_arrays(), n=1, rng=rng)[0]
+        self.round.votes = votes
+        num_votes = votes.count(axis=0)
+        for i, project in enumerate(self.round.projects):
+            project.num_votes = int(num_votes[i])
+        spent = votes.sum(axis=1).filled(0)
+        for i, voter in enumerate(self.round.voters):
+            voter.balance_op = voter.total_op - spent[i]
 
     
     def allocate_votes(self, scoring_method='median', quorum=1, min_amount=1, normalize=True):
@@ -228,42 +414,72 @@ class Simulation:
         }
 
 
-    def simulate_voting_and_scoring(self, n=1, scoring_method='median', quorum=17, min_amount=1500, normalize=True):
-        results = []
-        for i in range(n):            
-            self.simulate_voting()            
-            allocations = self.round.calculate_allocations(scoring_method, quorum, min_amount, normalize)
-            payouts = [a for a in allocations if a > 0]
-            data = self.get_project_data()
-            results.append({
-                'num_projects_above_quorum': len(payouts),
-                'avg_payout': np.mean(payouts),
-                'median_payout': np.median(payouts),
-                'max_payout': np.max(payouts),
-                'data': data
-            })
-            self.reset_round()
-        
-        return {
-            'scoring_method': scoring_method,
-            'vote_quorum': quorum,
-            'min_amount': min_amount,
-            'normalize': normalize,
-            'num_projects_above_quorum': np.mean([r['num_projects_above_quorum'] for r in results]),
-            'avg_payout': np.mean([r['avg_payout'] for r in results]),
-            'median_payout': np.mean([r['median_payout'] for r in results]),
-            'max_payout': np.mean([r['max_payout'] for r in results]),
-            'data': [
-                {
-                    'project_id': d['project_id'],
-                    'owner_id': d['owner_id'],
-                    'rating': d['rating'],
-                    'num_votes': np.mean([r['data'][i]['num_votes'] for r in results]),
-                    'token_amount': np.mean([r['data'][i]['token_amount'] for r in results])
-                }
-                for i, d in enumerate(results[0]['data'])
-            ]
-        }
+    def simulate_voting_and_scoring(self, n=1, scoring_method='median', quorum=17, min_amount=1500, normalize=True, seed=None, max_workers=1):
+        return self.simulate_grid(
+            n, [scoring_method], [quorum], [min_amount], normalize, seed=seed, max_workers=max_workers
+        )[0]
+
+    def simulate_grid(self, n=1, scoring_methods=('median',), quorums=(17,), min_amounts=(1500,), normalize=True,
+                      seed=None, max_workers=None, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Simulate n voting rounds and score each under every combination of scoring_methods,
+        quorums and min_amounts.
+
+        Rounds are drawn in batches spread over a process pool (max_workers=1 runs in-process).
+        Every batch gets its own child seed of `seed`, so results are reproducible regardless of
+        max_workers. Per-project statistics are merged as batches finish, so memory does not
+        grow with n.
+
+        Returns one result dict per combination, with the mean (and std) over rounds of the
+        payout statistics and of each project's num_votes and token_amount.
+        """
+        grid = list(product(scoring_methods, quorums, min_amounts))
+        sizes = [batch_size] * (n // batch_size) + ([n % batch_size] if n % batch_size else [])
+        tasks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+        initargs = (self.round_arrays(), self.round.max_funding, grid, normalize)
+
+        totals = [None] * len(grid)
+
+        def merge(batch_results):
+            for i, stats in enumerate(batch_results):
+                if totals[i] is None:
+                    totals[i] = stats
+                else:
+                    for key, running in stats.items():
+                        totals[i][key].merge(running)
+
+        if max_workers == 1:
+            _init_worker(*initargs)
+            for task in tasks:
+                merge(_simulate_batch(task))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=initargs) as executor:
+                for batch_results in executor.map(_simulate_batch, tasks):
+                    merge(batch_results)
+        self.reset_round()
+
+        return [
+            {
+                'scoring_method': scoring_method,
+                'vote_quorum': quorum,
+                'min_amount': min_amount,
+                'normalize': normalize,
+                **{key: float(stats[key].mean) for key in SUMMARY_KEYS},
+                **{f'{key}_std': float(stats[key].std) for key in SUMMARY_KEYS},
+                'data': [
+                    {
+                        'project_id': p.project_id,
+                        'owner_id': p.owner_id,
+                        'rating': p.rating,
+                        'num_votes': stats['num_votes'].mean[i],
+                        'token_amount': stats['token_amount'].mean[i],
+                        'token_amount_std': stats['token_amount'].std[i]
+                    }
+                    for i, p in enumerate(self.round.projects)
+                ]
+            }
+            for (scoring_method, quorum, min_amount), stats in zip(grid, totals)
+        ]
     
 
 def test():
@@ -33,11 +33,17 @@ def _(mo):
 
 
 @app.cell
-def _(DF_METRICS, METRIC_IDS_RF4, client, json, pd):
+def _(DF_METRICS, METRIC_IDS_RF4, client, json, np, pd):
     TOTAL_FUNDING = 10_000_000
     MAX_CAP = 500_000
     MIN_CAP = 1000
 
+    # project x metric matrix, with the metric totals over all projects and over open source projects
+    _metrics = DF_METRICS[METRIC_IDS_RF4].fillna(0).to_numpy(dtype=float)
+    _is_oss = DF_METRICS['is_oss'].fillna(False).astype(bool).to_numpy()
+    _metric_totals = _metrics.sum(axis=0)
+    _oss_metric_totals = _metrics[_is_oss].sum(axis=0)
+
 
     def parse_payload(json_payload):
         """
@@ -52,37 +58,69 @@ def _(DF_METRICS, METRIC_IDS_RF4, client, json, pd):
         return {'allocations': allocations, 'os_multiplier': ballot['os_multiplier']}
 
 
-    def score_projects(ballot):
+    def score_projects(ballots):
         """
-        Score projects based on the ballot's allocations and the OS multiplier.
+        Score projects for every ballot at once based on the ballots' allocations and OS multipliers.
+
+        Each metric column is scaled by the ballot's OS multiplier and normalized to sum to 1,
+        then weighted by the ballot's allocation to it. The normalization only depends on the
+        ballot through its multiplier, so it folds into the weights and all ballots are scored
+        with one (ballots x metrics) @ (metrics x projects) product.
         """
-        os_multiplier = DF_METRICS['is_oss'].apply(lambda x: ballot['os_multiplier'] if x else 1)
-        scores = DF_METRICS[METRIC_IDS_RF4].copy()
+        weights = pd.DataFrame(
+            [ballot['allocations'] for ballot in ballots],
+            index=ballots.index,
+            columns=METRIC_IDS_RF4
+        ).fillna(0).to_numpy(dtype=float) / 100.0
+        os_multipliers = np.array([ballot['os_multiplier'] for ballot in ballots], dtype=float)
 
-        for metric in METRIC_IDS_RF4:
-            scores[metric] *= os_multiplier
-            scores[metric] /= scores[metric].sum()
-            weight = ballot['allocations'].get(metric, 0) / 100.0
-            scores[metric] *= weight
+        # column totals after scaling open source projects by each ballot's multiplier
+        column_totals = _metric_totals + np.outer(os_multipliers - 1, _oss_metric_totals)
+        scaled_weights = np.divide(weights, column_totals, out=np.zeros_like(weights), where=column_totals != 0)
+        os_mask = np.where(_is_oss, os_multipliers[:, np.newaxis], 1.0)
+        scores = os_mask * (scaled_weights @ _metrics.T)
 
-        return scores.sum(axis=1)
+        return pd.DataFrame(scores, index=ballots.index, columns=DF_METRICS.index)
 
 
-    def allocate_funding(project_scores, funding_balance=TOTAL_FUNDING):
+    def allocate_funding(project_scores, funding_balance=TOTAL_FUNDING, max_cap=MAX_CAP):
         """
-        Allocate funding to projects based on their scores.
-        """
-        allocations = {}
-        score_balance = project_scores.sum()
+        Allocate funding to projects based on their scores, for every row of scores at once.
 
-        for project_id, score in project_scores.sort_values(ascending=False).items():
-            uncapped_funding_alloc = score / score_balance * funding_balance
-            capped_funding_alloc = min(uncapped_funding_alloc, MAX_CAP)
-            allocations[project_id] = capped_funding_alloc
-            funding_balance -= capped_funding_alloc
-            score_balance -= score
+        Projects are funded in descending score order in proportion to the remaining scores,
+        with anything above max_cap redistributed to the projects below. The capped projects
+        are always the top ones, so each row is solved by finding the first project that
+        fits under the cap.
+        """
+        scores = np.atleast_2d(np.asarray(project_scores, dtype=float))
+        rows, num_projects = np.arange(len(scores))[:, np.newaxis], scores.shape[1]
+        order = np.argsort(-scores, axis=1, kind='stable')
+        sorted_scores = scores[rows, order]
+
+        # funding per unit of score at each position, if all projects before it were capped
+        position = np.arange(num_projects)
+        score_balance = sorted_scores[:, ::-1].cumsum(axis=1)[:, ::-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = (np.reshape(funding_balance, (-1, 1)) - position * max_cap) / score_balance
+            # zero scores past the last positive one meet an infinite rate
+            fits = ~(sorted_scores * rate > max_cap)
+        num_capped = np.where(fits.any(axis=1), fits.argmax(axis=1), num_projects)
+
+        uncapped_rate = rate[rows[:, 0], np.minimum(num_capped, num_projects - 1)][:, np.newaxis]
+        with np.errstate(invalid='ignore'):
+            sorted_allocations = np.where(
+                position < num_capped[:, np.newaxis],
+                max_cap,
+                np.where(sorted_scores > 0, sorted_scores * uncapped_rate, 0.0)
+            )
+        allocations = np.empty_like(sorted_allocations)
+        allocations[rows, order] = sorted_allocations
 
-        return pd.Series(allocations)
+        if isinstance(project_scores, pd.Series):
+            return pd.Series(allocations[0], index=project_scores.index)
+        if isinstance(project_scores, pd.DataFrame):
+            return pd.DataFrame(allocations, index=project_scores.index, columns=project_scores.columns)
+        return allocations
 
 
     def determine_results(df_ballots, total_funding=TOTAL_FUNDING, max_cap=MAX_CAP, min_cap=MIN_CAP):
@@ -90,25 +128,26 @@ def _(DF_METRICS, METRIC_IDS_RF4, client, json, pd):
         Determine the results of the Retro Funding 4 round.
         """
         # 1. score each ballot
-        df_scores = df_ballots.apply(score_projects)
+        df_scores = score_projects(df_ballots)
 
         # 2. allocate funding for each badgeholder
-        df_results = df_scores.apply(allocate_funding, axis=1).T
+        df_results = allocate_funding(df_scores, total_funding, max_cap).T
 
         # 3. get the median funding for each project
         df_results['median'] = df_results.median(axis=1)
 
         # 4. allocate funding based on the median badgeholder allocation
-        df_results['rf4_allocation'] = allocate_funding(df_results['median'])
+        rf4_allocation = allocate_funding(df_results['median'], total_funding, max_cap)
 
         # 5. set the funding for projects below the minimum cap to 0
-        df_results.loc[df_results['rf4_allocation'] < MIN_CAP, 'rf4_allocation'] = 0
+        rf4_allocation[rf4_allocation < min_cap] = 0
 
         # 6. allocate the remaining funding to projects below the maximum cap
-        max_cap_funding = df_results[df_results['rf4_allocation']==MAX_CAP]['rf4_allocation'].sum()
-        remaining_funding = TOTAL_FUNDING - max_cap_funding
-        df_remaining = df_results[df_results['rf4_allocation']<MAX_CAP]
-        df_results['rf4_allocation'].update(allocate_funding(df_remaining['rf4_allocation'], remaining_funding))
+        max_cap_funding = rf4_allocation[rf4_allocation == max_cap].sum()
+        remaining_funding = total_funding - max_cap_funding
+        below_cap = rf4_allocation < max_cap
+        rf4_allocation[below_cap] = allocate_funding(rf4_allocation[below_cap], remaining_funding, max_cap)
+        df_results['rf4_allocation'] = rf4_allocation
 
         return df_results
 
@@ -564,6 +603,26 @@ def _(RESULTS, barchart, mo):
     return
 
 
+@app.cell
+def _(mo):
+    max_cap_input = mo.ui.number(label='Max OP per project', start=100_000, stop=2_000_000, step=50_000, value=500_000)
+    min_cap_input = mo.ui.number(label='Min OP per project', start=0, stop=50_000, step=500, value=1000)
+    mo.hstack([max_cap_input, min_cap_input], justify='start')
+    return max_cap_input, min_cap_input
+
+
+@app.cell
+def _(VOTES, barchart, determine_results, max_cap_input, min_cap_input, mo):
+    # re-run the ballot box with alternative caps
+    _results = determine_results(VOTES, max_cap=max_cap_input.value, min_cap=min_cap_input.value)
+    mo.ui.plotly(barchart(
+        _results['rf4_allocation'],
+        title=f'RF4 distribution with a {max_cap_input.value/1000:.0f}K OP max cap and {min_cap_input.value/1000:.1f}K OP min cap',
+        top_n=230
+    ))
+    return
+
+
 @app.cell(hide_code=True)
 def _(mo):
     mo.md(r"""## 2. Expressed vs Revealed Preferences""")
@@ -994,13 +1053,14 @@ def _():
 @app.cell
 def _():
     import json
+    import numpy as np
     import pandas as pd
     import plotly.graph_objects as go
     import plotly.express as px
     import warnings
 
     warnings.filterwarnings("ignore")
-    return go, json, pd
+    return go, json, np, pd
 
 
 @app.cell